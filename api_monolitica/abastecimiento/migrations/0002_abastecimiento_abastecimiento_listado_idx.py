@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-17 18:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('abastecimiento', '0001_initial'),
+        ('usuario', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='abastecimiento',
+            index=models.Index(fields=['-fecha_creacion', 'id'], name='abastecimiento_listado_idx'),
+        ),
+    ]
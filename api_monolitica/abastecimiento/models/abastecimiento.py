@@ -18,5 +18,28 @@ class Abastecimiento(models.Model):
     estado = models.CharField(max_length=30,choices=ESTADOS_CHOICES,default="Sin reportar")
     fecha_reporte = models.DateField(null=True,blank=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['-fecha_creacion', 'id'], name='abastecimiento_listado_idx'),
+        ]
+    
+    @classmethod
+    def bloquear(cls, pk):
+        """
+        SELECT ... FOR UPDATE sobre el abastecimiento: quien agrega líneas lo toma primero,
+        así las inserciones de líneas de un mismo abastecimiento no se intercalan.
+        """
+        return cls.objects.select_for_update().filter(pk=pk).values_list('pk', flat=True).first()
+    
+    @classmethod
+    def marcar_reportados(cls, ids):
+        """
+        Pasa a 'Reportado' los abastecimientos de `ids` con insumos y sin ninguno 'Sin usar',
+        en un solo UPDATE para todo el lote. Devuelve cuántos cambiaron.
+        """
+        return cls.objects.filter(pk__in=ids, estado="Sin reportar", insumoabastecimiento__isnull=False) \
+            .exclude(insumoabastecimiento__estado="Sin usar") \
+            .update(estado="Reportado", fecha_reporte=timezone.now().date())
+    
     def __str__(self):
         return f"{self.fecha_creacion} - {self.manicurista_id}";
\ No newline at end of file
@@ -21,16 +21,4 @@ class InsumoAbastecimiento(models.Model):
     
     estado = models.CharField(max_length=30,null=False,default="Sin usar",choices = ESTADOS_CHOICES)
     
-    comentario = models.TextField(null=True,blank=True) #leyly me quiero morir, no entiendo esta mierda
-    
-    def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-    
-        # CORRECCIÓN: usar insumoabastecimiento_set (minúsculas + _set)
-        relacionados = self.abastecimiento_id.insumoabastecimiento_set.all()
-        pendientes = relacionados.filter(estado="Sin usar").exists()
-    
-        if not pendientes:
-            self.abastecimiento_id.estado = "Reportado"
-            self.abastecimiento_id.fecha_reporte = timezone.now().date()
-            self.abastecimiento_id.save()
\ No newline at end of file
+    comentario = models.TextField(null=True,blank=True) #leyly me quiero morir, no entiendo esta mierda
\ No newline at end of file
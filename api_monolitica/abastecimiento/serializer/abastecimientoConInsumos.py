@@ -17,7 +17,8 @@ class AbastecimientoConInsumosSerializer(serializers.ModelSerializer):
         read_only_fields = ['fecha_reporte']
     
     def get_total_insumos(self, obj):
-        return obj.insumoabastecimiento_set.count()
+        # Con abastecimientos_con_insumos las líneas ya están en memoria y no hay COUNT por fila
+        return len(obj.insumoabastecimiento_set.all())
     
     def get_manicurista_nombre(self, obj):
         return f"{obj.manicurista_id.nombre} {obj.manicurista_id.apellido}"
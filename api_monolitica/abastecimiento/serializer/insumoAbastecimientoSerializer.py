@@ -4,6 +4,9 @@ from ..models.abastecimiento import Abastecimiento
 from ..models.insumoAbastecimiento import InsumoAbastecimiento
 from usuario.models.manicurista_model import Manicurista
 from insumo.models import Insumo
+from insumo.services.inventario import (
+    aplicar_movimientos, StockInsuficiente, MOVIMIENTO_ABASTECIMIENTO, MOVIMIENTO_DEVOLUCION
+)
 
 class InsumoAbastecimientoSerializer(serializers.ModelSerializer):
     insumo_nombre = serializers.CharField(source='insumo_id.nombre', read_only=True)
@@ -38,9 +41,17 @@ class InsumoAbastecimientoSerializer(serializers.ModelSerializer):
         insumo = validated_data['insumo_id']
         cantidad = validated_data['cantidad']
         
-        # Restar la cantidad del stock del insumo
-        insumo.stock -= cantidad
-        insumo.save()
+        Abastecimiento.bloquear(validated_data['abastecimiento_id'].pk)
+        
+        # Restar la cantidad del stock del insumo; la validación de arriba es solo informativa,
+        # el UPDATE condicional es el que garantiza que no quede en negativo
+        try:
+            insumo.stock = aplicar_movimientos(
+                [(insumo.pk, -cantidad)], MOVIMIENTO_ABASTECIMIENTO,
+                f"abastecimiento:{validated_data['abastecimiento_id'].pk}"
+            )[insumo.pk]
+        except StockInsuficiente as e:
+            raise serializers.ValidationError({'cantidad': str(e)})
         
         # Crear el registro de InsumoAbastecimiento
         insumo_abastecimiento = super().create(validated_data)
@@ -55,16 +66,32 @@ class InsumoAbastecimientoSerializer(serializers.ModelSerializer):
             cantidad_nueva = validated_data['cantidad']
             diferencia = cantidad_nueva - cantidad_anterior
             
-            insumo = instance.insumo_id
-            
-            # Validar que hay suficiente stock para el incremento
-            if diferencia > 0 and insumo.stock < diferencia:
+            # Ajustar el stock; si aumenta la cantidad el UPDATE valida que haya suficiente
+            try:
+                stocks = aplicar_movimientos(
+                    [(instance.insumo_id_id, -diferencia)],
+                    MOVIMIENTO_ABASTECIMIENTO if diferencia > 0 else MOVIMIENTO_DEVOLUCION,
+                    f"abastecimiento:{instance.abastecimiento_id_id}"
+                )
+                if stocks:
+                    instance.insumo_id.stock = stocks[instance.insumo_id_id]
+            except StockInsuficiente as e:
                 raise serializers.ValidationError({
-                    'cantidad': f'No hay suficiente stock para aumentar la cantidad. Stock disponible: {insumo.stock}'
+                    'cantidad': f'No hay suficiente stock para aumentar la cantidad. Stock disponible: {e.disponible}'
                 })
-            
-            # Ajustar el stock
-            insumo.stock -= diferencia
-            insumo.save()
         
-        return super().update(instance, validated_data)
\ No newline at end of file
+        return super().update(instance, validated_data)
+
+class LineaAbastecimientoSerializer(serializers.Serializer):
+    """
+    Una línea de agregar_insumos. Solo valida tipos y cantidad: el insumo y el stock se
+    revisan contra una sola consulta para todas las líneas.
+    """
+    insumo_id = serializers.IntegerField()
+    cantidad = serializers.IntegerField(default=1)
+    comentario = serializers.CharField(required=False, allow_blank=True, allow_null=True, default='')
+
+    def validate_cantidad(self, value):
+        if value < 1:
+            raise serializers.ValidationError("La cantidad debe ser mayor a 0.")
+        return value
@@ -0,0 +1,20 @@
+from django.db.models import Prefetch
+
+from ..models.abastecimiento import Abastecimiento
+from ..models.insumoAbastecimiento import InsumoAbastecimiento
+
+
+def abastecimientos_con_insumos(queryset=None):
+    """
+    Queryset listo para AbastecimientoConInsumosSerializer: el manicurista viene en el JOIN
+    y las líneas con su insumo en un solo prefetch, así que serializar N abastecimientos
+    cuesta dos consultas. La línea recibe su abastecimiento desde el prefetch.
+    """
+    if queryset is None:
+        queryset = Abastecimiento.objects.all()
+    return queryset.select_related('manicurista_id').prefetch_related(
+        Prefetch(
+            'insumoabastecimiento_set',
+            queryset=InsumoAbastecimiento.objects.select_related('insumo_id').order_by('id'),
+        )
+    )
@@ -0,0 +1,135 @@
+from django.db import transaction
+
+from ..models.abastecimiento import Abastecimiento
+from ..models.insumoAbastecimiento import InsumoAbastecimiento
+from ..serializer.insumoAbastecimientoSerializer import LineaAbastecimientoSerializer
+from insumo.models import Insumo
+from insumo.services.inventario import aplicar_movimientos, MOVIMIENTO_ABASTECIMIENTO
+
+
+def agregar_lineas(abastecimiento, insumos_data):
+    """
+    Crea las líneas válidas de insumos_data en el abastecimiento y descuenta su stock.
+    Los insumos se leen (y bloquean) en una sola consulta, el stock se revisa en memoria
+    línea por línea, las filas se insertan con bulk_create y el descuento es un solo UPDATE.
+    Devuelve (líneas creadas, errores); cada error es {'insumo': posición desde 1, 'errores':
+    {campo: [mensajes]}} y una línea inválida no impide crear las demás.
+    """
+    errores = []
+    validas = []
+    for i, insumo_data in enumerate(insumos_data):
+        if not isinstance(insumo_data, dict):
+            errores.append((i, {'non_field_errors': ["Cada insumo debe ser un objeto con insumo_id y cantidad"]}))
+            continue
+        if not insumo_data.get('insumo_id'):
+            errores.append((i, {'insumo_id': ["ID de insumo requerido"]}))
+            continue
+        serializer = LineaAbastecimientoSerializer(data=insumo_data)
+        if serializer.is_valid():
+            validas.append((i, serializer.validated_data))
+        else:
+            errores.append((i, serializer.errors))
+
+    with transaction.atomic():
+        # Con el abastecimiento bloqueado nadie más inserta líneas suyas hasta el final, así
+        # que las filas con id mayor al último son exactamente las de este bulk_create
+        Abastecimiento.bloquear(abastecimiento.pk)
+        insumos = Insumo.objects.select_for_update().in_bulk({datos['insumo_id'] for _, datos in validas})
+
+        # Cada línea aceptada descuenta del disponible, igual que si se guardaran una por una
+        disponibles = {insumo_id: insumo.stock for insumo_id, insumo in insumos.items()}
+        lineas = []
+        for i, datos in validas:
+            insumo = insumos.get(datos['insumo_id'])
+            if insumo is None:
+                errores.append((i, {'insumo_id': [f"El insumo {datos['insumo_id']} no existe."]}))
+                continue
+            if disponibles[insumo.pk] < datos['cantidad']:
+                errores.append((i, {'cantidad': [f"No hay suficiente stock. Stock disponible: {disponibles[insumo.pk]}"]}))
+                continue
+            disponibles[insumo.pk] -= datos['cantidad']
+            lineas.append(InsumoAbastecimiento(
+                insumo_id=insumo, abastecimiento_id=abastecimiento,
+                cantidad=datos['cantidad'], comentario=datos['comentario'],
+            ))
+
+        errores = [{'insumo': i + 1, 'errores': detalle} for i, detalle in sorted(errores, key=lambda error: error[0])]
+        if not lineas:
+            return [], errores
+
+        stocks = aplicar_movimientos(
+            [(linea.insumo_id_id, -linea.cantidad) for linea in lineas],
+            MOVIMIENTO_ABASTECIMIENTO, f"abastecimiento:{abastecimiento.pk}"
+        )
+        ultimo_id = InsumoAbastecimiento.objects.filter(abastecimiento_id=abastecimiento) \
+            .order_by('-id').values_list('id', flat=True).first() or 0
+        creadas = InsumoAbastecimiento.objects.bulk_create(lineas)
+        if creadas[0].pk is None:
+            # MySQL no devuelve los ids del INSERT múltiple; un solo INSERT los asigna en el
+            # orden de las filas y el bloqueo de arriba garantiza que no hay otras en medio
+            ids = list(InsumoAbastecimiento.objects.filter(abastecimiento_id=abastecimiento, id__gt=ultimo_id)
+                       .order_by('id').values_list('id', flat=True))
+            if len(ids) != len(creadas):
+                raise RuntimeError(f"Se esperaban {len(creadas)} líneas nuevas y hay {len(ids)}")
+            for linea, linea_id in zip(creadas, ids):
+                linea.pk = linea_id
+
+    for linea in creadas:
+        linea.insumo_id.stock = stocks[linea.insumo_id_id]
+    return creadas, errores
+
+
+def reportar_lineas(abastecimiento, insumos_reporte):
+    """
+    Aplica estado y comentario a las líneas del abastecimiento con una lectura y un
+    bulk_update, y al final revisa una sola vez si el abastecimiento quedó reportado.
+    Devuelve (líneas actualizadas, errores); las líneas con error no se cambian.
+    """
+    estados = dict(InsumoAbastecimiento.ESTADOS_CHOICES)
+    actualizadas = []
+    errores = []
+
+    with transaction.atomic():
+        ids = set()
+        for insumo_data in insumos_reporte:
+            if not isinstance(insumo_data, dict):
+                continue
+            try:
+                ids.add(int(insumo_data.get('id')))
+            except (TypeError, ValueError):
+                pass
+        lineas = InsumoAbastecimiento.objects.filter(abastecimiento_id=abastecimiento) \
+            .select_related('insumo_id').in_bulk(ids)
+
+        for insumo_data in insumos_reporte:
+            if not isinstance(insumo_data, dict):
+                errores.append("Cada insumo del reporte debe ser un objeto con id")
+                continue
+            insumo_id = insumo_data.get('id')
+            if not insumo_id:
+                errores.append("ID de insumo requerido")
+                continue
+            try:
+                linea = lineas.get(int(insumo_id))
+            except (TypeError, ValueError):
+                linea = None
+            if linea is None:
+                errores.append(f"InsumoAbastecimiento con ID {insumo_id} no encontrado")
+                continue
+            if 'estado' in insumo_data and insumo_data['estado'] not in estados:
+                errores.append(f"Error procesando insumo {insumo_id}: Estado no válido")
+                continue
+
+            if 'estado' in insumo_data:
+                linea.estado = insumo_data['estado']
+            if 'comentario' in insumo_data:
+                linea.comentario = insumo_data['comentario']
+            actualizadas.append(linea)
+
+        # Una línea repetida en el reporte se guarda una vez, con sus últimos valores
+        InsumoAbastecimiento.objects.bulk_update(
+            list({linea.pk: linea for linea in actualizadas}.values()), ['estado', 'comentario']
+        )
+        Abastecimiento.marcar_reportados([abastecimiento.pk])
+
+    return actualizadas, errores
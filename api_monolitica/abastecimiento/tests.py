@@ -1,3 +1,218 @@
+from datetime import date
+from unittest import mock
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from rol.models import Rol
+from usuario.models.usuario_model import Usuario
+from usuario.models.manicurista_model import Manicurista
+from insumo.models import Marca, Insumo, InventarioMovimiento
+from .models.abastecimiento import Abastecimiento
+from .models.insumoAbastecimiento import InsumoAbastecimiento
+from .serializer.abastecimientoConInsumos import AbastecimientoConInsumosSerializer
+from .services.consultas import abastecimientos_con_insumos
+from .services.lineas import agregar_lineas, reportar_lineas
+
+
+class AbastecimientoTestBase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        rol = Rol.objects.create(nombre="Manicurista")
+        usuario = Usuario.objects.create(
+            username="man1", correo="man1@correo.com", nombre="Nombre",
+            apellido="Apellido", rol_id=rol, numero_documento="m1",
+        )
+        cls.manicurista = Manicurista.objects.create(
+            usuario=usuario, nombre="man1", apellido="Apellido", tipo_documento="CC",
+            numero_documento="m1", correo="man1@correo.com", celular="3000000001",
+            fecha_nacimiento=date(1990, 1, 1), fecha_contratacion=date(2020, 1, 1),
+        )
+        cls.marca = Marca.objects.create(nombre="Marca")
+        cls.abastecimiento = Abastecimiento.objects.create(manicurista_id=cls.manicurista)
+
+
+class AgregarLineasTest(AbastecimientoTestBase):
+    """agregar_insumos valida todas las líneas contra una consulta y descuenta el stock en lote."""
+
+    def test_crea_validas_y_reporta_errores_en_orden(self):
+        esmalte = Insumo.objects.create(nombre="Esmalte", stock=5, marca_id=self.marca)
+        lima = Insumo.objects.create(nombre="Lima", stock=10, marca_id=self.marca)
+        creadas, errores = agregar_lineas(self.abastecimiento, [
+            {'insumo_id': esmalte.pk, 'cantidad': 3},
+            {'insumo_id': esmalte.pk, 'cantidad': 3},
+            {'cantidad': 1},
+            {'insumo_id': lima.pk, 'cantidad': 0},
+            {'insumo_id': 9999},
+            {'insumo_id': lima.pk, 'cantidad': 4, 'comentario': "Para la semana"},
+        ])
+
+        self.assertEqual([(linea.insumo_id_id, linea.cantidad) for linea in creadas], [(esmalte.pk, 3), (lima.pk, 4)])
+        self.assertTrue(all(linea.pk for linea in creadas))
+        self.assertEqual([error['insumo'] for error in errores], [2, 3, 4, 5])
+        self.assertEqual(errores[0]['errores'], {'cantidad': ["No hay suficiente stock. Stock disponible: 2"]})
+        self.assertEqual(errores[1]['errores'], {'insumo_id': ["ID de insumo requerido"]})
+        self.assertEqual(list(errores[2]['errores']), ['cantidad'])
+        self.assertEqual(errores[3]['errores'], {'insumo_id': ["El insumo 9999 no existe."]})
+        self.assertEqual(dict(Insumo.objects.values_list('id', 'stock')), {esmalte.pk: 2, lima.pk: 6})
+        self.assertEqual(creadas[0].insumo_id.stock, 2)
+        self.assertEqual(InventarioMovimiento.objects.count(), 2)
+
+    def test_ids_sin_retorno_del_insert(self):
+        # Como en MySQL: bulk_create no devuelve los ids y se leen después del INSERT
+        insumos = [Insumo.objects.create(nombre=f"Insumo {n}", stock=50, marca_id=self.marca) for n in range(3)]
+        InsumoAbastecimiento.objects.create(insumo_id=insumos[0], abastecimiento_id=self.abastecimiento)
+        bulk_create = InsumoAbastecimiento.objects.bulk_create
+
+        def sin_ids(objetos, *args, **kwargs):
+            creados = bulk_create(objetos, *args, **kwargs)
+            for objeto in creados:
+                objeto.pk = None
+            return creados
+
+        with mock.patch.object(InsumoAbastecimiento.objects, 'bulk_create', side_effect=sin_ids):
+            creadas, errores = agregar_lineas(self.abastecimiento, [
+                {'insumo_id': insumo.pk, 'cantidad': n + 1} for n, insumo in enumerate(insumos)
+            ])
+        self.assertEqual(errores, [])
+        guardadas = dict(InsumoAbastecimiento.objects.filter(pk__in=[linea.pk for linea in creadas])
+                         .values_list('pk', 'insumo_id'))
+        self.assertEqual([guardadas[linea.pk] for linea in creadas], [insumo.pk for insumo in insumos])
+
+    def test_consultas_no_dependen_de_las_lineas(self):
+        insumos = [Insumo.objects.create(nombre=f"Insumo {n}", stock=50, marca_id=self.marca) for n in range(20)]
+
+        def contar(cantidad):
+            with CaptureQueriesContext(connection) as consultas:
+                agregar_lineas(self.abastecimiento, [{'insumo_id': insumo.pk} for insumo in insumos[:cantidad]])
+            return len(consultas)
+
+        self.assertEqual(contar(2), contar(20))
+        self.assertEqual(InsumoAbastecimiento.objects.count(), 22)
+
+    def test_lineas_mal_formadas_se_reportan_por_posicion(self):
+        lima = Insumo.objects.create(nombre="Lima", stock=10, marca_id=self.marca)
+        creadas, errores = agregar_lineas(self.abastecimiento, [
+            5, "lima", [lima.pk], None, {'insumo_id': lima.pk, 'cantidad': 2},
+        ])
+        self.assertEqual([(linea.insumo_id_id, linea.cantidad) for linea in creadas], [(lima.pk, 2)])
+        self.assertEqual([error['insumo'] for error in errores], [1, 2, 3, 4])
+        self.assertTrue(all(list(error['errores']) == ['non_field_errors'] for error in errores))
+
+
+class ReportarLineasTest(AbastecimientoTestBase):
+    """El reporte actualiza las líneas en lote y marca el abastecimiento una sola vez al final."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        insumo = Insumo.objects.create(nombre="Esmalte", stock=50, marca_id=cls.marca)
+        InsumoAbastecimiento.objects.bulk_create([
+            InsumoAbastecimiento(insumo_id=insumo, abastecimiento_id=cls.abastecimiento) for _ in range(10)
+        ])
+        cls.lineas = list(InsumoAbastecimiento.objects.order_by('id'))
+
+    def test_reporte_parcial_no_marca_reportado(self):
+        actualizadas, errores = reportar_lineas(self.abastecimiento, [
+            {'id': self.lineas[0].pk, 'estado': "Acabado", 'comentario': "Se terminó"},
+            {'id': self.lineas[1].pk, 'estado': "Otro"},
+            {'id': 9999, 'estado': "Bajo"},
+            {'estado': "Bajo"},
+        ])
+        self.assertEqual([linea.pk for linea in actualizadas], [self.lineas[0].pk])
+        self.assertEqual(len(errores), 3)
+        self.lineas[0].refresh_from_db()
+        self.assertEqual((self.lineas[0].estado, self.lineas[0].comentario), ("Acabado", "Se terminó"))
+        self.abastecimiento.refresh_from_db()
+        self.assertEqual(self.abastecimiento.estado, "Sin reportar")
+
+    def test_reporte_con_entradas_mal_formadas(self):
+        actualizadas, errores = reportar_lineas(self.abastecimiento, [
+            7, "texto", [self.lineas[0].pk], {'id': "abc"}, {'id': self.lineas[0].pk, 'estado': "Bajo"},
+        ])
+        self.assertEqual([linea.pk for linea in actualizadas], [self.lineas[0].pk])
+        self.assertEqual(len(errores), 4)
+
+        url = '/api/abastecimiento/insumo-abastecimientos/realizar_reporte/'
+        respuesta = APIClient().post(url, {'abastecimiento_id': self.abastecimiento.pk, 'insumos_reporte': "abc"},
+                                     format='json')
+        self.assertEqual(respuesta.status_code, 400)
+
+    def test_reporte_completo_en_consultas_constantes(self):
+        with CaptureQueriesContext(connection) as consultas:
+            reportar_lineas(self.abastecimiento, [{'id': linea.pk, 'estado': "Uso medio"} for linea in self.lineas])
+        # lectura de líneas, bulk_update y el UPDATE de marcar_reportados
+        sentencias = [consulta['sql'] for consulta in consultas.captured_queries if 'SAVEPOINT' not in consulta['sql']]
+        self.assertEqual(len(sentencias), 3)
+        self.abastecimiento.refresh_from_db()
+        self.assertEqual(self.abastecimiento.estado, "Reportado")
+        self.assertIsNotNone(self.abastecimiento.fecha_reporte)
+
+
+class PorEstadoTest(AbastecimientoTestBase):
+    """por_estado agrupa en una sola consulta y respeta el límite por grupo."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        insumo = Insumo.objects.create(nombre="Esmalte", stock=50, marca_id=cls.marca)
+        InsumoAbastecimiento.objects.bulk_create([
+            InsumoAbastecimiento(insumo_id=insumo, abastecimiento_id=cls.abastecimiento, estado=estado)
+            for estado in ["Sin usar"] * 6 + ["Bajo"] * 3 + ["Acabado"]
+        ])
+
+    def test_agrupa_en_una_consulta(self):
+        client = APIClient()
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = client.get("/api/abastecimiento/insumo-abastecimientos/por_estado/", {'limite': 2})
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(len(consultas), 1)
+        datos = respuesta.json()
+        self.assertEqual(list(datos), ["Acabado", "Uso medio", "Bajo", "Sin usar"])
+        self.assertEqual({estado: grupo['count'] for estado, grupo in datos.items()},
+                         {"Acabado": 1, "Uso medio": 0, "Bajo": 3, "Sin usar": 6})
+        self.assertEqual(len(datos["Sin usar"]['insumos']), 2)
+        self.assertEqual(datos["Sin usar"]['insumos'][0]['insumo_nombre'], "Esmalte")
+
+        self.assertEqual(client.get("/api/abastecimiento/insumo-abastecimientos/por_estado/", {'limite': 'x'}).status_code, 400)
+
+
+class AbastecimientoConInsumosTest(AbastecimientoTestBase):
+    """Los abastecimientos con sus líneas se serializan con consultas fijas."""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        insumo = Insumo.objects.create(nombre="Esmalte", stock=50, marca_id=cls.marca)
+        abastecimientos = [cls.abastecimiento] + [
+            Abastecimiento.objects.create(manicurista_id=cls.manicurista) for _ in range(49)
+        ]
+        InsumoAbastecimiento.objects.bulk_create([
+            InsumoAbastecimiento(insumo_id=insumo, abastecimiento_id=abastecimiento)
+            for abastecimiento in abastecimientos for _ in range(3)
+        ])
+
+    def test_serializar_50_en_consultas_fijas(self):
+        with CaptureQueriesContext(connection) as consultas:
+            datos = AbastecimientoConInsumosSerializer(abastecimientos_con_insumos(), many=True).data
+        self.assertEqual(len(consultas), 2)
+        self.assertEqual(len(datos), 50)
+        self.assertTrue(all(fila['total_insumos'] == 3 for fila in datos))
+        self.assertEqual(datos[0]['insumos'][0]['insumo_nombre'], "Esmalte")
+        self.assertEqual(datos[0]['manicurista_nombre'], "man1 Apellido")
+
+    def test_detalle_y_recientes(self):
+        client = APIClient()
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = client.get(f"/api/abastecimiento/abastecimientos/{self.abastecimiento.pk}/")
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.json()['total_insumos'], 3)
+        self.assertLessEqual(len(consultas), 3)
 
-# Create your tests here.
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = client.get("/api/abastecimiento/abastecimientos/recientes/")
+        self.assertEqual(len(respuesta.json()), 3)
+        self.assertLessEqual(len(consultas), 3)
@@ -7,6 +7,8 @@ from django.shortcuts import get_object_or_404
 from ..models.abastecimiento import Abastecimiento
 from ..models.insumoAbastecimiento import InsumoAbastecimiento
 from ..serializer.insumoAbastecimientoSerializer import InsumoAbastecimientoSerializer
+from insumo.services.inventario import mover_stock, MOVIMIENTO_DEVOLUCION
+from ..services.lineas import reportar_lineas
 
 class InsumoAbastecimientoViewSet(viewsets.ModelViewSet):
     queryset = InsumoAbastecimiento.objects.all()
@@ -32,15 +34,25 @@ class InsumoAbastecimientoViewSet(viewsets.ModelViewSet):
         
         return queryset.order_by('-id')
     
+    def perform_create(self, serializer):
+        instance = serializer.save()
+        Abastecimiento.marcar_reportados([instance.abastecimiento_id_id])
+    
+    def perform_update(self, serializer):
+        anterior = serializer.instance.abastecimiento_id_id
+        instance = serializer.save()
+        Abastecimiento.marcar_reportados({anterior, instance.abastecimiento_id_id})
+    
     @transaction.atomic
     def destroy(self, request, *args, **kwargs):
         """Al eliminar un InsumoAbastecimiento, devolver el stock al insumo"""
         instance = self.get_object()
         
         # Devolver la cantidad al stock del insumo
-        insumo = instance.insumo_id
-        insumo.stock += instance.cantidad
-        insumo.save()
+        mover_stock(
+            instance.insumo_id_id, instance.cantidad, MOVIMIENTO_DEVOLUCION,
+            f"abastecimiento:{instance.abastecimiento_id_id}"
+        )
         
         return super().destroy(request, *args, **kwargs)
     
@@ -57,21 +69,39 @@ class InsumoAbastecimientoViewSet(viewsets.ModelViewSet):
             )
         
         instance.estado = nuevo_estado
-        instance.save()
+        instance.save(update_fields=['estado'])
+        Abastecimiento.marcar_reportados([instance.abastecimiento_id_id])
         
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
     
     @action(detail=False, methods=['get'])
     def por_estado(self, request):
-        """Obtener insumos abastecimiento agrupados por estado"""
+        """
+        Obtener insumos abastecimiento agrupados por estado. Una sola consulta: los conteos
+        salen de la misma pasada y ?limite=N deja solo los N más recientes de cada grupo.
+        """
+        limite = request.query_params.get('limite')
+        try:
+            limite = int(limite) if limite else None
+        except ValueError:
+            return Response({'error': 'limite debe ser un número entero'}, status=status.HTTP_400_BAD_REQUEST)
+        if limite is not None and limite < 0:
+            return Response({'error': 'limite debe ser un número entero'}, status=status.HTTP_400_BAD_REQUEST)
+
+        grupos = {estado_key: [] for estado_key, _ in InsumoAbastecimiento.ESTADOS_CHOICES}
+        conteos = dict.fromkeys(grupos, 0)
+        for insumo in self.get_queryset().filter(estado__in=grupos).select_related('insumo_id', 'abastecimiento_id'):
+            conteos[insumo.estado] += 1
+            if limite is None or len(grupos[insumo.estado]) < limite:
+                grupos[insumo.estado].append(insumo)
+
         estados = {}
         for estado_key, estado_label in InsumoAbastecimiento.ESTADOS_CHOICES:
-            insumos = self.get_queryset().filter(estado=estado_key)
             estados[estado_key] = {
                 'label': estado_label,
-                'count': insumos.count(),
-                'insumos': InsumoAbastecimientoSerializer(insumos, many=True).data
+                'count': conteos[estado_key],
+                'insumos': InsumoAbastecimientoSerializer(grupos[estado_key], many=True).data
             }
         
         return Response(estados)
@@ -95,7 +125,7 @@ class InsumoAbastecimientoViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        if not insumos_reporte:
+        if not isinstance(insumos_reporte, list) or not insumos_reporte:
             return Response(
                 {'error': 'Lista de insumos para reporte requerida'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -109,39 +139,16 @@ class InsumoAbastecimientoViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
         
-        insumos_actualizados = []
-        errores = []
-        
-        with transaction.atomic():
-            for insumo_data in insumos_reporte:
-                try:
-                    insumo_id = insumo_data.get('id')
-                    if not insumo_id:
-                        errores.append("ID de insumo requerido")
-                        continue
-                    
-                    insumo_abastecimiento = InsumoAbastecimiento.objects.get(
-                        id=insumo_id,
-                        abastecimiento_id=abastecimiento
-                    )
-                    
-                    if 'estado' in insumo_data:
-                        insumo_abastecimiento.estado = insumo_data['estado']
-                    if 'comentario' in insumo_data:
-                        insumo_abastecimiento.comentario = insumo_data['comentario']
-                    
-                    insumo_abastecimiento.save()
-                    insumos_actualizados.append({
-                        'id': insumo_abastecimiento.id,
-                        'insumo': insumo_abastecimiento.insumo_id.nombre,
-                        'estado': insumo_abastecimiento.estado,
-                        'comentario': insumo_abastecimiento.comentario
-                    })
-                    
-                except InsumoAbastecimiento.DoesNotExist:
-                    errores.append(f"InsumoAbastecimiento con ID {insumo_id} no encontrado")
-                except Exception as e:
-                    errores.append(f"Error procesando insumo {insumo_id}: {str(e)}")
+        actualizadas, errores = reportar_lineas(abastecimiento, insumos_reporte)
+        insumos_actualizados = [
+            {
+                'id': insumo_abastecimiento.id,
+                'insumo': insumo_abastecimiento.insumo_id.nombre,
+                'estado': insumo_abastecimiento.estado,
+                'comentario': insumo_abastecimiento.comentario
+            }
+            for insumo_abastecimiento in actualizadas
+        ]
         
         abastecimiento.refresh_from_db()
         
@@ -11,12 +11,18 @@ from ..serializer.abastecimientoConInsumos import AbastecimientoConInsumosSerial
 from ..serializer.insumoAbastecimientoSerializer import InsumoAbastecimientoSerializer
 from usuario.models.manicurista_model import Manicurista
 from django.db.models import Count
+from insumo.services.inventario import aplicar_movimientos, MOVIMIENTO_DEVOLUCION
+from ..services.lineas import agregar_lineas
+from ..services.consultas import abastecimientos_con_insumos
 
+from utils.paginacion import PaginacionCursor
 from utils.permisos import TienePermisoModulo
 
 class AbastecimientoViewSet(viewsets.ModelViewSet):
-    queryset = Abastecimiento.objects.all().order_by('-fecha_creacion')
+    queryset = Abastecimiento.objects.select_related('manicurista_id').order_by('-fecha_creacion')
     serializer_class = AbastecimientoSerializer
+    pagination_class = PaginacionCursor
+    orden_cursor = ('-fecha_creacion', 'id')
     permission_classes = [TienePermisoModulo("Abastecimiento")];
     
     def get_serializer_class(self):
@@ -24,11 +30,18 @@ class AbastecimientoViewSet(viewsets.ModelViewSet):
             return AbastecimientoConInsumosSerializer
         return AbastecimientoSerializer
     
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action == 'retrieve':
+            return abastecimientos_con_insumos(queryset)
+        return queryset
+    
     @action(detail=True, methods=['get'])
     def insumos(self, request, pk=None):
         """Obtener todos los insumos de un abastecimiento específico"""
         abastecimiento = self.get_object()
-        insumos = InsumoAbastecimiento.objects.filter(abastecimiento_id=abastecimiento)
+        insumos = InsumoAbastecimiento.objects.filter(abastecimiento_id=abastecimiento) \
+            .select_related('insumo_id', 'abastecimiento_id')
         serializer = InsumoAbastecimientoSerializer(insumos, many=True)
         return Response(serializer.data)
     
@@ -76,39 +89,14 @@ class AbastecimientoViewSet(viewsets.ModelViewSet):
         abastecimiento = self.get_object()
         insumos_data = request.data.get('insumos', [])
 
-        if not insumos_data:
+        if not isinstance(insumos_data, list) or not insumos_data:
             return Response(
                 {'error': 'Se requiere una lista de insumos'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        insumos_creados = []
-        errores = []
-
-        with transaction.atomic():
-            for i, insumo_data in enumerate(insumos_data):
-                try:
-                    insumo_id = insumo_data.get('insumo_id')
-                    if not insumo_id:
-                        errores.append(f"Insumo {i+1}: ID de insumo requerido")
-                        continue
-                    
-                    data = {
-                        'insumo_id': insumo_id,
-                        'abastecimiento_id': abastecimiento.id,
-                        'cantidad': insumo_data.get('cantidad', 1),
-                        'comentario': insumo_data.get('comentario', '')
-                    }
-
-                    serializer = InsumoAbastecimientoSerializer(data=data)
-                    if serializer.is_valid():
-                        insumo_creado = serializer.save()
-                        insumos_creados.append(serializer.data)
-                    else:
-                        errores.append(f"Insumo {i+1}: {serializer.errors}")
-
-                except Exception as e:
-                    errores.append(f"Insumo {i+1}: {str(e)}")
+        creadas, errores = agregar_lineas(abastecimiento, insumos_data)
+        insumos_creados = InsumoAbastecimientoSerializer(creadas, many=True).data
 
         if errores:
             return Response(
@@ -127,19 +115,18 @@ class AbastecimientoViewSet(viewsets.ModelViewSet):
         
     @transaction.atomic
     def perform_destroy(self, instance):
-        for insumo_abast in instance.insumoabastecimiento_set.all():
-            if insumo_abast.estado == 'Sin usar':
-                insumo = insumo_abast.insumo_id
-                insumo.stock += insumo_abast.cantidad
-                insumo.save()
-            insumo_abast.delete()
-
+        # Solo vuelve al inventario lo que no se usó
+        aplicar_movimientos(
+            instance.insumoabastecimiento_set.filter(estado='Sin usar').values_list('insumo_id', 'cantidad'),
+            MOVIMIENTO_DEVOLUCION, f"abastecimiento:{instance.pk}"
+        )
+        instance.insumoabastecimiento_set.all().delete()
         instance.delete()
         
     @action(detail=False, methods=['get'])
     def recientes(self, request):
         """Obtener los 3 abastecimientos más recientes con sus insumos"""
-        abastecimientos = Abastecimiento.objects.all().order_by('-fecha_creacion')[:3]
+        abastecimientos = abastecimientos_con_insumos().order_by('-fecha_creacion')[:3]
         serializer = AbastecimientoConInsumosSerializer(abastecimientos, many=True)
         return Response(serializer.data)
     
@@ -58,6 +58,7 @@ INSTALLED_APPS = [
     'rol',
     'usuario',
     'calificacion',
+    'notificacion',
 ]
 
 MIDDLEWARE = [
@@ -77,13 +78,19 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # Cada plantilla (correos incluidos) se lee y compila una sola vez por proceso
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
         },
     },
 ]
@@ -124,6 +131,11 @@ EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD")
 EMAIL_USE_TLS = os.getenv("EMAIL_USE_TLS")
 
+# Entrega de la bandeja de salida (notificacion)
+CORREO_MENSAJES_POR_SEGUNDO = float(os.getenv("CORREO_MENSAJES_POR_SEGUNDO", 0))  # 0 = sin límite
+CORREO_SUMIDERO = os.getenv("CORREO_SUMIDERO")  # 'memoria' o 'archivo' para pruebas locales
+EMAIL_FILE_PATH = os.getenv("EMAIL_FILE_PATH", BASE_DIR / "correos_enviados")
+
 #parte del jwt
 from datetime import timedelta;
 SIMPLE_JWT = {
@@ -144,13 +156,36 @@ SIMPLE_JWT = {
 
 AUTH_USER_MODEL = 'usuario.Usuario' 
 
+# Llamadas entre servicios (utils/http_client.py)
+SERVICIOS_MS_URL = os.getenv('SERVICIOS_MS_URL', 'http://127.0.0.1:8001/micro-servicios')
+# Secreto compartido con microservicio_servicios para avisar cambios del catálogo; sin valor se rechazan los avisos
+CATALOGO_TOKEN = os.getenv('CATALOGO_TOKEN')
+HTTP_CLIENTE = {
+    'TIMEOUT': 5,           # segundos por intento
+    'REINTENTOS': 2,        # reintentos de métodos idempotentes
+    'BACKOFF': 0.2,         # base del backoff exponencial con jitter
+    'UMBRAL_FALLOS': 5,     # fallos seguidos que abren el circuito
+    'ESPERA_CIRCUITO': 30,  # segundos con el circuito abierto
+    'TAMANO_POOL': 10,      # conexiones keep-alive por servicio
+}
+
 # En settings.py
 REST_FRAMEWORK = {
         'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
     ),
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
-    
+}
+
+# Segundos que se guarda el tablero de citas-venta/tablero/ por semana y manicurista
+TABLERO_CACHE_SEGUNDOS = int(os.getenv('TABLERO_CACHE_SEGUNDOS', '60'))
+
+# Listados con paginación por cursor (citas-venta, servicios-cita, compras, abastecimientos,
+# insumos, usuarios, clientes y manicuristas): se pagina al pedir ?paginar=true, ?tamano=N o
+# ?cursor=...; sin esos parámetros se devuelve la lista completa
+PAGINACION = {
+    'TAMANO': int(os.getenv('PAGINACION_TAMANO', '50')),
+    'TAMANO_MAXIMO': int(os.getenv('PAGINACION_TAMANO_MAXIMO', '500')),
 }
 
 
@@ -16,6 +16,7 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
+from utils.views import metricas_http
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -29,5 +30,6 @@ urlpatterns = [
     path('api/insumo/', include("insumo.urls")),
     path("api/compra/", include("compra.urls")),
     path("api/abastecimiento/", include("abastecimiento.urls")),
+    path("api/metricas-http/", metricas_http),
     
 ]
@@ -6,6 +6,7 @@ from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import get_user_model
 from django.shortcuts import get_object_or_404
+from django.db import transaction
 
 from usuario.models.usuario_model import Usuario
 from usuario.models.cliente_model import Cliente
@@ -99,10 +100,10 @@ class RegistroClienteView(generics.CreateAPIView):
         
         serializer = self.get_serializer(data=data)  # ✅ Usamos `data` en lugar de `request.data`
         serializer.is_valid(raise_exception=True)
-        cliente = serializer.save()
-
-        # ✅ Enviar correo de confirmación después del registro
-        enviar_correo_registro(cliente.usuario.correo,cliente.usuario.nombre)
+        # El correo queda en la bandeja de salida dentro de la misma transacción que el registro
+        with transaction.atomic():
+            cliente = serializer.save()
+            enviar_correo_registro(cliente.usuario.correo,cliente.usuario.nombre)
 
         # ✅ Generar tokens JWT para el usuario recién creado
         refresh = RefreshToken.for_user(cliente.usuario)
@@ -2,6 +2,7 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from django.utils import timezone
+from django.db import transaction
 from django.contrib.auth.hashers import make_password
 from usuario.models.usuario_model import Usuario
 from random import randint
@@ -26,20 +27,21 @@ class SolicitarCodigoRecuperacionView(APIView):
         codigo = f"{randint(100000, 999999)}"
         expiracion = timezone.now() + timedelta(minutes=10)
 
-        # Guardar o actualizar el código en la tabla
-        CodigoRecuperacion.objects.update_or_create(
-            usuario=usuario,
-            defaults={
-                'codigo': codigo,
-                'creado_en': timezone.now(),
-                'expiracion': expiracion
-            }
-        )
-
         asunto = "Código de recuperación de contraseña"
 
-
-        if enviar_correo_recuperacion(correo, asunto, codigo):
-            return Response({"mensaje": "Código enviado al correo."}, status=status.HTTP_200_OK)
-        else:
-            return Response({"error": "Error al enviar el correo."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+        # El código solo se guarda si el correo quedó en la bandeja de salida
+        try:
+            with transaction.atomic():
+                CodigoRecuperacion.objects.update_or_create(
+                    usuario=usuario,
+                    defaults={
+                        'codigo': codigo,
+                        'creado_en': timezone.now(),
+                        'expiracion': expiracion
+                    }
+                )
+                enviar_correo_recuperacion(correo, asunto, codigo)
+        except Exception:
+            return Response({"error": "Error al enviar el correo."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+        return Response({"mensaje": "Código enviado al correo."}, status=status.HTTP_200_OK)
\ No newline at end of file
@@ -2,8 +2,13 @@ from django.contrib import admin
 from .models.cita_venta_model import CitaVenta
 from .models.estado_cita_model import EstadoCita
 from .models.servicio_cita_model import ServicioCita
+from .models.servicio_catalogo_model import ServicioCatalogo
+from .models.resumen_citas_model import ResumenDiarioCitas, ResumenClienteCitas
 # Register your models here.
 
 admin.site.register(EstadoCita)
 admin.site.register(CitaVenta)
 admin.site.register(ServicioCita)
+admin.site.register(ServicioCatalogo)
+admin.site.register(ResumenDiarioCitas)
+admin.site.register(ResumenClienteCitas)
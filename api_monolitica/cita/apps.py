@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class CitaConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'cita'
+
+    def ready(self):
+        # Conecta las señales que invalidan el registro de estados de cita y de compra
+        import utils.estados  # noqa: F401
+        # Y las que mantienen los acumulados diarios de citas e invalidan la cache del tablero
+        from .services import resumen, tablero  # noqa: F401
@@ -0,0 +1,61 @@
+from datetime import date, timedelta
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from usuario.models.manicurista_model import Manicurista
+from cita.services.disponibilidad import disponibilidad_manicurista, disponibilidad_rango
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara el número de consultas y la latencia de calcular la disponibilidad "
+        "una manicurista/fecha a la vez frente al cálculo por lotes del rango completo."
+    )
+
+    ESCENARIOS = [(1, 1), (10, 14)]
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fecha', type=str, default=None, help="Fecha inicial (YYYY-MM-DD), por defecto hoy")
+        parser.add_argument('--repeticiones', type=int, default=5)
+
+    def handle(self, *args, **options):
+        fecha_inicio = date.fromisoformat(options['fecha']) if options['fecha'] else date.today()
+        repeticiones = options['repeticiones']
+
+        self.stdout.write(f"{'escenario':<12}{'modo':<12}{'consultas':>10}{'ms':>10}")
+        for num_manicuristas, num_dias in self.ESCENARIOS:
+            manicurista_ids = list(
+                Manicurista.objects.order_by('pk').values_list('pk', flat=True)[:num_manicuristas]
+            )
+            if len(manicurista_ids) < num_manicuristas:
+                self.stderr.write(
+                    f"Solo hay {len(manicurista_ids)} manicuristas para el escenario {num_manicuristas}x{num_dias}"
+                )
+            fecha_fin = fecha_inicio + timedelta(days=num_dias - 1)
+
+            def por_par():
+                for manicurista_id in manicurista_ids:
+                    for dia in range(num_dias):
+                        disponibilidad_manicurista(manicurista_id, fecha_inicio + timedelta(days=dia))
+
+            def por_lote():
+                disponibilidad_rango(manicurista_ids, fecha_inicio, fecha_fin)
+
+            escenario = f"{num_manicuristas}x{num_dias}"
+            for modo, funcion in (("por par", por_par), ("por lote", por_lote)):
+                consultas, ms = self._medir(funcion, repeticiones)
+                self.stdout.write(f"{escenario:<12}{modo:<12}{consultas:>10}{ms:>10.2f}")
+
+    def _medir(self, funcion, repeticiones):
+        with CaptureQueriesContext(connection) as contexto:
+            funcion()
+        consultas = len(contexto.captured_queries)
+
+        inicio = perf_counter()
+        for _ in range(repeticiones):
+            funcion()
+        ms = (perf_counter() - inicio) * 1000 / repeticiones
+        return consultas, ms
@@ -0,0 +1,39 @@
+from collections import defaultdict
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from cita.models.cita_venta_model import CitaVenta
+from cita.models.servicio_cita_model import ServicioCita
+from cita.services.catalogo import duraciones_servicios
+
+
+class Command(BaseCommand):
+    help = "Recalcula Duracion y HoraFin de las citas a partir de sus servicios."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--desde', type=str, default=None, help="Fecha inicial (YYYY-MM-DD); por defecto todas las citas")
+
+    def handle(self, *args, **options):
+        citas = CitaVenta.objects.all()
+        if options['desde']:
+            citas = citas.filter(Fecha__gte=date.fromisoformat(options['desde']))
+
+        servicios = defaultdict(list)
+        for cita_id, servicio_id in ServicioCita.objects.filter(cita_id__in=citas).values_list('cita_id', 'servicio_id'):
+            servicios[cita_id].append(servicio_id)
+        duraciones = duraciones_servicios(
+            servicio_id for servicio_ids in servicios.values() for servicio_id in servicio_ids
+        )
+
+        actualizadas = []
+        for cita in citas.only('id', 'Hora', 'Duracion', 'HoraFin'):
+            cita.Duracion = sum((duraciones[servicio_id] for servicio_id in servicios[cita.id]), timedelta())
+            cita.HoraFin = CitaVenta.calcular_hora_fin(cita.Hora, cita.Duracion)
+            actualizadas.append(cita)
+
+        with transaction.atomic():
+            CitaVenta.objects.bulk_update(actualizadas, ['Duracion', 'HoraFin'], batch_size=500)
+
+        self.stdout.write(self.style.SUCCESS(f"{len(actualizadas)} citas recalculadas"))
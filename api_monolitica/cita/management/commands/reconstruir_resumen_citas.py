@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from cita.services.resumen import reconstruir_resumen
+
+
+class Command(BaseCommand):
+    help = "Recalcula desde cero los acumulados diarios y por cliente que usan los tableros de citas."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=1000, help="Filas por inserción")
+
+    def handle(self, *args, **options):
+        diarias, clientes = reconstruir_resumen(options['lote'])
+        self.stdout.write(self.style.SUCCESS(f"{diarias} filas diarias y {clientes} filas por cliente reconstruidas"))
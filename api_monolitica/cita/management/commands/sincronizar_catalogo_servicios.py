@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+
+import requests
+
+from cita.services.catalogo import sincronizar_catalogo
+
+
+class Command(BaseCommand):
+    help = "Sincroniza la réplica local del catálogo de servicios desde microservicio_servicios (pensado para cron)."
+
+    def handle(self, *args, **options):
+        try:
+            resumen = sincronizar_catalogo()
+        except requests.exceptions.RequestException as e:
+            raise CommandError(f"No se pudo conectar con el microservicio de servicios: {e}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Catálogo sincronizado: {resumen['creados']} creados, "
+            f"{resumen['actualizados']} actualizados, {resumen['eliminados']} eliminados"
+        ))
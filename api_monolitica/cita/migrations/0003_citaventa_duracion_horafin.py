@@ -0,0 +1,40 @@
+# Generated by Django 5.2 on 2026-10-17 17:52
+
+import datetime
+from django.db import migrations, models
+
+
+def inicializar_hora_fin(apps, schema_editor):
+    # Las citas existentes quedan con duración 0 aquí; 0011 las recalcula con el catálogo replicado
+    CitaVenta = apps.get_model('cita', 'CitaVenta')
+    CitaVenta.objects.update(HoraFin=models.F('Hora'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cita', '0002_initial'),
+        ('usuario', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='citaventa',
+            name='Duracion',
+            field=models.DurationField(default=datetime.timedelta(0)),
+        ),
+        migrations.AddField(
+            model_name='citaventa',
+            name='HoraFin',
+            field=models.TimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(inicializar_hora_fin, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='citaventa',
+            index=models.Index(fields=['manicurista_id', 'Fecha', 'Hora'], name='cita_agenda_manicurista_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='citaventa',
+            index=models.Index(fields=['cliente_id', 'Fecha', 'Hora'], name='cita_agenda_cliente_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2 on 2026-10-17 17:54
+
+import datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cita', '0003_citaventa_duracion_horafin'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ServicioCatalogo',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('nombre', models.CharField(max_length=40)),
+                ('precio', models.DecimalField(decimal_places=2, default=0.0, max_digits=10)),
+                ('duracion', models.DurationField(default=datetime.timedelta(seconds=1800))),
+                ('estado', models.CharField(default='Activo', max_length=40)),
+                ('sincronizado', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
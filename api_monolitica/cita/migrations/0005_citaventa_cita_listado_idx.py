@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-17 18:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cita', '0004_serviciocatalogo'),
+        ('usuario', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='citaventa',
+            index=models.Index(fields=['Fecha', 'Hora', 'id'], name='cita_listado_idx'),
+        ),
+    ]
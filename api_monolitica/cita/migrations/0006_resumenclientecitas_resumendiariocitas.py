@@ -0,0 +1,68 @@
+# Generated by Django 5.2 on 2026-10-17 18:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def poblar_resumen(apps, schema_editor):
+    CitaVenta = apps.get_model('cita', 'CitaVenta')
+    ResumenDiarioCitas = apps.get_model('cita', 'ResumenDiarioCitas')
+    ResumenClienteCitas = apps.get_model('cita', 'ResumenClienteCitas')
+    ResumenDiarioCitas.objects.bulk_create([
+        ResumenDiarioCitas(
+            fecha=fila['Fecha'], manicurista_id_id=fila['manicurista_id'], estado_id_id=fila['estado_id'],
+            cantidad=fila['cantidad'], total=fila['total'] or 0,
+        )
+        for fila in CitaVenta.objects.order_by().values('Fecha', 'manicurista_id', 'estado_id')
+        .annotate(cantidad=Count('id'), total=Sum('Total'))
+    ], batch_size=1000)
+    ResumenClienteCitas.objects.bulk_create([
+        ResumenClienteCitas(
+            cliente_id_id=fila['cliente_id'], estado_id_id=fila['estado_id'],
+            cantidad=fila['cantidad'], total=fila['total'] or 0,
+        )
+        for fila in CitaVenta.objects.order_by().values('cliente_id', 'estado_id')
+        .annotate(cantidad=Count('id'), total=Sum('Total'))
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cita', '0005_citaventa_cita_listado_idx'),
+        ('usuario', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumenClienteCitas',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cantidad', models.IntegerField(default=0)),
+                ('total', models.DecimalField(decimal_places=2, default=0.0, max_digits=14)),
+                ('cliente_id', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='usuario.cliente')),
+                ('estado_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='cita.estadocita')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['estado_id', '-cantidad'], name='resumen_cliente_top_idx')],
+                'constraints': [models.UniqueConstraint(fields=('cliente_id', 'estado_id'), name='resumen_cliente_unico')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ResumenDiarioCitas',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField()),
+                ('cantidad', models.IntegerField(default=0)),
+                ('total', models.DecimalField(decimal_places=2, default=0.0, max_digits=14)),
+                ('estado_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='cita.estadocita')),
+                ('manicurista_id', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='usuario.manicurista')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['estado_id', 'fecha'], name='resumen_diario_estado_idx')],
+                'constraints': [models.UniqueConstraint(fields=('fecha', 'manicurista_id', 'estado_id'), name='resumen_diario_unico')],
+            },
+        ),
+        migrations.RunPython(poblar_resumen, migrations.RunPython.noop),
+    ]
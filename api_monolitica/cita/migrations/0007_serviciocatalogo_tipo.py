@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-17 18:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cita', '0006_resumenclientecitas_resumendiariocitas'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='serviciocatalogo',
+            name='tipo',
+            field=models.CharField(default='Manicure', max_length=40),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2 on 2026-10-17 18:33
+
+import django.db.models.functions.comparison
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def reconstruir_resumen(apps, schema_editor):
+    # Junta las filas duplicadas con manicurista o cliente NULL y corrige lo que
+    # se haya desviado por QuerySet.update() antes de crear los índices nuevos
+    CitaVenta = apps.get_model('cita', 'CitaVenta')
+    ResumenDiarioCitas = apps.get_model('cita', 'ResumenDiarioCitas')
+    ResumenClienteCitas = apps.get_model('cita', 'ResumenClienteCitas')
+    ResumenDiarioCitas.objects.all().delete()
+    ResumenClienteCitas.objects.all().delete()
+    ResumenDiarioCitas.objects.bulk_create([
+        ResumenDiarioCitas(
+            fecha=fila['Fecha'], manicurista_id_id=fila['manicurista_id'], estado_id_id=fila['estado_id'],
+            cantidad=fila['cantidad'], total=fila['total'] or 0,
+        )
+        for fila in CitaVenta.objects.order_by().values('Fecha', 'manicurista_id', 'estado_id')
+        .annotate(cantidad=Count('id'), total=Sum('Total'))
+    ], batch_size=1000)
+    ResumenClienteCitas.objects.bulk_create([
+        ResumenClienteCitas(
+            cliente_id_id=fila['cliente_id'], estado_id_id=fila['estado_id'],
+            cantidad=fila['cantidad'], total=fila['total'] or 0,
+        )
+        for fila in CitaVenta.objects.order_by().values('cliente_id', 'estado_id')
+        .annotate(cantidad=Count('id'), total=Sum('Total'))
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cita', '0007_serviciocatalogo_tipo'),
+        ('usuario', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='resumenclientecitas',
+            name='resumen_cliente_unico',
+        ),
+        migrations.RemoveConstraint(
+            model_name='resumendiariocitas',
+            name='resumen_diario_unico',
+        ),
+        migrations.RunPython(reconstruir_resumen, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='resumenclientecitas',
+            constraint=models.UniqueConstraint(django.db.models.functions.comparison.Coalesce('cliente_id', models.Value(0)), models.F('estado_id'), name='resumen_cliente_unico'),
+        ),
+        migrations.AddConstraint(
+            model_name='resumendiariocitas',
+            constraint=models.UniqueConstraint(models.F('fecha'), django.db.models.functions.comparison.Coalesce('manicurista_id', models.Value(0)), models.F('estado_id'), name='resumen_diario_unico'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+from datetime import time
+
+from django.db import migrations
+from django.db.models import F
+
+
+def topar_hora_fin(apps, schema_editor):
+    # Las citas que pasaban de medianoche guardaron una HoraFin anterior a Hora
+    CitaVenta = apps.get_model('cita', 'CitaVenta')
+    CitaVenta.objects.filter(HoraFin__lt=F('Hora')).update(HoraFin=time.max)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cita', '0008_resumen_unico_sin_persona'),
+    ]
+
+    operations = [
+        migrations.RunPython(topar_hora_fin, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-17 18:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cita', '0009_citaventa_horafin_medianoche'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='serviciocita',
+            index=models.Index(fields=['cita_id', 'id'], name='servicio_cita_cursor_idx'),
+        ),
+    ]
@@ -0,0 +1,42 @@
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+
+from django.db import migrations
+
+# La misma que cita/services/catalogo.py usa para los servicios que no están replicados
+DURACION_POR_DEFECTO = timedelta(minutes=30)
+
+
+def calcular_duraciones(apps, schema_editor):
+    # Las citas creadas antes de 0003 quedaron con Duracion 0 y _citas_activas las ignora:
+    # se suman sus servicios con el catálogo local para que vuelvan a ocupar la agenda
+    CitaVenta = apps.get_model('cita', 'CitaVenta')
+    ServicioCita = apps.get_model('cita', 'ServicioCita')
+    ServicioCatalogo = apps.get_model('cita', 'ServicioCatalogo')
+
+    duraciones = dict(ServicioCatalogo.objects.values_list('id', 'duracion'))
+    pendientes = CitaVenta.objects.filter(Duracion=timedelta(0))
+    servicios = defaultdict(list)
+    for cita_id, servicio_id in ServicioCita.objects.filter(cita_id__in=pendientes).values_list('cita_id', 'servicio_id'):
+        servicios[cita_id].append(servicio_id)
+
+    actualizadas = []
+    for cita in pendientes.filter(id__in=servicios.keys()).only('id', 'Hora', 'Duracion', 'HoraFin'):
+        cita.Duracion = sum(
+            (duraciones.get(servicio_id) or DURACION_POR_DEFECTO for servicio_id in servicios[cita.id]), timedelta()
+        )
+        fin = datetime.combine(date.min, cita.Hora) + cita.Duracion
+        cita.HoraFin = fin.time() if fin.date() == date.min else time.max
+        actualizadas.append(cita)
+    CitaVenta.objects.bulk_update(actualizadas, ['Duracion', 'HoraFin'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cita', '0010_serviciocita_servicio_cita_cursor_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(calcular_duraciones, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,5 @@
+from datetime import date, datetime, time, timedelta
+
 from django.db import models
 
 from ..models.estado_cita_model import EstadoCita
@@ -24,6 +26,31 @@ class CitaVenta(models.Model):
     
     Total = models.DecimalField(max_digits=10,decimal_places=2,null=False,default=0.00)
     
+    # Suma de la duración de los servicios de la cita, se mantiene al cambiar sus ServicioCita
+    Duracion = models.DurationField(null=False,default=timedelta(0))
+    
+    HoraFin = models.TimeField(null=True,blank=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['manicurista_id', 'Fecha', 'Hora'], name='cita_agenda_manicurista_idx'),
+            models.Index(fields=['cliente_id', 'Fecha', 'Hora'], name='cita_agenda_cliente_idx'),
+            models.Index(fields=['Fecha', 'Hora', 'id'], name='cita_listado_idx'),
+        ]
+    
+    @staticmethod
+    def calcular_hora_fin(hora, duracion):
+        """Hora + duración; si la cita pasa de medianoche ocupa hasta el final del día en vez de dar la vuelta."""
+        fin = datetime.combine(date.min, hora) + duracion
+        return fin.time() if fin.date() == date.min else time.max
+
+    def save(self, *args, **kwargs):
+        self.HoraFin = self.calcular_hora_fin(self.Hora, self.Duracion)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'HoraFin'}
+        super().save(*args, **kwargs)
+    
     def __str__(self):
         return f"{self.estado_id} - {self.manicurista_id} - {self.cliente_id} - {self.Fecha}- {self.Hora} - {self.Descripcion} - {self.Total}";
 
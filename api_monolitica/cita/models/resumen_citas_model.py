@@ -0,0 +1,54 @@
+from django.db import models
+from django.db.models.functions import Coalesce
+
+from ..models.estado_cita_model import EstadoCita
+from usuario.models.manicurista_model import Manicurista
+from usuario.models.cliente_model import Cliente
+
+class ResumenDiarioCitas(models.Model):
+    # Acumulado de citas por día, manicurista y estado; lo mantiene cita/services/resumen.py
+    fecha = models.DateField(null=False)
+    
+    manicurista_id = models.ForeignKey(Manicurista,on_delete=models.SET_NULL,null=True,blank=True)
+    
+    estado_id = models.ForeignKey(EstadoCita,on_delete=models.CASCADE,null=False)
+    
+    cantidad = models.IntegerField(null=False,default=0)
+    
+    total = models.DecimalField(max_digits=14,decimal_places=2,null=False,default=0.00)
+    
+    class Meta:
+        constraints = [
+            # NULL no choca con NULL en un índice único: las citas sin manicurista se cuentan con clave 0
+            models.UniqueConstraint(
+                'fecha', Coalesce('manicurista_id', models.Value(0)), 'estado_id', name='resumen_diario_unico'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['estado_id', 'fecha'], name='resumen_diario_estado_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.fecha} - {self.manicurista_id} - {self.estado_id} - {self.cantidad} - {self.total}";
+
+
+class ResumenClienteCitas(models.Model):
+    # Acumulado de citas por cliente y estado, para el top de clientes
+    cliente_id = models.ForeignKey(Cliente,on_delete=models.SET_NULL,null=True,blank=True)
+    
+    estado_id = models.ForeignKey(EstadoCita,on_delete=models.CASCADE,null=False)
+    
+    cantidad = models.IntegerField(null=False,default=0)
+    
+    total = models.DecimalField(max_digits=14,decimal_places=2,null=False,default=0.00)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(Coalesce('cliente_id', models.Value(0)), 'estado_id', name='resumen_cliente_unico'),
+        ]
+        indexes = [
+            models.Index(fields=['estado_id', '-cantidad'], name='resumen_cliente_top_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.cliente_id} - {self.estado_id} - {self.cantidad} - {self.total}";
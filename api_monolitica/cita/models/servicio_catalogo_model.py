@@ -0,0 +1,22 @@
+from datetime import timedelta
+
+from django.db import models
+
+class ServicioCatalogo(models.Model):
+    # Réplica de solo lectura del Servicio de microservicio_servicios, con el mismo id
+    id = models.IntegerField(primary_key=True)
+    
+    nombre = models.CharField(max_length=40,null=False)
+    
+    precio = models.DecimalField(max_digits=10,decimal_places=2,null=False,default=0.00)
+    
+    duracion = models.DurationField(default=timedelta(minutes=30))
+    
+    estado = models.CharField(max_length=40,null=False,default="Activo")
+    
+    tipo = models.CharField(max_length=40,null=False,default="Manicure")
+    
+    sincronizado = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"{self.id} - {self.nombre} - {self.precio} - {self.estado}";
@@ -9,5 +9,11 @@ class ServicioCita(models.Model):
     servicio_id = models.IntegerField(null=False,blank=False)
     subtotal = models.DecimalField(max_digits=10,decimal_places=2,null=False,default=0.00)
     
+    class Meta:
+        indexes = [
+            # Orden del cursor de servicios-cita/
+            models.Index(fields=['cita_id', 'id'], name='servicio_cita_cursor_idx'),
+        ]
+    
     def __str__(self):
         return f"{self.cita_id} - {self.servicio_id} - {self.subtotal}";
@@ -3,10 +3,10 @@ from datetime import datetime, timedelta
 from django.utils import timezone
 from usuario.models.manicurista_model import Manicurista
 from usuario.models.cliente_model import Cliente
-from manicurista.models.novedades_model import Novedades
 from ..models.cita_venta_model import CitaVenta
 from ..models.estado_cita_model import EstadoCita
-from ..models.servicio_cita_model import ServicioCita
+from ..services.disponibilidad import buscar_novedad_solapada, buscar_cita_solapada
+from utils.estados import estados_cita
 
 class CitaVentaSerializer(serializers.ModelSerializer):
     cliente_id = serializers.PrimaryKeyRelatedField(queryset=Cliente.objects.all())
@@ -30,7 +30,10 @@ class CitaVentaSerializer(serializers.ModelSerializer):
             'Hora',
             'Descripcion',
             'Total',
+            'Duracion',
+            'HoraFin',
         ]
+        read_only_fields = ['Duracion', 'HoraFin']
 
     def get_cliente_nombre(self, obj):
         if obj.cliente_id:
@@ -43,8 +46,12 @@ class CitaVentaSerializer(serializers.ModelSerializer):
         return "Sin asignar"
 
     def get_estado_nombre(self, obj):
-        if obj.estado_id:
-            return obj.estado_id.Estado
+        # Se resuelve con el registro de estados para no cargar la relación en cada fila
+        if obj.estado_id_id:
+            try:
+                return estados_cita.por_id(obj.estado_id_id).Estado
+            except EstadoCita.DoesNotExist:
+                pass
         return "Estado desconocido"
 
     def validate(self, data):
@@ -97,54 +104,31 @@ class CitaVentaSerializer(serializers.ModelSerializer):
             )
 
             if cambios_en_agenda:
+                excluir_id = instance.id if instance else None
+
                 # Validación de novedades
-                novedades = Novedades.objects.filter(manicurista_id=manicurista, Fecha=fecha)
-                for novedad in novedades:
-                    if novedad.HoraEntrada <= hora < novedad.HoraSalida:
-                        raise serializers.ValidationError(
-                            f"La manicurista tiene una novedad desde {novedad.HoraEntrada} hasta {novedad.HoraSalida} el {novedad.Fecha}."
-                        )
+                novedad = buscar_novedad_solapada(manicurista, fecha, nueva_inicio, nueva_fin)
+                if novedad:
+                    raise serializers.ValidationError(
+                        f"La manicurista tiene una novedad desde {novedad.HoraEntrada} hasta {novedad.HoraSalida} el {novedad.Fecha}."
+                    )
 
                 # Validación de citas de la manicurista
-                citas_existentes = CitaVenta.objects.filter(
-                    manicurista_id=manicurista,
-                    Fecha=fecha,
-                    estado_id__Estado__in=["Pendiente", "En proceso"]
-                ).exclude(id=instance.id if instance else None)
-
-                for cita in citas_existentes:
-                    servicios_cita = ServicioCita.objects.filter(cita_id=cita.id)
-                    if not servicios_cita.exists():
-                        continue
-
-                    duracion = sum((sc.servicio_id.duracion for sc in servicios_cita), timedelta())
-                    cita_inicio = datetime.combine(cita.Fecha, cita.Hora)
-                    cita_fin = cita_inicio + duracion
-
-                    if nueva_inicio < cita_fin and nueva_fin > cita_inicio:
-                        raise serializers.ValidationError(
-                            f"La manicurista ya tiene una cita de {cita_inicio.time()} a {cita_fin.time()} ese día."
-                        )
+                cita = buscar_cita_solapada(
+                    fecha, nueva_inicio, nueva_fin, manicurista=manicurista, excluir_id=excluir_id
+                )
+                if cita:
+                    raise serializers.ValidationError(
+                        f"La manicurista ya tiene una cita de {cita.Hora} a {cita.HoraFin} ese día."
+                    )
 
                 # Validación de citas del cliente
-                citas_cliente = CitaVenta.objects.filter(
-                    cliente_id=cliente,
-                    Fecha=fecha,
-                    estado_id__Estado__in=["Pendiente", "En proceso"]
-                ).exclude(id=instance.id if instance else None)
-
-                for cita in citas_cliente:
-                    servicios_cita = ServicioCita.objects.filter(cita_id=cita.id)
-                    if not servicios_cita.exists():
-                        continue
-
-                    duracion = sum((sc.servicio_id.duracion for sc in servicios_cita), timedelta())
-                    cita_inicio = datetime.combine(cita.Fecha, cita.Hora)
-                    cita_fin = cita_inicio + duracion
-
-                    if nueva_inicio < cita_fin and nueva_fin > cita_inicio:
-                        raise serializers.ValidationError(
-                            f"El cliente ya tiene una cita de {cita_inicio.time()} a {cita_fin.time()} ese día."
-                        )
+                cita = buscar_cita_solapada(
+                    fecha, nueva_inicio, nueva_fin, cliente=cliente, excluir_id=excluir_id
+                )
+                if cita:
+                    raise serializers.ValidationError(
+                        f"El cliente ya tiene una cita de {cita.Hora} a {cita.HoraFin} ese día."
+                    )
 
         return data
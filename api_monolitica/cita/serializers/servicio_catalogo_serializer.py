@@ -0,0 +1,7 @@
+from rest_framework import serializers
+from ..models.servicio_catalogo_model import ServicioCatalogo
+
+class ServicioCatalogoSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ServicioCatalogo
+        fields = ['id', 'nombre', 'precio', 'duracion', 'estado', 'tipo', 'sincronizado']
@@ -1,15 +1,15 @@
 from rest_framework import serializers
 from django.db import models
 from datetime import date, time
-import requests;
 
 # from servicio.models import Servicio 
 from ..models.cita_venta_model import CitaVenta
 from ..models.servicio_cita_model import ServicioCita
-SERVICIO_MS_URL = "http://127.0.0.1:8001/micro-servicios/servicio/"
+from ..services.catalogo import asegurar_servicios, obtener_servicio
+from ..services.disponibilidad import actualizar_duracion_cita
 
 class ServicioCitaSerializer(serializers.ModelSerializer):
-    servicio_nombre = serializers.CharField(source='servicio_id.nombre', read_only=True)
+    servicio_nombre = serializers.SerializerMethodField()
     class Meta:
         model = ServicioCita
         fields = ('id', 'cita_id', 'servicio_id', 'subtotal', 'servicio_nombre')
@@ -21,15 +21,18 @@ class ServicioCitaSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("La cita no existe")
         return cita_id
 
+    def get_servicio_nombre(self, obj):
+        servicio = obtener_servicio(obj.servicio_id)
+        return servicio.nombre if servicio else None
+
     def validate_servicio_id(self, servicio_id):
-        try:
-            response = requests.get(f"{SERVICIO_MS_URL}{servicio_id}/")
-            if response.status_code != 200:
-                raise serializers.ValidationError("El servicio no existe o no está disponible.")
-            servicio_data = response.json()
-            self.servicio_precio = servicio_data.get('precio', 0)
-        except requests.exceptions.RequestException:
-            raise serializers.ValidationError("No se pudo conectar con el microservicio de servicios.")
+        servicio = obtener_servicio(servicio_id)
+        if servicio is None:
+            # Puede ser un servicio recién creado que aún no está en la réplica local
+            servicio = asegurar_servicios([servicio_id])[0].get(servicio_id)
+        if servicio is None:
+            raise serializers.ValidationError("El servicio no existe o no está disponible.")
+        self.servicio_precio = servicio.precio
         return servicio_id
 
     def validate_subtotal(self, subtotal):
@@ -72,4 +75,5 @@ class ServicioCitaSerializer(serializers.ModelSerializer):
             total=models.Sum('subtotal')
         )['total'] or 0
         cita.Total = nuevo_total
-        cita.save()
\ No newline at end of file
+        cita.save()
+        actualizar_duracion_cita(cita)
\ No newline at end of file
@@ -0,0 +1,157 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_duration
+
+from utils.http_client import obtener_cliente
+from ..models.servicio_catalogo_model import ServicioCatalogo
+
+CACHE_KEY = "catalogo_servicios"
+CACHE_TIMEOUT = 300
+
+DURACION_POR_DEFECTO = timedelta(minutes=30)
+
+
+def cliente_servicios():
+    """
+    Cliente HTTP compartido hacia el microservicio de servicios (settings.SERVICIOS_MS_URL).
+    """
+    return obtener_cliente('servicios', settings.SERVICIOS_MS_URL)
+
+
+def catalogo_servicios():
+    """
+    Catálogo local completo {id: ServicioCatalogo}, cacheado en memoria del proceso.
+    Cada sincronización invalida la cache; en otros procesos expira tras CACHE_TIMEOUT.
+    """
+    servicios = cache.get(CACHE_KEY)
+    if servicios is None:
+        servicios = ServicioCatalogo.objects.in_bulk()
+        cache.set(CACHE_KEY, servicios, CACHE_TIMEOUT)
+    return servicios
+
+
+def obtener_servicio(servicio_id):
+    """
+    Servicio del catálogo local o None si no está replicado.
+    """
+    return catalogo_servicios().get(servicio_id)
+
+
+def nombre_servicio(catalogo, servicio_id):
+    servicio = catalogo.get(servicio_id)
+    return servicio.nombre if servicio else f"Servicio {servicio_id}"
+
+
+def duraciones_servicios(servicio_ids):
+    """
+    Duración de cada servicio según el catálogo local, sin llamadas HTTP.
+    Los servicios que no están replicados usan la duración por defecto.
+    """
+    catalogo = catalogo_servicios()
+    return {
+        servicio_id: catalogo[servicio_id].duracion if servicio_id in catalogo else DURACION_POR_DEFECTO
+        for servicio_id in set(servicio_ids)
+    }
+
+
+def _guardar_servicios(datos):
+    """
+    Inserta o actualiza en la réplica local los servicios recibidos del microservicio.
+    Devuelve (ids recibidos, creados, actualizados).
+    """
+    ahora = timezone.now()
+    remotos = {}
+    for dato in datos:
+        remotos[dato['id']] = ServicioCatalogo(
+            id=dato['id'],
+            nombre=dato['nombre'],
+            precio=Decimal(str(dato.get('precio') or 0)),
+            duracion=parse_duration(dato.get('duracion') or '') or DURACION_POR_DEFECTO,
+            estado=dato.get('estado', 'Activo'),
+            tipo=dato.get('tipo', 'Manicure'),
+            sincronizado=ahora,
+        )
+
+    existentes = set(ServicioCatalogo.objects.filter(id__in=remotos.keys()).values_list('id', flat=True))
+    nuevos = [servicio for servicio_id, servicio in remotos.items() if servicio_id not in existentes]
+    actualizados = [servicio for servicio_id, servicio in remotos.items() if servicio_id in existentes]
+
+    ServicioCatalogo.objects.bulk_create(nuevos)
+    ServicioCatalogo.objects.bulk_update(actualizados, ['nombre', 'precio', 'duracion', 'estado', 'tipo', 'sincronizado'])
+    return remotos.keys(), len(nuevos), len(actualizados)
+
+
+def sincronizar_catalogo():
+    """
+    Descarga todos los servicios del microservicio en una sola petición y actualiza la réplica local.
+    """
+    response = cliente_servicios().get('servicio/', timeout=10)
+    response.raise_for_status()
+
+    with transaction.atomic():
+        recibidos, creados, actualizados = _guardar_servicios(response.json())
+        eliminados, _ = ServicioCatalogo.objects.exclude(id__in=recibidos).delete()
+
+    cache.delete(CACHE_KEY)
+
+    return {
+        "creados": creados,
+        "actualizados": actualizados,
+        "eliminados": eliminados
+    }
+
+
+def aplicar_cambio_catalogo(servicio=None, eliminado=None):
+    """
+    Aplica en la réplica el servicio que el microservicio avisó como creado o actualizado,
+    o borra el eliminado, sin volver a descargar el catálogo.
+    """
+    with transaction.atomic():
+        if servicio is not None:
+            _guardar_servicios([servicio])
+        if eliminado is not None:
+            ServicioCatalogo.objects.filter(id=eliminado).delete()
+    cache.delete(CACHE_KEY)
+
+
+def asegurar_servicios(servicio_ids):
+    """
+    Devuelve {id: ServicioCatalogo} para los ids pedidos. Los que faltan en la réplica se piden
+    al endpoint bulk del microservicio en una sola llamada y se guardan localmente.
+    Los ids que siguen sin existir se devuelven en el segundo elemento con el motivo.
+    """
+    servicio_ids = set(servicio_ids)
+    catalogo = catalogo_servicios()
+    faltantes = servicio_ids - catalogo.keys()
+    errores = {}
+
+    if faltantes:
+        try:
+            # Es una consulta, así que el POST se puede reintentar sin efectos secundarios
+            response = cliente_servicios().post(
+                'servicio/bulk/', json={"ids": sorted(faltantes)}, reintentar=True
+            )
+            response.raise_for_status()
+            datos = response.json()
+            with transaction.atomic():
+                _guardar_servicios(datos.get('servicios', []))
+            cache.delete(CACHE_KEY)
+            catalogo = catalogo_servicios()
+            errores = {
+                servicio_id: datos.get('errores', {}).get(str(servicio_id), "El servicio no existe")
+                for servicio_id in faltantes - catalogo.keys()
+            }
+        except requests.exceptions.RequestException:
+            errores = {
+                servicio_id: "No se pudo conectar con el microservicio de servicios."
+                for servicio_id in faltantes
+            }
+
+    encontrados = {servicio_id: catalogo[servicio_id] for servicio_id in servicio_ids if servicio_id in catalogo}
+    return encontrados, errores
@@ -0,0 +1,57 @@
+from decimal import Decimal
+
+from django.db.models import Count, Sum
+
+from utils.estados import estados_cita, ESTADO_CITA_TERMINADA
+from ..models.cita_venta_model import CitaVenta
+
+CAMPOS_CITA = [
+    'id', 'cliente_id', 'manicurista_id', 'estado_id', 'Fecha', 'Hora',
+    'Descripcion', 'Total', 'Duracion', 'HoraFin',
+]
+CAMPOS_RELACIONADOS = [
+    'cliente_id__nombre', 'cliente_id__apellido',
+    'manicurista_id__nombre', 'manicurista_id__apellido',
+]
+
+
+def citas_para_serializar(queryset=None):
+    """
+    Queryset de citas listo para CitaVentaSerializer: cliente y manicurista vienen en el
+    mismo JOIN con solo las columnas que se muestran. El nombre del estado sale del
+    registro de estados, así que serializar N citas cuesta una sola consulta.
+    """
+    if queryset is None:
+        queryset = CitaVenta.objects.all()
+    return queryset.select_related('cliente_id', 'manicurista_id').only(*CAMPOS_CITA, *CAMPOS_RELACIONADOS)
+
+
+def totales_citas_terminadas(manicurista_id, fecha_inicial, fecha_final):
+    """
+    Cantidad y suma de Total de las citas terminadas del manicurista en el rango, en una
+    sola consulta agregada. Devuelve {'cantidad': int, 'total': Decimal}.
+    """
+    totales = CitaVenta.objects.filter(
+        manicurista_id=manicurista_id,
+        estado_id=estados_cita.id(ESTADO_CITA_TERMINADA),
+        Fecha__range=[fecha_inicial, fecha_final]
+    ).aggregate(cantidad=Count('id'), total=Sum('Total'))
+    return {'cantidad': totales['cantidad'], 'total': totales['total'] or Decimal('0')}
+
+
+def totales_terminadas_por_manicurista(fecha_inicial, fecha_final, manicurista_ids=None):
+    """
+    Igual que totales_citas_terminadas pero para todos los manicuristas en un solo GROUP BY.
+    Devuelve {manicurista_id: {'cantidad': int, 'total': Decimal}}; quien no tiene citas no aparece.
+    """
+    citas = CitaVenta.objects.filter(
+        estado_id=estados_cita.id(ESTADO_CITA_TERMINADA),
+        Fecha__range=[fecha_inicial, fecha_final],
+        manicurista_id__isnull=False
+    )
+    if manicurista_ids is not None:
+        citas = citas.filter(manicurista_id__in=manicurista_ids)
+    return {
+        fila['manicurista_id']: {'cantidad': fila['cantidad'], 'total': fila['total'] or Decimal('0')}
+        for fila in citas.order_by().values('manicurista_id').annotate(cantidad=Count('id'), total=Sum('Total'))
+    }
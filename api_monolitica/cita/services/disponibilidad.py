@@ -0,0 +1,220 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from manicurista.models.novedades_model import Novedades
+from utils.estados import estados_cita, ESTADO_CITA_PENDIENTE, ESTADO_CITA_EN_PROCESO
+from ..models.cita_venta_model import CitaVenta
+from ..models.servicio_cita_model import ServicioCita
+from .catalogo import duraciones_servicios
+
+JORNADA_INICIO = time(8, 0)
+JORNADA_FIN = time(17, 30)
+INTERVALO = timedelta(minutes=30)
+MARGEN_CITA = timedelta(minutes=30)
+MAX_DIAS_RANGO = 31
+
+ESTADOS_ACTIVOS = [ESTADO_CITA_PENDIENTE, ESTADO_CITA_EN_PROCESO]
+
+
+def fusionar_intervalos(intervalos):
+    """
+    Ordena una lista de intervalos (inicio, fin) y une los que se solapan o se tocan.
+    """
+    fusionados = []
+    for inicio, fin in sorted(intervalos):
+        if fusionados and inicio <= fusionados[-1][1]:
+            if fin > fusionados[-1][1]:
+                fusionados[-1] = (fusionados[-1][0], fin)
+        else:
+            fusionados.append((inicio, fin))
+    return fusionados
+
+
+def cargar_novedades(manicurista, fecha):
+    """
+    Intervalos (inicio, fin) de las novedades de la manicurista en la fecha, en una sola consulta.
+    """
+    return [
+        (datetime.combine(fecha, entrada), datetime.combine(fecha, salida))
+        for entrada, salida in Novedades.objects.filter(
+            manicurista_id=manicurista,
+            Fecha=fecha
+        ).values_list('HoraEntrada', 'HoraSalida')
+    ]
+
+
+def actualizar_duracion_cita(cita):
+    """
+    Recalcula la duración guardada de la cita a partir de sus servicios.
+    CitaVenta.save mantiene HoraFin sincronizada con Hora + Duracion.
+    """
+    servicio_ids = list(ServicioCita.objects.filter(cita_id=cita).values_list('servicio_id', flat=True))
+    duraciones = duraciones_servicios(servicio_ids)
+    cita.Duracion = sum((duraciones[servicio_id] for servicio_id in servicio_ids), timedelta())
+    cita.save(update_fields=['Duracion'])
+
+
+def _citas_activas():
+    # Las citas sin servicios tienen duración 0 y no ocupan la agenda
+    return CitaVenta.objects.filter(
+        estado_id__in=estados_cita.ids_existentes(*ESTADOS_ACTIVOS),
+        Duracion__gt=timedelta(0)
+    )
+
+
+def cargar_citas(fecha, manicurista=None, cliente=None, excluir_id=None):
+    """
+    Intervalos (inicio, fin) de las citas activas del día para una manicurista o un cliente.
+    """
+    citas = _citas_activas().filter(Fecha=fecha)
+    if manicurista is not None:
+        citas = citas.filter(manicurista_id=manicurista)
+    if cliente is not None:
+        citas = citas.filter(cliente_id=cliente)
+    if excluir_id is not None:
+        citas = citas.exclude(id=excluir_id)
+
+    return [
+        (datetime.combine(fecha, hora), datetime.combine(fecha, hora) + duracion)
+        for hora, duracion in citas.values_list('Hora', 'Duracion')
+    ]
+
+
+def _hora_fin(fecha, fin):
+    # Un intervalo que termina al día siguiente se compara contra el final del día
+    return fin.time() if fin.date() == fecha else time.max
+
+
+def buscar_cita_solapada(fecha, inicio, fin, manicurista=None, cliente=None, excluir_id=None):
+    """
+    Primera cita activa de la manicurista o del cliente que se solapa con [inicio, fin),
+    resuelta en la base de datos con una sola consulta sobre el índice de agenda.
+    """
+    citas = _citas_activas().filter(
+        Fecha=fecha,
+        Hora__lt=_hora_fin(fecha, fin),
+        HoraFin__gt=inicio.time()
+    )
+    if manicurista is not None:
+        citas = citas.filter(manicurista_id=manicurista)
+    if cliente is not None:
+        citas = citas.filter(cliente_id=cliente)
+    if excluir_id is not None:
+        citas = citas.exclude(id=excluir_id)
+    return citas.order_by('Hora').first()
+
+
+def buscar_novedad_solapada(manicurista, fecha, inicio, fin):
+    """
+    Primera novedad de la manicurista que se solapa con [inicio, fin), en una sola consulta.
+    """
+    return Novedades.objects.filter(
+        manicurista_id=manicurista,
+        Fecha=fecha,
+        HoraEntrada__lt=_hora_fin(fecha, fin),
+        HoraSalida__gt=inicio.time()
+    ).order_by('HoraEntrada').first()
+
+
+def cargar_novedades_rango(manicurista_ids, fecha_inicio, fecha_fin):
+    """
+    Novedades de varias manicuristas en un rango de fechas, en una sola consulta,
+    agrupadas por (manicurista_id, fecha).
+    """
+    novedades = defaultdict(list)
+    filas = Novedades.objects.filter(
+        manicurista_id__in=manicurista_ids,
+        Fecha__range=[fecha_inicio, fecha_fin]
+    ).values_list('manicurista_id', 'Fecha', 'HoraEntrada', 'HoraSalida')
+
+    for manicurista_id, fecha, entrada, salida in filas:
+        novedades[(manicurista_id, fecha)].append(
+            (datetime.combine(fecha, entrada), datetime.combine(fecha, salida))
+        )
+    return novedades
+
+
+def cargar_citas_rango(manicurista_ids, fecha_inicio, fecha_fin):
+    """
+    Citas activas de varias manicuristas en un rango de fechas, en una sola consulta,
+    agrupadas por (manicurista_id, fecha).
+    """
+    citas = defaultdict(list)
+    filas = _citas_activas().filter(
+        manicurista_id__in=manicurista_ids,
+        Fecha__range=[fecha_inicio, fecha_fin]
+    ).values_list('manicurista_id', 'Fecha', 'Hora', 'Duracion')
+
+    for manicurista_id, fecha, hora, duracion in filas:
+        inicio = datetime.combine(fecha, hora)
+        citas[(manicurista_id, fecha)].append((inicio, inicio + duracion))
+    return citas
+
+
+def calcular_disponibilidad(fecha, novedades, citas):
+    """
+    Calcula las horas disponibles y no recomendables de un día a partir de los intervalos
+    ocupados. Cada cita bloquea además el margen previo a su inicio.
+    Los bloqueos se fusionan y las franjas se recorren una sola vez.
+    """
+    jornada_inicio = datetime.combine(fecha, JORNADA_INICIO)
+    jornada_fin = datetime.combine(fecha, JORNADA_FIN)
+
+    bloqueos = fusionar_intervalos(
+        list(novedades) + [(inicio - MARGEN_CITA, fin) for inicio, fin in citas]
+    )
+
+    horas_disponibles = []
+    indice = 0
+    actual = jornada_inicio
+    while actual <= jornada_fin:
+        while indice < len(bloqueos) and bloqueos[indice][1] <= actual:
+            indice += 1
+        if indice == len(bloqueos) or actual < bloqueos[indice][0]:
+            horas_disponibles.append(actual.time())
+        actual += INTERVALO
+
+    horas_no_recomendables = sorted({
+        (inicio - MARGEN_CITA).time()
+        for inicio, _ in citas
+        if jornada_inicio <= inicio - MARGEN_CITA <= jornada_fin
+    })
+
+    return {
+        "horas_disponibles": [h.strftime("%H:%M") for h in horas_disponibles],
+        "no_recomendables": [h.strftime("%H:%M") for h in horas_no_recomendables]
+    }
+
+
+def disponibilidad_manicurista(manicurista, fecha):
+    """
+    Disponibilidad de una manicurista para un día concreto.
+    """
+    return calcular_disponibilidad(
+        fecha,
+        cargar_novedades(manicurista, fecha),
+        cargar_citas(fecha, manicurista=manicurista)
+    )
+
+
+def disponibilidad_rango(manicurista_ids, fecha_inicio, fecha_fin):
+    """
+    Disponibilidad de cada par manicurista/fecha del rango. Novedades y citas de todo el
+    rango se cargan de una vez y los días se calculan en memoria.
+    """
+    manicurista_ids = list(manicurista_ids)
+    novedades = cargar_novedades_rango(manicurista_ids, fecha_inicio, fecha_fin)
+    citas = cargar_citas_rango(manicurista_ids, fecha_inicio, fecha_fin)
+
+    resultado = []
+    for manicurista_id in manicurista_ids:
+        fecha = fecha_inicio
+        while fecha <= fecha_fin:
+            clave = (manicurista_id, fecha)
+            resultado.append({
+                "manicurista_id": manicurista_id,
+                "fecha": fecha.strftime("%Y-%m-%d"),
+                **calcular_disponibilidad(fecha, novedades.get(clave, []), citas.get(clave, []))
+            })
+            fecha += timedelta(days=1)
+    return resultado
@@ -0,0 +1,119 @@
+import csv
+import json
+from collections import defaultdict
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from utils.estados import estados_cita
+from utils.paginacion import filtro_posterior, valor_campo
+from ..models.servicio_cita_model import ServicioCita
+from ..models.estado_cita_model import EstadoCita
+from .catalogo import catalogo_servicios
+from .consultas import citas_para_serializar
+
+ORDEN_EXPORTACION = ('Fecha', 'Hora', 'id')
+TAMANO_LOTE = 500
+
+COLUMNAS = [
+    'id', 'fecha', 'hora', 'hora_fin', 'duracion_minutos', 'estado',
+    'cliente_id', 'cliente', 'manicurista_id', 'manicurista', 'descripcion', 'total', 'servicios',
+]
+
+
+def citas_por_lotes(queryset, tamano_lote=TAMANO_LOTE):
+    """
+    Recorre el queryset en lotes por (Fecha, Hora, id) y entrega cada cita con sus líneas de
+    servicio. Cada lote es una consulta por cursor, así que la memoria no depende del rango
+    (MySQL entrega el resultado completo al cliente aunque se use .iterator()).
+    """
+    queryset = citas_para_serializar(queryset).order_by(*ORDEN_EXPORTACION)
+    posicion = None
+    while True:
+        lote = queryset if posicion is None else queryset.filter(filtro_posterior(ORDEN_EXPORTACION, posicion))
+        citas = list(lote[:tamano_lote])
+        if not citas:
+            return
+
+        lineas = defaultdict(list)
+        for cita_id, servicio_id, subtotal in ServicioCita.objects.filter(
+            cita_id__in=[cita.id for cita in citas]
+        ).order_by('id').values_list('cita_id', 'servicio_id', 'subtotal'):
+            lineas[cita_id].append((servicio_id, subtotal))
+
+        for cita in citas:
+            yield cita, lineas[cita.id]
+
+        if len(citas) < tamano_lote:
+            return
+        posicion = [valor_campo(citas[-1], campo) for campo in ORDEN_EXPORTACION]
+
+
+def _nombre_estado(estado_id):
+    try:
+        return estados_cita.por_id(estado_id).Estado
+    except EstadoCita.DoesNotExist:
+        return "Estado desconocido"
+
+
+def _nombre_persona(persona, sin_valor):
+    # cliente y manicurista quedan en NULL cuando se elimina la persona
+    if persona is None:
+        return sin_valor
+    return f"{persona.nombre} {persona.apellido}"
+
+
+def filas_exportacion(queryset, tamano_lote=TAMANO_LOTE):
+    """Una fila (dict) por cita, con nombres desnormalizados y sus servicios."""
+    catalogo = catalogo_servicios()
+    for cita, lineas in citas_por_lotes(queryset, tamano_lote):
+        yield {
+            'id': cita.id,
+            'fecha': cita.Fecha,
+            'hora': cita.Hora,
+            'hora_fin': cita.HoraFin,
+            'duracion_minutos': int(cita.Duracion.total_seconds() // 60),
+            'estado': _nombre_estado(cita.estado_id_id),
+            'cliente_id': cita.cliente_id_id,
+            'cliente': _nombre_persona(cita.cliente_id, "Cliente desconocido"),
+            'manicurista_id': cita.manicurista_id_id,
+            'manicurista': _nombre_persona(cita.manicurista_id, "Sin asignar"),
+            'descripcion': cita.Descripcion,
+            'total': cita.Total,
+            'servicios': [
+                {
+                    'servicio_id': servicio_id,
+                    'nombre': catalogo[servicio_id].nombre if servicio_id in catalogo else None,
+                    'subtotal': subtotal,
+                }
+                for servicio_id, subtotal in lineas
+            ],
+        }
+
+
+class _Eco:
+    """Buffer mínimo para csv.writer: devuelve la línea en lugar de guardarla."""
+
+    def write(self, valor):
+        return valor
+
+
+def exportar_csv(filas):
+    escritor = csv.writer(_Eco())
+    yield escritor.writerow(COLUMNAS)
+    for fila in filas:
+        fila['servicios'] = "; ".join(
+            f"{servicio['nombre'] or servicio['servicio_id']} ({servicio['subtotal']})"
+            for servicio in fila['servicios']
+        )
+        yield escritor.writerow([fila[columna] if fila[columna] is not None else '' for columna in COLUMNAS])
+
+
+def exportar_ndjson(filas):
+    for fila in filas:
+        yield json.dumps(fila, cls=DjangoJSONEncoder, ensure_ascii=False) + "\n"
+
+
+FORMATOS = {
+    'csv': (exportar_csv, 'text/csv; charset=utf-8'),
+    'ndjson': (exportar_ndjson, 'application/x-ndjson; charset=utf-8'),
+}
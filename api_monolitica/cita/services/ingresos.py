@@ -0,0 +1,90 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+
+from utils.estados import estados_cita, ESTADO_CITA_TERMINADA
+from ..models.servicio_cita_model import ServicioCita
+from ..models.resumen_citas_model import ResumenDiarioCitas
+from .catalogo import catalogo_servicios, nombre_servicio
+
+PERIODOS = {
+    'dia': TruncDay,
+    'semana': TruncWeek,
+    'mes': TruncMonth,
+}
+AGRUPACIONES = ('manicurista', 'servicio', 'tipo')
+MAX_DIAS_INGRESOS = 3 * 366
+
+
+def _por_resumen(desde, hasta, truncar, agrupar, manicurista_id):
+    """Ingresos de citas terminadas desde el resumen diario: no depende del número de citas."""
+    filas = ResumenDiarioCitas.objects.filter(
+        fecha__range=[desde, hasta], estado_id=estados_cita.id(ESTADO_CITA_TERMINADA)
+    )
+    if manicurista_id:
+        filas = filas.filter(manicurista_id=manicurista_id)
+
+    campos = ['periodo']
+    if agrupar == 'manicurista':
+        campos += ['manicurista_id', 'manicurista_id__nombre', 'manicurista_id__apellido']
+    filas = filas.annotate(periodo=truncar('fecha')).values(*campos) \
+        .annotate(total=Sum('total'), cantidad=Sum('cantidad')).order_by(*campos)
+
+    resultados = []
+    for fila in filas:
+        resultado = {"periodo": fila['periodo'], "total": fila['total'], "cantidad": fila['cantidad']}
+        if agrupar == 'manicurista':
+            resultado["id"] = fila['manicurista_id']
+            resultado["nombre"] = f"{fila['manicurista_id__nombre']} {fila['manicurista_id__apellido']}" \
+                if fila['manicurista_id'] else "Sin manicurista"
+        resultados.append(resultado)
+    return resultados
+
+
+def _por_servicio(desde, hasta, truncar, agrupar, manicurista_id):
+    """
+    Ingresos por línea de servicio. El GROUP BY es por (periodo, servicio); el tipo sale del
+    catálogo local porque servicio_id no es una ForeignKey.
+    """
+    lineas = ServicioCita.objects.filter(
+        cita_id__Fecha__range=[desde, hasta], cita_id__estado_id=estados_cita.id(ESTADO_CITA_TERMINADA)
+    )
+    if manicurista_id:
+        lineas = lineas.filter(cita_id__manicurista_id=manicurista_id)
+    lineas = lineas.annotate(periodo=truncar('cita_id__Fecha')).values('periodo', 'servicio_id') \
+        .annotate(total=Sum('subtotal'), cantidad=Count('id')).order_by('periodo', 'servicio_id')
+
+    catalogo = catalogo_servicios()
+    if agrupar == 'servicio':
+        return [
+            {
+                "periodo": fila['periodo'], "id": fila['servicio_id'],
+                "nombre": nombre_servicio(catalogo, fila['servicio_id']),
+                "total": fila['total'], "cantidad": fila['cantidad'],
+            }
+            for fila in lineas
+        ]
+
+    por_tipo = defaultdict(lambda: {"total": Decimal('0'), "cantidad": 0})
+    for fila in lineas:
+        servicio = catalogo.get(fila['servicio_id'])
+        acumulado = por_tipo[(fila['periodo'], servicio.tipo if servicio else "Sin tipo")]
+        acumulado["total"] += fila['total']
+        acumulado["cantidad"] += fila['cantidad']
+    return [
+        {"periodo": periodo, "nombre": tipo, **acumulado}
+        for (periodo, tipo), acumulado in sorted(por_tipo.items())
+    ]
+
+
+def ingresos_por_periodo(desde, hasta, periodo='dia', agrupar=None, manicurista_id=None):
+    """
+    Ingresos de citas terminadas entre desde y hasta, sumados por dia, semana (lunes) o mes y
+    opcionalmente por manicurista, servicio o tipo de servicio. Cada caso es un solo GROUP BY.
+    """
+    truncar = PERIODOS[periodo]
+    if agrupar in ('servicio', 'tipo'):
+        return _por_servicio(desde, hasta, truncar, agrupar, manicurista_id)
+    return _por_resumen(desde, hasta, truncar, agrupar, manicurista_id)
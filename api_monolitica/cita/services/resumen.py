@@ -0,0 +1,165 @@
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from ..models.cita_venta_model import CitaVenta
+from ..models.resumen_citas_model import ResumenDiarioCitas, ResumenClienteCitas
+from usuario.models.cliente_model import Cliente
+from usuario.models.manicurista_model import Manicurista
+
+# Campos de la cita que cambian los acumulados (nombre del campo -> columna)
+CAMPOS_RESUMEN = {
+    'Fecha': 'Fecha',
+    'manicurista_id': 'manicurista_id_id',
+    'cliente_id': 'cliente_id_id',
+    'estado_id': 'estado_id_id',
+    'Total': 'Total',
+}
+
+
+def _acumular(modelo, claves, cantidad, total):
+    """Suma cantidad y total a la fila de `claves`, creándola si no existe."""
+    fila_id = modelo.objects.filter(**claves).values_list('id', flat=True).first()
+    if fila_id is None:
+        try:
+            with transaction.atomic():
+                modelo.objects.create(cantidad=cantidad, total=total, **claves)
+            return
+        except IntegrityError:
+            # Otra petición creó la fila entre la consulta y el insert
+            fila_id = modelo.objects.filter(**claves).values_list('id', flat=True).first()
+    modelo.objects.filter(pk=fila_id).update(cantidad=F('cantidad') + cantidad, total=F('total') + total)
+
+
+def aplicar_cita(valores, signo):
+    """Suma (signo=1) o resta (signo=-1) una cita a los acumulados."""
+    total = Decimal(str(valores['Total'] or 0)) * signo
+    _acumular(ResumenDiarioCitas, {
+        'fecha': valores['Fecha'],
+        'manicurista_id_id': valores['manicurista_id_id'],
+        'estado_id_id': valores['estado_id_id'],
+    }, signo, total)
+    _acumular(ResumenClienteCitas, {
+        'cliente_id_id': valores['cliente_id_id'],
+        'estado_id_id': valores['estado_id_id'],
+    }, signo, total)
+
+
+def _valores(cita):
+    return {columna: getattr(cita, columna) for columna in CAMPOS_RESUMEN.values()}
+
+
+@receiver(pre_save, sender=CitaVenta)
+def _leer_cita_anterior(sender, instance, raw=False, update_fields=None, **kwargs):
+    # Se lee la fila guardada y no la instancia, que puede venir con campos diferidos o desactualizada
+    instance._resumen_anterior = None
+    instance._resumen_omitir = raw or (update_fields is not None and not set(update_fields) & set(CAMPOS_RESUMEN))
+    if not instance._resumen_omitir and instance.pk:
+        instance._resumen_anterior = CitaVenta.objects.filter(pk=instance.pk).values(*CAMPOS_RESUMEN.values()).first()
+
+
+@receiver(post_save, sender=CitaVenta)
+def _actualizar_resumen(sender, instance, **kwargs):
+    if getattr(instance, '_resumen_omitir', False):
+        return
+    anterior = getattr(instance, '_resumen_anterior', None)
+    nuevo = _valores(instance)
+    if anterior is not None and anterior['Total'] == Decimal(str(nuevo['Total'] or 0)) \
+            and all(anterior[columna] == nuevo[columna] for columna in CAMPOS_RESUMEN.values() if columna != 'Total'):
+        return
+    with transaction.atomic():
+        if anterior is not None:
+            aplicar_cita(anterior, -1)
+        aplicar_cita(nuevo, 1)
+
+
+@receiver(post_delete, sender=CitaVenta)
+def _descontar_resumen(sender, instance, **kwargs):
+    aplicar_cita(_valores(instance), -1)
+
+
+def _filas_diarias(citas):
+    return [
+        ResumenDiarioCitas(
+            fecha=fila['Fecha'], manicurista_id_id=fila['manicurista_id'], estado_id_id=fila['estado_id'],
+            cantidad=fila['cantidad'], total=fila['total'] or 0,
+        )
+        for fila in citas.order_by().values('Fecha', 'manicurista_id', 'estado_id')
+        .annotate(cantidad=Count('id'), total=Sum('Total'))
+    ]
+
+
+def _filas_clientes(citas):
+    return [
+        ResumenClienteCitas(
+            cliente_id_id=fila['cliente_id'], estado_id_id=fila['estado_id'],
+            cantidad=fila['cantidad'], total=fila['total'] or 0,
+        )
+        for fila in citas.order_by().values('cliente_id', 'estado_id')
+        .annotate(cantidad=Count('id'), total=Sum('Total'))
+    ]
+
+
+def _filtro_clientes(clientes, campo):
+    # cliente NULL (cita desvinculada) necesita su propio filtro: `__in` no incluye NULL
+    ids = [cliente for cliente in clientes if cliente is not None]
+    filtro = Q(**{f'{campo}__in': ids})
+    if None in clientes:
+        filtro |= Q(**{f'{campo}__isnull': True})
+    return filtro
+
+
+def recalcular_resumen(fechas=(), clientes=()):
+    """Recalcula desde CitaVenta solo los acumulados de esas fechas y esos clientes (None = sin cliente)."""
+    fechas, clientes = set(fechas), set(clientes)
+    with transaction.atomic():
+        if fechas:
+            ResumenDiarioCitas.objects.filter(fecha__in=fechas).delete()
+            ResumenDiarioCitas.objects.bulk_create(_filas_diarias(CitaVenta.objects.filter(Fecha__in=fechas)))
+        if clientes:
+            ResumenClienteCitas.objects.filter(_filtro_clientes(clientes, 'cliente_id')).delete()
+            ResumenClienteCitas.objects.bulk_create(
+                _filas_clientes(CitaVenta.objects.filter(_filtro_clientes(clientes, 'cliente_id')))
+            )
+
+
+def actualizar_citas(citas, **valores):
+    """QuerySet.update() de citas que deja los acumulados al día; usarlo en lugar de citas.update()."""
+    if not set(valores) & set(CAMPOS_RESUMEN):
+        return citas.update(**valores)
+    with transaction.atomic():
+        antes = list(citas.select_for_update().values_list('id', 'Fecha', 'cliente_id'))
+        ids = [cita_id for cita_id, _, _ in antes]
+        actualizadas = CitaVenta.objects.filter(pk__in=ids).update(**valores)
+        despues = list(CitaVenta.objects.filter(pk__in=ids).values_list('id', 'Fecha', 'cliente_id'))
+        recalcular_resumen(
+            fechas={fecha for _, fecha, _ in antes + despues},
+            clientes={cliente for _, _, cliente in antes + despues},
+        )
+    return actualizadas
+
+
+@receiver(pre_delete, sender=Manicurista)
+def _desvincular_manicurista(sender, instance, **kwargs):
+    # El SET_NULL de Django es un update(): se mueven antes las citas para que el resumen no quede con claves repetidas
+    actualizar_citas(CitaVenta.objects.filter(manicurista_id=instance), manicurista_id=None)
+
+
+@receiver(pre_delete, sender=Cliente)
+def _desvincular_cliente(sender, instance, **kwargs):
+    actualizar_citas(CitaVenta.objects.filter(cliente_id=instance), cliente_id=None)
+
+
+def reconstruir_resumen(tamano_lote=1000):
+    """Vacía y recalcula los acumulados desde CitaVenta. Devuelve (filas diarias, filas de clientes)."""
+    diarias = _filas_diarias(CitaVenta.objects.all())
+    clientes = _filas_clientes(CitaVenta.objects.all())
+    with transaction.atomic():
+        ResumenDiarioCitas.objects.all().delete()
+        ResumenClienteCitas.objects.all().delete()
+        ResumenDiarioCitas.objects.bulk_create(diarias, batch_size=tamano_lote)
+        ResumenClienteCitas.objects.bulk_create(clientes, batch_size=tamano_lote)
+    return len(diarias), len(clientes)
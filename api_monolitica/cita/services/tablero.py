@@ -0,0 +1,135 @@
+import calendar
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from abastecimiento.models.abastecimiento import Abastecimiento
+from utils.estados import estados_cita, ESTADO_CITA_PENDIENTE, ESTADO_CITA_TERMINADA
+from ..models.cita_venta_model import CitaVenta
+from ..models.servicio_cita_model import ServicioCita
+from ..models.resumen_citas_model import ResumenDiarioCitas, ResumenClienteCitas
+from .catalogo import catalogo_servicios, nombre_servicio
+
+CACHE_VERSION = "tablero:version"
+
+
+def _version():
+    return cache.get_or_set(CACHE_VERSION, 1, None)
+
+
+def invalidar_tablero():
+    """Cambia la versión de la cache: todas las combinaciones (semana, manicurista) quedan viejas."""
+    try:
+        cache.incr(CACHE_VERSION)
+    except ValueError:
+        cache.set(CACHE_VERSION, 1, None)
+
+
+@receiver([post_save, post_delete], sender=CitaVenta)
+@receiver([post_save, post_delete], sender=ServicioCita)
+@receiver([post_save, post_delete], sender=Abastecimiento)
+def _invalidar_por_cambio(sender, **kwargs):
+    invalidar_tablero()
+
+
+def _rango(inicio, fin):
+    return {"fecha_inicio": inicio.strftime("%d/%m/%Y"), "fecha_fin": fin.strftime("%d/%m/%Y")}
+
+
+def calcular_tablero(inicio_semana, manicurista_id=None, hoy=None):
+    """
+    Todos los widgets del tablero de administración para la semana que empieza en
+    inicio_semana. Las dos semanas de ingresos, los servicios del día y las citas por día
+    salen de una sola consulta al resumen diario; el resto es una consulta por widget.
+    """
+    hoy = hoy or date.today()
+    fin_semana = inicio_semana + timedelta(days=6)
+    inicio_anterior = inicio_semana - timedelta(days=7)
+    fin_anterior = inicio_semana - timedelta(days=1)
+    # Si la semana ya pasó, el mes y el día de referencia son los de su último día
+    referencia = min(hoy, fin_semana)
+    inicio_mes = referencia.replace(day=1)
+
+    pendiente_id = estados_cita.id(ESTADO_CITA_PENDIENTE)
+    terminada_id = estados_cita.id(ESTADO_CITA_TERMINADA)
+
+    resumen = ResumenDiarioCitas.objects.filter(
+        fecha__range=[inicio_anterior, fin_semana],
+        estado_id__in=[pendiente_id, terminada_id],
+        cantidad__gt=0
+    )
+    if manicurista_id:
+        resumen = resumen.filter(manicurista_id=manicurista_id)
+
+    ganancia_actual = ganancia_anterior = Decimal('0')
+    servicios_dia = defaultdict(int)
+    dias = {i: {"name": calendar.day_name[i], "Pendiente": 0, "Terminada": 0} for i in range(7)}
+    for fila in resumen.values('fecha', 'estado_id', 'cantidad', 'total', 'manicurista_id__nombre', 'manicurista_id__apellido'):
+        en_semana = fila['fecha'] >= inicio_semana
+        if fila['estado_id'] == pendiente_id:
+            if en_semana:
+                dias[fila['fecha'].weekday()]["Pendiente"] += fila['cantidad']
+            continue
+        if not en_semana:
+            ganancia_anterior += fila['total']
+            continue
+        ganancia_actual += fila['total']
+        dias[fila['fecha'].weekday()]["Terminada"] += fila['cantidad']
+        if fila['fecha'] == referencia:
+            servicios_dia[f"{fila['manicurista_id__nombre']} {fila['manicurista_id__apellido']}"] += fila['cantidad']
+
+    clientes_top = ResumenClienteCitas.objects.filter(
+        estado_id=terminada_id, cliente_id__isnull=False, cantidad__gt=0
+    ).values('cliente_id__nombre', 'cliente_id__apellido', citas=F('cantidad')).order_by('-cantidad')[:3]
+
+    servicios_mes = ServicioCita.objects.filter(
+        cita_id__Fecha__range=[inicio_mes, referencia], cita_id__estado_id=terminada_id
+    )
+    if manicurista_id:
+        servicios_mes = servicios_mes.filter(cita_id__manicurista_id=manicurista_id)
+    servicios_mes = servicios_mes.values('servicio_id').annotate(ventas=Count('id')).order_by('-ventas')[:3]
+
+    top_abastecimiento = Abastecimiento.objects.values('manicurista_id__nombre', 'manicurista_id__apellido') \
+        .annotate(pedidos=Count('id')).order_by('-pedidos')[:3]
+
+    catalogo = catalogo_servicios()
+    return {
+        "ganancia_semanal": {"ganancia_total": ganancia_actual, **_rango(inicio_semana, fin_semana)},
+        "ganancia_semanal_anterior": {"ganancia_total": ganancia_anterior, **_rango(inicio_anterior, fin_anterior)},
+        "servicios_dia": [
+            {"name": nombre, "servicios": cantidad}
+            for nombre, cantidad in sorted(servicios_dia.items(), key=lambda item: -item[1])
+        ],
+        "citas_semana": [dias[i] for i in range(7)],
+        "clientes_top": [
+            {"nombre": f"{item['cliente_id__nombre']} {item['cliente_id__apellido']}", "citas": item['citas']}
+            for item in clientes_top
+        ],
+        "servicios_mas_vendidos_mes": [
+            {"name": nombre_servicio(catalogo, item['servicio_id']), "ventas": item['ventas']}
+            for item in servicios_mes
+        ],
+        "top_manicuristas_abastecimiento": [
+            {"nombre": f"{item['manicurista_id__nombre']} {item['manicurista_id__apellido']}", "pedidos": item['pedidos']}
+            for item in top_abastecimiento
+        ],
+    }
+
+
+def obtener_tablero(inicio_semana, manicurista_id=None):
+    """
+    calcular_tablero cacheado por (semana, manicurista). Los cambios de citas, servicios o
+    abastecimientos invalidan la cache del proceso; los demás procesos la renuevan al vencer el TTL.
+    """
+    clave = f"tablero:{_version()}:{inicio_semana.isoformat()}:{manicurista_id or 'todas'}"
+    datos = cache.get(clave)
+    if datos is None:
+        datos = calcular_tablero(inicio_semana, manicurista_id)
+        cache.set(clave, datos, getattr(settings, 'TABLERO_CACHE_SEGUNDOS', 60))
+    return datos
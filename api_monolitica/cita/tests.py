@@ -1,3 +1,685 @@
-from django.test import TestCase
+import csv
+import importlib
+import io
+import json
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import requests
+from django.apps import apps as django_apps
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from rol.models import Rol
+from usuario.models.usuario_model import Usuario
+from usuario.models.cliente_model import Cliente
+from usuario.models.manicurista_model import Manicurista
+from utils.http_client import CircuitoAbierto, ClienteHTTP
+from .models.estado_cita_model import EstadoCita
+from .models.cita_venta_model import CitaVenta
+from .models.servicio_cita_model import ServicioCita
+from .models.servicio_catalogo_model import ServicioCatalogo
+from .models.resumen_citas_model import ResumenDiarioCitas, ResumenClienteCitas
+from .services.catalogo import asegurar_servicios, obtener_servicio
+from .services.consultas import totales_citas_terminadas
+from .services.disponibilidad import buscar_cita_solapada, calcular_disponibilidad, fusionar_intervalos
+from .services.exportacion import filas_exportacion
+from .services.resumen import actualizar_citas, reconstruir_resumen
+
+
+COPIA_HTTP_CLIENT = Path(__file__).resolve().parents[2] / 'microservicio_servicios' / 'utils' / 'http_client.py'
+
+
+class CitasTestBase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.rol = Rol.objects.create(nombre="Administrador")
+        cls.pendiente = EstadoCita.objects.create(Estado="Pendiente")
+        EstadoCita.objects.create(Estado="En proceso")
+        EstadoCita.objects.create(Estado="Terminada")
+        EstadoCita.objects.create(Estado="Cancelada")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.contador = 0
+
+    def _persona(self, modelo, prefijo, **extra):
+        self.contador += 1
+        n = self.contador
+        usuario = Usuario.objects.create(
+            username=f"{prefijo}{n}", correo=f"{prefijo}{n}@correo.com", nombre="Nombre",
+            apellido="Apellido", rol_id=self.rol, numero_documento=f"{prefijo}{n}",
+        )
+        return modelo.objects.create(
+            usuario=usuario, nombre=f"{prefijo}{n}", apellido="Apellido", tipo_documento="CC",
+            numero_documento=f"{prefijo}{n}", correo=f"{prefijo}{n}@correo.com", **extra
+        )
+
+    def _crear_citas(self, cantidad):
+        for i in range(cantidad):
+            cliente = self._persona(Cliente, "cli")
+            manicurista = self._persona(
+                Manicurista, "man", celular=f"3{self.contador:09d}",
+                fecha_nacimiento=date(1990, 1, 1), fecha_contratacion=date(2020, 1, 1),
+            )
+            CitaVenta.objects.create(
+                cliente_id=cliente, manicurista_id=manicurista, estado_id=self.pendiente,
+                Fecha=date.today() + timedelta(days=i), Hora=time(9, 0), Descripcion="Cita", Total=0,
+            )
+
+
+
+class ListadoCitasConsultasTest(CitasTestBase):
+    """El listado de citas debe hacer las mismas consultas sin importar cuántas citas haya."""
+
+    def _consultas_listado(self, url):
+        with CaptureQueriesContext(connection) as contexto:
+            respuesta = self.client.get(url)
+        self.assertEqual(respuesta.status_code, 200)
+        return len(contexto.captured_queries)
+
+    def test_listado_no_crece_con_las_citas(self):
+        url = '/api/cita-venta/citas-venta/'
+        self._crear_citas(3)
+        self.client.get(url)  # carga el registro de estados
+        pocas = self._consultas_listado(url)
+        self._crear_citas(15)
+        muchas = self._consultas_listado(url)
+        self.assertEqual(pocas, muchas)
+
+    def test_citas_en_proceso_no_crece_con_las_citas(self):
+        url = '/api/cita-venta/citas-venta/en-proceso/'
+        self._crear_citas(3)
+        self.client.get(url)
+        pocas = self._consultas_listado(url)
+        self._crear_citas(15)
+        muchas = self._consultas_listado(url)
+        self.assertEqual(pocas, muchas)
+
+    def test_listado_incluye_nombres(self):
+        self._crear_citas(1)
+        respuesta = self.client.get('/api/cita-venta/citas-venta/')
+        cita = respuesta.data[0] if isinstance(respuesta.data, list) else respuesta.data['results'][0]
+        self.assertEqual(cita['cliente_nombre'], "cli1 Apellido")
+        self.assertEqual(cita['manicurista_nombre'], "man2 Apellido")
+        self.assertEqual(cita['estado_nombre'], "Pendiente")
+
+
+
+class PaginacionCitasTest(CitasTestBase):
+    """El cursor recorre las citas en orden (Fecha, Hora, id) sin saltar ni repetir filas."""
+
+    url = '/api/cita-venta/citas-venta/'
+
+    def setUp(self):
+        super().setUp()
+        # Varias citas por día para que el orden dependa también de la hora y el id
+        self._crear_citas(4)
+        self._crear_citas(4)
+        self._crear_citas(3)
+        self.orden = list(CitaVenta.objects.order_by('Fecha', 'Hora', 'id').values_list('id', flat=True))
+
+    def _recorrer(self, url, enlace):
+        ids = []
+        while url:
+            respuesta = self.client.get(url)
+            self.assertEqual(respuesta.status_code, 200)
+            ids.extend(cita['id'] for cita in respuesta.data['results'])
+            url = respuesta.data[enlace]
+        return ids
+
+    def test_recorre_todas_las_citas_en_orden(self):
+        self.assertEqual(self._recorrer(f"{self.url}?tamano=3", 'next'), self.orden)
+
+    def test_recorre_hacia_atras(self):
+        url = f"{self.url}?tamano=3"
+        while True:
+            respuesta = self.client.get(url)
+            if not respuesta.data['next']:
+                break
+            url = respuesta.data['next']
+        ultima = [cita['id'] for cita in respuesta.data['results']]
+        anteriores = self._recorrer(respuesta.data['previous'], 'previous')
+        self.assertEqual(sorted(anteriores + ultima, key=self.orden.index), self.orden)
+        self.assertEqual(len(anteriores) + len(ultima), len(self.orden))
+
+    def test_sin_paginar_devuelve_la_lista(self):
+        respuesta = self.client.get(f"{self.url}?paginar=false")
+        self.assertEqual(sorted(cita['id'] for cita in respuesta.data), sorted(self.orden))
+
+    def test_sin_parametros_conserva_la_lista(self):
+        # Los clientes que no piden paginación siguen recibiendo el arreglo completo
+        respuesta = self.client.get(self.url)
+        self.assertIsInstance(respuesta.data, list)
+        self.assertEqual(len(respuesta.data), len(self.orden))
+
+    def test_paginar_true_usa_el_tamano_por_defecto(self):
+        respuesta = self.client.get(f"{self.url}?paginar=true")
+        self.assertEqual([cita['id'] for cita in respuesta.data['results']], self.orden)
+        self.assertIsNone(respuesta.data['next'])
+
+    def test_cursor_invalido(self):
+        respuesta = self.client.get(f"{self.url}?cursor=no-es-un-cursor")
+        self.assertEqual(respuesta.status_code, 404)
+
+
+class ExportacionCitasTest(CitasTestBase):
+    """La exportación recorre el historial por lotes y respeta los filtros."""
+
+    url = '/api/cita-venta/citas-venta/exportar/'
+
+    def _contenido(self, respuesta):
+        self.assertEqual(respuesta.status_code, 200)
+        return b''.join(respuesta.streaming_content).decode('utf-8')
+
+    def test_exporta_csv_con_servicios(self):
+        self._crear_citas(3)
+        cita = CitaVenta.objects.order_by('id').first()
+        ServicioCita.objects.create(cita_id=cita, servicio_id=7, subtotal=15000)
+        filas = list(csv.DictReader(io.StringIO(self._contenido(self.client.get(self.url)))))
+        self.assertEqual(len(filas), 3)
+        self.assertEqual(filas[0]['cliente'], "cli1 Apellido")
+        self.assertEqual(filas[0]['estado'], "Pendiente")
+        self.assertEqual(filas[0]['servicios'], "7 (15000.00)")
+
+    def test_exporta_ndjson_filtrado(self):
+        self._crear_citas(4)
+        desde = date.today() + timedelta(days=2)
+        contenido = self._contenido(self.client.get(f"{self.url}?formato=ndjson&fecha_inicio={desde}&estado=pendiente"))
+        citas = [json.loads(linea) for linea in contenido.splitlines()]
+        self.assertEqual([cita['fecha'] for cita in citas], [str(desde), str(desde + timedelta(days=1))])
+
+    def test_lotes_no_repiten_citas(self):
+        self._crear_citas(5)
+        self._crear_citas(5)
+        ids = [fila['id'] for fila in filas_exportacion(CitaVenta.objects.all(), tamano_lote=3)]
+        self.assertEqual(ids, list(CitaVenta.objects.order_by('Fecha', 'Hora', 'id').values_list('id', flat=True)))
+
+    def test_exporta_citas_sin_cliente_ni_manicurista(self):
+        self._crear_citas(2)
+        actualizar_citas(
+            CitaVenta.objects.filter(pk=CitaVenta.objects.order_by('id').first().pk), cliente_id=None, manicurista_id=None
+        )
+        filas = list(csv.DictReader(io.StringIO(self._contenido(self.client.get(self.url)))))
+        self.assertEqual(len(filas), 2)
+        sin_persona = [fila for fila in filas if fila['cliente_id'] == '']
+        self.assertEqual(len(sin_persona), 1)
+        self.assertEqual((sin_persona[0]['cliente'], sin_persona[0]['manicurista']), ("Cliente desconocido", "Sin asignar"))
+
+        contenido = self._contenido(self.client.get(f"{self.url}?formato=ndjson"))
+        self.assertEqual(len(contenido.splitlines()), 2)
+
+    def test_parametros_invalidos(self):
+        self.assertEqual(self.client.get(f"{self.url}?formato=xml").status_code, 400)
+        self.assertEqual(self.client.get(f"{self.url}?fecha_inicio=2024-13-40").status_code, 400)
+        self.assertEqual(self.client.get(f"{self.url}?estado=Perdida").status_code, 400)
+
+
+class ResumenCitasTest(CitasTestBase):
+    """Los acumulados diarios siguen a las citas y coinciden con una reconstrucción completa."""
+
+    def _resumen(self):
+        diario = sorted(ResumenDiarioCitas.objects.filter(cantidad__gt=0).values_list(
+            'fecha', 'manicurista_id', 'estado_id', 'cantidad', 'total'), key=repr)
+        clientes = sorted(ResumenClienteCitas.objects.filter(cantidad__gt=0).values_list(
+            'cliente_id', 'estado_id', 'cantidad', 'total'), key=repr)
+        return diario, clientes
+
+    def test_incremental_coincide_con_reconstruccion(self):
+        self._crear_citas(4)
+        citas = list(CitaVenta.objects.order_by('id'))
+        terminada = EstadoCita.objects.get(Estado="Terminada")
+
+        citas[0].estado_id = terminada
+        citas[0].Total = Decimal('30000.00')
+        citas[0].save()
+        citas[1].Fecha = citas[2].Fecha
+        citas[1].manicurista_id = citas[2].manicurista_id
+        citas[1].save()
+        citas[2].Total = Decimal('12500.50')
+        citas[2].save(update_fields=['Total'])
+        citas[3].delete()
+
+        incremental = self._resumen()
+        reconstruir_resumen()
+        self.assertEqual(incremental, self._resumen())
+
+    def test_actualizacion_masiva_mantiene_el_resumen(self):
+        self._crear_citas(3)
+        terminada = EstadoCita.objects.get(Estado="Terminada")
+        citas = list(CitaVenta.objects.order_by('id'))
+        actualizar_citas(CitaVenta.objects.filter(pk=citas[0].pk), estado_id=terminada, Total=Decimal('15000.00'))
+        actualizar_citas(CitaVenta.objects.filter(pk__in=[citas[0].pk, citas[1].pk]), manicurista_id=None)
+        actualizar_citas(CitaVenta.objects.filter(pk__in=[citas[1].pk, citas[2].pk]), cliente_id=None)
+        actualizar_citas(CitaVenta.objects.filter(pk=citas[2].pk), Fecha=citas[0].Fecha)
+
+        incremental = self._resumen()
+        reconstruir_resumen()
+        self.assertEqual(incremental, self._resumen())
+
+    def test_borrar_persona_junta_las_filas_sin_asignar(self):
+        self._crear_citas(2)
+        citas = list(CitaVenta.objects.order_by('id'))
+        actualizar_citas(CitaVenta.objects.filter(pk=citas[1].pk), Fecha=citas[0].Fecha)
+        citas[0].manicurista_id.delete()
+        citas[1].manicurista_id.delete()
+        citas[0].cliente_id.delete()
+        citas[1].cliente_id.delete()
+
+        self.assertEqual(list(ResumenDiarioCitas.objects.values_list('manicurista_id', 'cantidad')), [(None, 2)])
+        self.assertEqual(list(ResumenClienteCitas.objects.values_list('cliente_id', 'cantidad')), [(None, 2)])
+
+    def test_tableros_leen_el_resumen(self):
+        self._crear_citas(2)
+        terminada = EstadoCita.objects.get(Estado="Terminada")
+        hoy = date.today()
+        actualizar_citas(CitaVenta.objects.filter(Fecha=hoy), estado_id=terminada, Total=Decimal('20000.00'))
+
+        respuesta = self.client.get('/api/cita-venta/citas-venta/ganancia-semanal/')
+        self.assertEqual(respuesta.data['ganancia_total'], Decimal('20000.00'))
+
+        respuesta = self.client.get('/api/cita-venta/citas-venta/servicios-dia/')
+        self.assertEqual(respuesta.data, [{"name": "man2 Apellido", "servicios": 1}])
+
+        respuesta = self.client.get('/api/cita-venta/citas-venta/clientes-top/')
+        self.assertEqual(respuesta.data, [{"nombre": "cli1 Apellido", "citas": 1}])
+
+        with CaptureQueriesContext(connection) as contexto:
+            self.client.get('/api/cita-venta/citas-venta/citas-semana/')
+        self.assertLessEqual(len(contexto.captured_queries), 2)
+
+
+class TableroTest(CitasTestBase):
+    """El tablero junta los widgets en pocas consultas y se invalida cuando cambian las citas."""
+
+    url = '/api/cita-venta/citas-venta/tablero/'
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def test_coincide_con_los_widgets(self):
+        self._crear_citas(2)
+        terminada = EstadoCita.objects.get(Estado="Terminada")
+        cita = CitaVenta.objects.get(Fecha=date.today())
+        cita.estado_id = terminada
+        cita.Total = Decimal('20000.00')
+        cita.save()
+
+        datos = self.client.get(self.url).data
+        for widget, ruta in (
+            ('ganancia_semanal', 'ganancia-semanal'),
+            ('servicios_dia', 'servicios-dia'),
+            ('clientes_top', 'clientes-top'),
+            ('citas_semana', 'citas-semana'),
+        ):
+            self.assertEqual(datos[widget], self.client.get(f'/api/cita-venta/citas-venta/{ruta}/').data, widget)
+
+    def test_cache_e_invalidacion(self):
+        self._crear_citas(1)
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as contexto:
+            self.client.get(self.url)
+        self.assertEqual(len(contexto.captured_queries), 0)
+
+        cita = CitaVenta.objects.get()
+        cita.estado_id = EstadoCita.objects.get(Estado="Terminada")
+        cita.Total = Decimal('5000.00')
+        cita.save()
+        datos = self.client.get(self.url).data
+        self.assertEqual(datos['ganancia_semanal']['ganancia_total'], Decimal('5000.00'))
+
+    def test_semana_invalida(self):
+        self.assertEqual(self.client.get(f"{self.url}?semana=2025-23").status_code, 400)
+        self.assertEqual(self.client.get(f"{self.url}?semana=2025-W60").status_code, 400)
+
+
+class IngresosTest(CitasTestBase):
+    """Ingresos por periodo y agrupación desde el resumen o las líneas de servicio."""
+
+    url = '/api/cita-venta/citas-venta/ingresos/'
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        ServicioCatalogo.objects.create(id=1, nombre="Acrílicas", precio=30000, tipo="Manicure")
+        ServicioCatalogo.objects.create(id=2, nombre="Spa de pies", precio=20000, tipo="Pedicure")
+        ServicioCatalogo.objects.create(id=3, nombre="Semipermanente", precio=25000, tipo="Manicure")
+        self._crear_citas(3)
+        terminada = EstadoCita.objects.get(Estado="Terminada")
+        self.citas = list(CitaVenta.objects.order_by('Fecha'))
+        for cita, servicios in zip(self.citas[:2], ([1, 2], [3])):
+            for servicio_id in servicios:
+                ServicioCita.objects.create(cita_id=cita, servicio_id=servicio_id,
+                                            subtotal=ServicioCatalogo.objects.get(id=servicio_id).precio)
+            cita.estado_id = terminada
+            cita.Total = sum(ServicioCatalogo.objects.get(id=s).precio for s in servicios)
+            cita.save()
+        self.desde = self.citas[0].Fecha
+        self.hasta = self.citas[-1].Fecha
+
+    def _resultados(self, **parametros):
+        parametros = {"desde": self.desde, "hasta": self.hasta, **parametros}
+        respuesta = self.client.get(self.url, parametros)
+        self.assertEqual(respuesta.status_code, 200, respuesta.data)
+        return respuesta.data['resultados']
+
+    def test_por_dia(self):
+        resultados = self._resultados()
+        self.assertEqual([(r['periodo'], r['total']) for r in resultados], [
+            (self.citas[0].Fecha, Decimal('50000.00')), (self.citas[1].Fecha, Decimal('25000.00')),
+        ])
+
+    def test_por_mes_y_manicurista(self):
+        resultados = self._resultados(periodo='mes', agrupar='manicurista')
+        self.assertEqual(sum(r['total'] for r in resultados), Decimal('75000.00'))
+        self.assertEqual({r['nombre'] for r in resultados}, {"man2 Apellido", "man4 Apellido"})
+
+    def test_por_tipo(self):
+        resultados = self._resultados(periodo='mes', agrupar='tipo')
+        totales = defaultdict(Decimal)
+        for r in resultados:
+            totales[r['nombre']] += r['total']
+        self.assertEqual(dict(totales), {"Manicure": Decimal('55000.00'), "Pedicure": Decimal('20000.00')})
+
+    def test_una_consulta(self):
+        self._resultados(agrupar='servicio')
+        with CaptureQueriesContext(connection) as contexto:
+            self._resultados(periodo='semana', agrupar='servicio')
+        self.assertEqual(len(contexto.captured_queries), 1)
+
+    def test_parametros_invalidos(self):
+        self.assertEqual(self.client.get(self.url, {"desde": "2025-01-10"}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {"desde": "2025-02-10", "hasta": "2025-01-10"}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {"desde": "2025-01-10", "hasta": "2025-01-40"}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {"desde": self.desde, "hasta": self.hasta, "periodo": "anio"}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {"desde": self.desde, "hasta": self.hasta, "agrupar": "cliente"}).status_code, 400)
+
+
+class TotalesTerminadasTest(CitasTestBase):
+    """Los totales para liquidaciones solo suman citas terminadas, en una consulta."""
+
+    def test_excluye_citas_no_terminadas(self):
+        self._crear_citas(3)
+        terminada = EstadoCita.objects.get(Estado="Terminada")
+        cancelada = EstadoCita.objects.get(Estado="Cancelada")
+        manicurista = Manicurista.objects.first()
+        citas = list(CitaVenta.objects.order_by('id'))
+        for cita, estado in zip(citas, (terminada, terminada, cancelada)):
+            cita.manicurista_id = manicurista
+            cita.estado_id = estado
+            cita.Total = Decimal('10000.00')
+            cita.save()
+
+        desde, hasta = date.today(), date.today() + timedelta(days=2)
+        totales_citas_terminadas(manicurista.pk, desde, hasta)  # carga el registro de estados
+        with CaptureQueriesContext(connection) as contexto:
+            totales = totales_citas_terminadas(manicurista.pk, desde, hasta)
+        self.assertEqual(totales, {'cantidad': 2, 'total': Decimal('20000.00')})
+        self.assertEqual(len(contexto.captured_queries), 1)
+
+        respuesta = self.client.get('/api/cita-venta/citas-venta/citas-manicurista-terminada/', {
+            'manicurista_id': manicurista.pk, 'fechaInicio': desde, 'fechaFinal': hasta,
+        })
+        self.assertEqual(respuesta.data['resumen'], {'total_citas': 2, 'total_general': 20000.0})
+
+
+@override_settings(CATALOGO_TOKEN="secreto")
+class AvisoCatalogoTest(TestCase):
+    """El aviso del microservicio exige el token y aplica solo el servicio que cambió."""
+
+    url = '/api/cita-venta/catalogo-servicios/sincronizar/'
+    servicio = {"id": 7, "nombre": "Acrílicas", "precio": "30000.00", "duracion": "01:00:00",
+                "estado": "Activo", "tipo": "Manicure"}
+
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+
+    def _avisar(self, cuerpo, token="secreto"):
+        return self.client.post(self.url, cuerpo, format='json', HTTP_X_CATALOGO_TOKEN=token)
+
+    def test_rechaza_sin_token(self):
+        self.assertIn(self._avisar({"servicio": self.servicio}, token="otro").status_code, (401, 403))
+        self.assertIn(self.client.post(self.url, {"servicio": self.servicio}, format='json').status_code, (401, 403))
+        with override_settings(CATALOGO_TOKEN=None):
+            self.assertIn(self._avisar({"servicio": self.servicio}, token="").status_code, (401, 403))
+        self.assertFalse(ServicioCatalogo.objects.exists())
+
+    def test_aplica_el_cambio_sin_llamar_al_microservicio(self):
+        with mock.patch('cita.services.catalogo.cliente_servicios') as cliente:
+            self.assertEqual(self._avisar({"servicio": self.servicio}).status_code, 200)
+            self.assertEqual(obtener_servicio(7).duracion, timedelta(hours=1))
+
+            self.assertEqual(self._avisar({"servicio": {**self.servicio, "precio": "32000"}}).status_code, 200)
+            self.assertEqual(obtener_servicio(7).precio, Decimal('32000'))
+
+            self.assertEqual(self._avisar({"eliminado": 7}).status_code, 200)
+            self.assertIsNone(obtener_servicio(7))
+        cliente.assert_not_called()
+
+        self.assertEqual(self._avisar({"servicio": {"id": 8}}).status_code, 400)
+
+
+class DisponibilidadTest(CitasTestBase):
+    """Fusión de bloqueos, bordes de las franjas, citas que pasan de medianoche y el endpoint por rango."""
+
+    dia = date(2026, 3, 2)
+
+    def _h(self, hora, minuto=0):
+        return datetime.combine(self.dia, time(hora, minuto))
+
+    def test_fusiona_intervalos_solapados_y_contiguos(self):
+        intervalos = [
+            (self._h(9), self._h(10)), (self._h(8), self._h(9)),
+            (self._h(12), self._h(13)), (self._h(12, 30), self._h(12, 45)), (self._h(14), self._h(15)),
+        ]
+        self.assertEqual(fusionar_intervalos(intervalos), [
+            (self._h(8), self._h(10)), (self._h(12), self._h(13)), (self._h(14), self._h(15)),
+        ])
+
+    def test_bordes_de_novedades_y_citas(self):
+        resultado = calcular_disponibilidad(
+            self.dia, [(self._h(10), self._h(11))], [(self._h(14), self._h(15))]
+        )
+        horas = resultado["horas_disponibles"]
+        # El inicio bloquea y el fin libera; la cita bloquea además la media hora anterior
+        self.assertIn("09:30", horas)
+        self.assertNotIn("10:00", horas)
+        self.assertNotIn("10:30", horas)
+        self.assertIn("11:00", horas)
+        self.assertIn("13:00", horas)
+        self.assertNotIn("13:30", horas)
+        self.assertNotIn("14:30", horas)
+        self.assertIn("15:00", horas)
+        self.assertEqual((horas[0], horas[-1]), ("08:00", "17:30"))
+        self.assertEqual(resultado["no_recomendables"], ["13:30"])
+
+    def test_cita_que_pasa_de_medianoche(self):
+        self._crear_citas(1)
+        cita = CitaVenta.objects.get()
+        cita.Hora = time(23, 30)
+        cita.Duracion = timedelta(hours=1)
+        cita.save()
+        self.assertEqual(cita.HoraFin, time.max)
+
+        fecha, manicurista = cita.Fecha, cita.manicurista_id
+        inicio = datetime.combine(fecha, time(23, 45))
+        self.assertEqual(buscar_cita_solapada(fecha, inicio, inicio + timedelta(minutes=1), manicurista=manicurista), cita)
+        inicio = datetime.combine(fecha, time(23, 59))
+        self.assertEqual(buscar_cita_solapada(fecha, inicio, inicio + timedelta(minutes=1), manicurista=manicurista), cita)
+        inicio = datetime.combine(fecha, time(23, 0))
+        self.assertIsNone(buscar_cita_solapada(fecha, inicio, inicio + timedelta(minutes=30), manicurista=manicurista))
+
+    def test_migracion_recupera_citas_sin_duracion(self):
+        migracion = importlib.import_module('cita.migrations.0011_citaventa_duracion_existentes')
+        self._crear_citas(2)
+        con_servicios, sin_servicios = CitaVenta.objects.order_by('id')
+        ServicioCatalogo.objects.create(id=1, nombre="Acrílicas", precio=30000, duracion=timedelta(minutes=45))
+        ServicioCita.objects.create(cita_id=con_servicios, servicio_id=1)
+        ServicioCita.objects.create(cita_id=con_servicios, servicio_id=2)  # no replicado
+        # Como quedaron tras 0003: sin duración y HoraFin igual a Hora
+        CitaVenta.objects.update(Duracion=timedelta(0), HoraFin=F('Hora'))
+
+        migracion.calcular_duraciones(django_apps, None)
+        con_servicios.refresh_from_db()
+        sin_servicios.refresh_from_db()
+        self.assertEqual((con_servicios.Duracion, con_servicios.HoraFin), (timedelta(minutes=75), time(10, 15)))
+        self.assertEqual(sin_servicios.Duracion, timedelta(0))
+
+        inicio = datetime.combine(con_servicios.Fecha, time(10, 0))
+        self.assertEqual(buscar_cita_solapada(
+            con_servicios.Fecha, inicio, inicio + timedelta(minutes=1), manicurista=con_servicios.manicurista_id
+        ), con_servicios)
+
+    def test_rango_coincide_con_el_dia_y_valida_manicuristas(self):
+        self._crear_citas(1)
+        cita = CitaVenta.objects.get()
+        cita.Hora = time(10, 0)
+        cita.Duracion = timedelta(hours=1)
+        cita.save()
+        manicurista_id = cita.manicurista_id_id
+        url = '/api/cita-venta/citas-venta/'
+
+        respuesta = self.client.get(f"{url}disponibilidad/", {
+            'fecha_inicio': cita.Fecha, 'fecha_fin': cita.Fecha + timedelta(days=1), 'manicurista_ids': manicurista_id,
+        })
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(len(respuesta.data), 2)
+        dia = self.client.get(f"{url}horas-disponibles/", {'manicurista_id': manicurista_id, 'fecha': cita.Fecha})
+        self.assertEqual(respuesta.data[0]["horas_disponibles"], dia.data["horas_disponibles"])
+        self.assertNotIn("10:00", dia.data["horas_disponibles"])
+
+        respuesta = self.client.get(f"{url}disponibilidad/", {
+            'fecha_inicio': cita.Fecha, 'fecha_fin': cita.Fecha, 'manicurista_ids': f"{manicurista_id},999999",
+        })
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertIn("999999", respuesta.data["error"])
+        respuesta = self.client.get(f"{url}horas-disponibles/", {'manicurista_id': 999999, 'fecha': cita.Fecha})
+        self.assertEqual(respuesta.status_code, 400)
+
+
+class AsegurarServiciosTest(TestCase):
+    """Los servicios que faltan en la réplica se piden en una sola llamada al endpoint bulk."""
+
+    def setUp(self):
+        cache.clear()
+        ServicioCatalogo.objects.create(id=1, nombre="Acrílicas", precio=30000, tipo="Manicure")
+
+    def test_pide_solo_los_faltantes_en_una_llamada(self):
+        respuesta = mock.Mock(status_code=200)
+        respuesta.json.return_value = {
+            "servicios": [{"id": 2, "nombre": "Spa de pies", "precio": "20000.00", "duracion": "00:45:00",
+                           "estado": "Activo", "tipo": "Pedicure"}],
+            "errores": {"3": "El servicio no existe"},
+        }
+        with mock.patch('cita.services.catalogo.cliente_servicios') as cliente:
+            cliente.return_value.post.return_value = respuesta
+            encontrados, errores = asegurar_servicios([1, 2, 3])
+            self.assertEqual(cliente.return_value.post.call_count, 1)
+            self.assertEqual(cliente.return_value.post.call_args.kwargs['json'], {"ids": [2, 3]})
+            self.assertEqual(sorted(encontrados), [1, 2])
+            self.assertEqual(errores, {3: "El servicio no existe"})
+            self.assertEqual(ServicioCatalogo.objects.get(id=2).duracion, timedelta(minutes=45))
+
+            asegurar_servicios([1, 2])
+            self.assertEqual(cliente.return_value.post.call_count, 1)
+
+    def test_sin_conexion_reporta_los_faltantes(self):
+        with mock.patch('cita.services.catalogo.cliente_servicios') as cliente:
+            cliente.return_value.post.side_effect = requests.exceptions.ConnectionError("sin red")
+            encontrados, errores = asegurar_servicios([1, 4])
+        self.assertEqual(list(encontrados), [1])
+        self.assertEqual(list(errores), [4])
+        self.assertIn("No se pudo conectar", errores[4])
+
+
+class ClienteHTTPTest(TestCase):
+    """Reintentos con backoff, apertura del circuito y una sola prueba en el semiabierto."""
+
+    def setUp(self):
+        self.cliente = ClienteHTTP('prueba', 'http://servicio', reintentos=2, umbral_fallos=3, espera_circuito=30)
+        self.reloj = [1000.0]
+        for objetivo, efecto in (('utils.http_client.time.sleep', None), ('utils.http_client.logger', None),
+                                 ('utils.http_client.time.monotonic', lambda: self.reloj[0])):
+            parche = mock.patch(objetivo, side_effect=efecto)
+            parche.start()
+            self.addCleanup(parche.stop)
+
+    def _respuesta(self, status_code=200):
+        return mock.Mock(status_code=status_code)
+
+    def _enviar(self, efecto, metodo='get'):
+        with mock.patch.object(self.cliente.session, 'request', side_effect=efecto) as request:
+            try:
+                resultado = getattr(self.cliente, metodo)('recurso/')
+            except requests.exceptions.RequestException as error:
+                resultado = error
+        return resultado, request.call_count
+
+    def _abrir(self):
+        for _ in range(3):
+            self._enviar(requests.exceptions.ConnectionError("caído"), metodo='post')
+
+    def test_reintenta_solo_los_metodos_idempotentes(self):
+        self.cliente.umbral_fallos = 100  # este caso no debe abrir el circuito
+        caido = requests.exceptions.ConnectionError("caído")
+        resultado, llamadas = self._enviar([caido, caido, self._respuesta()])
+        self.assertEqual((resultado.status_code, llamadas), (200, 3))
+
+        resultado, llamadas = self._enviar([caido] * 3)
+        self.assertIsInstance(resultado, requests.exceptions.ConnectionError)
+        self.assertEqual(llamadas, 3)
+        resultado, llamadas = self._enviar([caido, self._respuesta()], metodo='post')
+        self.assertEqual(llamadas, 1)
+
+        resultado, llamadas = self._enviar([self._respuesta(503)] * 3)
+        self.assertEqual((resultado.status_code, llamadas), (503, 3))
+
+    def test_abre_el_circuito_al_llegar_al_umbral(self):
+        self._abrir()
+        with mock.patch.object(self.cliente.session, 'request') as request:
+            with self.assertRaises(CircuitoAbierto):
+                self.cliente.get('recurso/')
+        request.assert_not_called()
+        self.assertTrue(self.cliente.metricas()['circuito_abierto'])
+
+    def test_prueba_exitosa_cierra_el_circuito(self):
+        self._abrir()
+        self.reloj[0] += 31
+        # Mientras la prueba está en curso las demás peticiones fallan rápido
+        self.assertTrue(self.cliente._verificar_circuito())
+        with self.assertRaises(CircuitoAbierto):
+            self.cliente._verificar_circuito()
+        self.cliente._registrar('GET recurso/', 0.01, error=False, prueba=True)
+
+        with mock.patch.object(self.cliente.session, 'request', return_value=self._respuesta()) as request:
+            self.cliente.get('recurso/')
+            self.cliente.get('recurso/')
+        self.assertEqual(request.call_count, 2)
+        self.assertFalse(self.cliente.metricas()['circuito_abierto'])
+
+    def test_prueba_fallida_reabre_el_circuito(self):
+        self._abrir()
+        self.reloj[0] += 31
+        resultado, llamadas = self._enviar([requests.exceptions.ConnectionError("sigue caído")], metodo='post')
+        self.assertEqual(llamadas, 1)
+        self.assertIsInstance(resultado, requests.exceptions.ConnectionError)
+        self.assertTrue(self.cliente.metricas()['circuito_abierto'])
+
+        self.reloj[0] += 29
+        with self.assertRaises(CircuitoAbierto):
+            self.cliente.get('recurso/')
+
+    @skipUnless(COPIA_HTTP_CLIENT.exists(), "microservicio_servicios no está junto al monolítico")
+    def test_copias_identicas(self):
+        local = Path(__file__).resolve().parent.parent / 'utils' / 'http_client.py'
+        self.assertEqual(local.read_bytes(), COPIA_HTTP_CLIENT.read_bytes())
@@ -4,11 +4,13 @@ from rest_framework.routers import DefaultRouter
 from .views.estado_cita_view import EstadoCitaViewSet
 from .views.cita_venta_view import CitaVentaViewSet
 from .views.servicio_cita_view import ServicioCitaViewSet
+from .views.servicio_catalogo_view import ServicioCatalogoViewSet
 
 router = DefaultRouter()
 router.register(r'estados-cita', EstadoCitaViewSet)
 router.register(r'citas-venta', CitaVentaViewSet, basename='citas-venta')
 router.register(r'servicios-cita', ServicioCitaViewSet)
+router.register(r'catalogo-servicios', ServicioCatalogoViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -1,7 +1,10 @@
 from datetime import timedelta, date, datetime, time
 import calendar
 
-from django.db.models import Count, Sum, Q
+from django.db import transaction
+from django.db.models import Sum, Q, F
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_date
 
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -11,8 +14,15 @@ from rest_framework import viewsets, status
 from ..models.cita_venta_model import CitaVenta
 from ..models.estado_cita_model import EstadoCita
 from ..models.servicio_cita_model import ServicioCita
+from ..models.resumen_citas_model import ResumenDiarioCitas, ResumenClienteCitas
 
 from ..serializers.cita_venta_serializer import CitaVentaSerializer
+from ..services.catalogo import catalogo_servicios
+from ..services.consultas import citas_para_serializar, totales_citas_terminadas
+from ..services.disponibilidad import disponibilidad_manicurista, disponibilidad_rango, MAX_DIAS_RANGO
+from ..services.exportacion import filas_exportacion, FORMATOS
+from ..services.tablero import obtener_tablero
+from ..services.ingresos import ingresos_por_periodo, PERIODOS, AGRUPACIONES, MAX_DIAS_INGRESOS
 
 from usuario.models.cliente_model import Cliente
 from usuario.models.manicurista_model import Manicurista
@@ -20,15 +30,22 @@ from usuario.models.manicurista_model import Manicurista
 from manicurista.models.novedades_model import Novedades
 
 from utils.email_utils import enviar_correo_confirmacion
+from utils.estados import (
+    estados_cita, ESTADO_CITA_PENDIENTE, ESTADO_CITA_EN_PROCESO,
+    ESTADO_CITA_TERMINADA, ESTADO_CITA_CANCELADA
+)
+from utils.paginacion import PaginacionCursor
 from utils.permisos import TienePermisoModulo
 
 class CitaVentaViewSet(viewsets.ModelViewSet):
     serializer_class = CitaVentaSerializer
     queryset = CitaVenta.objects.all()
+    pagination_class = PaginacionCursor
+    orden_cursor = ('Fecha', 'Hora', 'id')
     # permission_classes = [TienePermisoModulo("Citas")];
 
     def get_queryset(self):
-        queryset = CitaVenta.objects.all()
+        queryset = citas_para_serializar()
         manicurista_id = self.request.query_params.get('manicurista_id')
         cliente_id = self.request.query_params.get('cliente_id')
         if manicurista_id is not None:
@@ -42,31 +59,32 @@ class CitaVentaViewSet(viewsets.ModelViewSet):
         data = request.data.copy()
 
         # Forzar estado 'En proceso'
-        estado_en_proceso = EstadoCita.objects.get(Estado='Pendiente')
-        data['estado_id'] = estado_en_proceso.id
+        data['estado_id'] = estados_cita.id(ESTADO_CITA_PENDIENTE)
         
         serializer = self.get_serializer(data=data)
         serializer.is_valid(raise_exception=True)
-        cita = serializer.save()
-
-        cliente = Cliente.objects.get(pk=cita.cliente_id)
-        manicurista = Manicurista.objects.get(pk=cita.manicurista_id)
-
-        # Obtener servicios asociados
-        servicios = ServicioCita.objects.filter(cita_id=cita)
-        servicios_data = [{
-            "nombre": s.servicio_id.nombre,
-            "subtotal": s.servicio_id.precio
-        } for s in servicios]
-
-        # Enviar correo de confirmación
-        enviar_correo_confirmacion(
-            destinatario=cliente.correo,
-            nombre_cliente=f"{cliente.nombre} {cliente.apellido}",
-            fecha=cita.Fecha,
-            hora=cita.Hora,
-            servicios=servicios_data
-        )
+        with transaction.atomic():
+            cita = serializer.save()
+
+            cliente = Cliente.objects.get(pk=cita.cliente_id)
+            manicurista = Manicurista.objects.get(pk=cita.manicurista_id)
+
+            # Obtener servicios asociados
+            servicios = ServicioCita.objects.filter(cita_id=cita)
+            catalogo = catalogo_servicios()
+            servicios_data = [{
+                "nombre": catalogo[s.servicio_id].nombre,
+                "subtotal": catalogo[s.servicio_id].precio
+            } for s in servicios if s.servicio_id in catalogo]
+
+            # Encolar correo de confirmación en la misma transacción que la cita
+            enviar_correo_confirmacion(
+                destinatario=cliente.correo,
+                nombre_cliente=f"{cliente.nombre} {cliente.apellido}",
+                fecha=cita.Fecha,
+                hora=cita.Hora,
+                servicios=servicios_data
+            )
 
         headers = self.get_success_headers(serializer.data)
         return Response(
@@ -107,8 +125,7 @@ class CitaVentaViewSet(viewsets.ModelViewSet):
     def destroy(self, request, *args, **kwargs):
         try:
             cita_venta = self.get_object()
-            estado_cancelado = EstadoCita.objects.get(Estado='Cancelada')
-            cita_venta.estado_id = estado_cancelado
+            cita_venta.estado_id = estados_cita.obtener(ESTADO_CITA_CANCELADA)
             cita_venta.save()
 
             cliente = Cliente.objects.get(pk=cita_venta.cliente_id)
@@ -151,19 +168,11 @@ Gracias por su comprensión.
     def cambiar_estado(self, request, pk=None):
         try:
             cita_venta = self.get_object()
-            print("estado de la instancia ",cita_venta.estado_id.id)
-    
-            estado_pendiente = EstadoCita.objects.get(Estado='Pendiente')
-            print("estado pendiene en la db ",estado_pendiente.id)
-            estado_en_proceso = EstadoCita.objects.get(Estado='En Proceso')
-            print("Estado en proceso ",estado_en_proceso.id)
-            estado_terminada = EstadoCita.objects.get(Estado='Terminada')
-            print("Estado terminado ",estado_terminada.id)
-    
-            if cita_venta.estado_id.id == estado_pendiente.id:
-                nuevo_estado = estado_en_proceso
-            elif cita_venta.estado_id.id == estado_en_proceso.id:
-                nuevo_estado = estado_terminada
+
+            if estados_cita.es(cita_venta.estado_id_id, ESTADO_CITA_PENDIENTE):
+                nuevo_estado = estados_cita.obtener(ESTADO_CITA_EN_PROCESO)
+            elif estados_cita.es(cita_venta.estado_id_id, ESTADO_CITA_EN_PROCESO):
+                nuevo_estado = estados_cita.obtener(ESTADO_CITA_TERMINADA)
             else:
                 return Response({
                     "message": "La cita no está en un estado que permita avanzar (debe ser 'Pendiente' o 'En proceso')."
@@ -188,23 +197,25 @@ Gracias por su comprensión.
       try:
         semana_param = request.query_params.get('semana', None)
         if semana_param:
-            # Convertir '2025-W23' a fecha inicio y fin de la semana
-            anio, semana = semana_param.split('-W')
-            inicio_semana = datetime.strptime(f'{anio}-W{semana}-1', "%Y-W%W-%w").date()
+            # Convertir '2025-W23' (semana ISO) a fecha inicio y fin de la semana
+            try:
+                anio, semana = semana_param.split('-W')
+                inicio_semana = date.fromisocalendar(int(anio), int(semana), 1)
+            except ValueError:
+                return Response({"error": "La semana debe tener el formato YYYY-Www, por ejemplo 2025-W23."},
+                                status=status.HTTP_400_BAD_REQUEST)
         else:
             hoy = date.today()
             inicio_semana = hoy - timedelta(days=hoy.weekday())
 
         fin_semana = inicio_semana + timedelta(days=6)
 
-        estado_terminada = EstadoCita.objects.get(Estado='Terminada')
-
-        citas = CitaVenta.objects.filter(
-            Fecha__range=[inicio_semana, fin_semana],
-            estado_id=estado_terminada.id
+        resumen = ResumenDiarioCitas.objects.filter(
+            fecha__range=[inicio_semana, fin_semana],
+            estado_id=estados_cita.id(ESTADO_CITA_TERMINADA)
         )
 
-        total_ganancia = citas.aggregate(total=Sum('Total'))['total'] or 0
+        total_ganancia = resumen.aggregate(total=Sum('total'))['total'] or 0
 
         return Response({
             "ganancia_total": total_ganancia,
@@ -220,6 +231,53 @@ Gracias por su comprensión.
         return Response({"error": f"Error al calcular la ganancia semanal: {str(e)}"},
                         status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
+    @action(detail=False, methods=['get'], url_path='ingresos')
+    def ingresos(self, request):
+        """
+        Ingresos de citas terminadas en cualquier rango.
+        Parámetros: desde y hasta (YYYY-MM-DD), periodo (dia|semana|mes),
+        agrupar (manicurista|servicio|tipo) y manicurista_id, los tres últimos opcionales.
+        """
+        try:
+            desde = parse_date(request.query_params.get('desde') or '')
+            hasta = parse_date(request.query_params.get('hasta') or '')
+        except ValueError:
+            desde = hasta = None
+        periodo = request.query_params.get('periodo', 'dia')
+        agrupar = request.query_params.get('agrupar') or None
+
+        if not desde or not hasta or desde > hasta:
+            return Response({"error": "Se requieren desde y hasta (YYYY-MM-DD), con desde <= hasta."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if (hasta - desde).days > MAX_DIAS_INGRESOS:
+            return Response({"error": f"El rango no puede superar {MAX_DIAS_INGRESOS} días."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if periodo not in PERIODOS:
+            return Response({"error": f"periodo debe ser uno de: {', '.join(PERIODOS)}."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if agrupar is not None and agrupar not in AGRUPACIONES:
+            return Response({"error": f"agrupar debe ser uno de: {', '.join(AGRUPACIONES)}."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            resultados = ingresos_por_periodo(
+                desde, hasta, periodo, agrupar, request.query_params.get('manicurista_id')
+            )
+            return Response({
+                "desde": desde,
+                "hasta": hasta,
+                "periodo": periodo,
+                "agrupar": agrupar,
+                "resultados": resultados
+            }, status=status.HTTP_200_OK)
+        except EstadoCita.DoesNotExist:
+            return Response({"error": "El estado 'Terminada' no existe."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            print(e)
+            return Response({"error": f"Error al calcular los ingresos: {str(e)}"},
+                            status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
     @action(detail=False, methods=['get'], url_path='ganancia-semanal-anterior')
     def ganancia_semanal_anterior(self, request):
      try:
@@ -228,14 +286,12 @@ Gracias por su comprensión.
         inicio_semana_anterior = inicio_semana_actual - timedelta(days=7)
         fin_semana_anterior = inicio_semana_anterior + timedelta(days=6)
 
-        estado_terminada = EstadoCita.objects.get(Estado='Terminada')
-
-        citas = CitaVenta.objects.filter(
-            Fecha__range=[inicio_semana_anterior, fin_semana_anterior],
-            estado_id=estado_terminada.id
+        resumen = ResumenDiarioCitas.objects.filter(
+            fecha__range=[inicio_semana_anterior, fin_semana_anterior],
+            estado_id=estados_cita.id(ESTADO_CITA_TERMINADA)
         )
 
-        total_ganancia = citas.aggregate(total=Sum('Total'))['total'] or 0
+        total_ganancia = resumen.aggregate(total=Sum('total'))['total'] or 0
 
         return Response({
             "ganancia_total": total_ganancia,
@@ -252,19 +308,46 @@ Gracias por su comprensión.
                         status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+    @action(detail=False, methods=['get'], url_path='tablero')
+    def tablero(self, request):
+        """
+        Todos los widgets del tablero en una respuesta, cacheada por semana y manicurista.
+        Parámetros: semana en formato ISO (2025-W23) y manicurista_id, ambos opcionales.
+        """
+        semana_param = request.query_params.get('semana')
+        if semana_param:
+            try:
+                anio, semana = semana_param.split('-W')
+                inicio_semana = date.fromisocalendar(int(anio), int(semana), 1)
+            except ValueError:
+                return Response({"error": "La semana debe tener el formato YYYY-Www, por ejemplo 2025-W23."},
+                                status=status.HTTP_400_BAD_REQUEST)
+        else:
+            hoy = date.today()
+            inicio_semana = hoy - timedelta(days=hoy.weekday())
+
+        try:
+            return Response(obtener_tablero(inicio_semana, request.query_params.get('manicurista_id')), status=status.HTTP_200_OK)
+        except EstadoCita.DoesNotExist:
+            return Response({"error": "Estados 'Pendiente' o 'Terminada' no existen."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        except Exception as e:
+            print(e)
+            return Response({"error": f"Error al obtener el tablero: {str(e)}"},
+                            status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
     @action(detail=False, methods=['get'], url_path='servicios-dia')
     def servicios_del_dia(self, request):
         try:
             hoy = date.today()
-            estado_terminada = EstadoCita.objects.get(Estado='Terminada')
-
-            citas_hoy = CitaVenta.objects.filter(
-                Fecha=hoy,
-                estado_id=estado_terminada.id
+            resumen_hoy = ResumenDiarioCitas.objects.filter(
+                fecha=hoy,
+                estado_id=estados_cita.id(ESTADO_CITA_TERMINADA),
+                cantidad__gt=0
             )
 
-            resumen = citas_hoy.values('manicurista_id__nombre', 'manicurista_id__apellido') \
-                .annotate(servicios=Count('id')) \
+            resumen = resumen_hoy.values('manicurista_id__nombre', 'manicurista_id__apellido') \
+                .annotate(servicios=Sum('cantidad')) \
                 .order_by('-servicios')
 
             data = [
@@ -287,12 +370,12 @@ Gracias por su comprensión.
     @action(detail=False, methods=['get'], url_path='clientes-top')
     def clientes_top(self, request):
         try:
-            estado_terminada = EstadoCita.objects.get(Estado='Terminada')
-
-            top_clientes = CitaVenta.objects.filter(estado_id=estado_terminada.id) \
-                .values('cliente_id__nombre', 'cliente_id__apellido') \
-                .annotate(citas=Count('id')) \
-                .order_by('-citas')[:3]
+            top_clientes = ResumenClienteCitas.objects.filter(
+                estado_id=estados_cita.id(ESTADO_CITA_TERMINADA),
+                cliente_id__isnull=False,
+                cantidad__gt=0
+            ).values('cliente_id__nombre', 'cliente_id__apellido', citas=F('cantidad')) \
+                .order_by('-cantidad')[:3]
 
             data = [
                 {
@@ -318,27 +401,28 @@ Gracias por su comprensión.
         inicio_semana = hoy - timedelta(days=hoy.weekday())
         fin_semana = inicio_semana + timedelta(days=6)
 
-        estado_pendiente = EstadoCita.objects.get(Estado='Pendiente')
-        estado_terminada = EstadoCita.objects.get(Estado='Terminada')
+        estado_pendiente_id = estados_cita.id(ESTADO_CITA_PENDIENTE)
+        estado_terminada_id = estados_cita.id(ESTADO_CITA_TERMINADA)
 
         manicurista_id = request.query_params.get('manicurista_id')
 
-        citas = CitaVenta.objects.filter(
-            Fecha__range=[inicio_semana, fin_semana]
+        resumen = ResumenDiarioCitas.objects.filter(
+            fecha__range=[inicio_semana, fin_semana],
+            estado_id__in=[estado_pendiente_id, estado_terminada_id]
         )
         if manicurista_id:
-            citas = citas.filter(manicurista_id=manicurista_id)
+            resumen = resumen.filter(manicurista_id=manicurista_id)
 
-        citas = citas.values('Fecha', 'estado_id')
+        resumen = resumen.values('fecha', 'estado_id').annotate(citas=Sum('cantidad'))
 
         dias = {i: {"name": calendar.day_name[i], "Pendiente": 0, "Terminada": 0} for i in range(7)}
 
-        for cita in citas:
-            dia_idx = cita['Fecha'].weekday()
-            if cita['estado_id'] == estado_pendiente.id:
-                dias[dia_idx]["Pendiente"] += 1
-            elif cita['estado_id'] == estado_terminada.id:
-                dias[dia_idx]["Terminada"] += 1
+        for fila in resumen:
+            dia_idx = fila['fecha'].weekday()
+            if fila['estado_id'] == estado_pendiente_id:
+                dias[dia_idx]["Pendiente"] += fila['citas']
+            elif fila['estado_id'] == estado_terminada_id:
+                dias[dia_idx]["Terminada"] += fila['citas']
 
         resultado = [dias[i] for i in range(7)]
 
@@ -363,20 +447,19 @@ Gracias por su comprensión.
             }, status = status.HTTP_400_BAD_REQUEST)
             
         try:
-            estado_terminada = EstadoCita.objects.get(Estado = "Terminada")
             citas = CitaVenta.objects.filter(
                 manicurista_id = manicurista_id,
-                estado_id = estado_terminada,
+                estado_id = estados_cita.id(ESTADO_CITA_TERMINADA),
                 Fecha__range = [fecha_inicio, fecha_final]
             ).values("id",'Total','Fecha')
 
-            total_general = sum(cita["Total"] for cita in citas)
+            totales = totales_citas_terminadas(manicurista_id, fecha_inicio, fecha_final)
             
             return Response({
                 "detalle": list(citas),
                 "resumen":{
-                    "total_citas": len(citas),
-                    "total_general" : float(total_general)
+                    "total_citas": totales['cantidad'],
+                    "total_general" : float(totales['total'])
                 }
             }, status= status.HTTP_200_OK)
             
@@ -392,9 +475,7 @@ Gracias por su comprensión.
         try:
             data = request.data.copy()
 
-            estado_terminada = EstadoCita.objects.get(Estado='Terminada')
-
-            data['estado_id'] = estado_terminada.id
+            data['estado_id'] = estados_cita.id(ESTADO_CITA_TERMINADA)
 
             serializer = self.get_serializer(data=data)
             serializer.is_valid(raise_exception=True)
@@ -415,16 +496,54 @@ Gracias por su comprensión.
             return Response({"error": f"Error al crear la cita terminada: {str(e)}"},
                             status=status.HTTP_500_INTERNAL_SERVER_ERROR)
             
+    @action(detail=False, methods=['get'], url_path='exportar')
+    def exportar(self, request):
+        """
+        Historial de citas en CSV o NDJSON, enviado por partes a medida que se consulta.
+        Filtros: fecha_inicio, fecha_fin (YYYY-MM-DD), manicurista_id, estado (nombre) y formato (csv|ndjson).
+        """
+        formato = request.query_params.get('formato', 'csv').lower()
+        if formato not in FORMATOS:
+            return Response({"error": "Formato no soportado. Use csv o ndjson."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        citas = CitaVenta.objects.all()
+        for parametro, lookup in (('fecha_inicio', 'Fecha__gte'), ('fecha_fin', 'Fecha__lte')):
+            valor = request.query_params.get(parametro)
+            if valor:
+                try:
+                    fecha = parse_date(valor)
+                except ValueError:
+                    fecha = None
+                if fecha is None:
+                    return Response({"error": f"{parametro} debe tener el formato YYYY-MM-DD."},
+                                    status=status.HTTP_400_BAD_REQUEST)
+                citas = citas.filter(**{lookup: fecha})
+
+        manicurista_id = request.query_params.get('manicurista_id')
+        if manicurista_id:
+            citas = citas.filter(manicurista_id=manicurista_id)
+
+        estado = request.query_params.get('estado')
+        if estado:
+            try:
+                citas = citas.filter(estado_id=estados_cita.id(estado))
+            except EstadoCita.DoesNotExist:
+                return Response({"error": f"El estado '{estado}' no existe."},
+                                status=status.HTTP_400_BAD_REQUEST)
+
+        generador, content_type = FORMATOS[formato]
+        respuesta = StreamingHttpResponse(generador(filas_exportacion(citas)), content_type=content_type)
+        respuesta['Content-Disposition'] = f'attachment; filename="citas_{date.today():%Y%m%d}.{formato}"'
+        return respuesta
+
     @action(detail=False, methods=['get'], url_path='en-proceso')
     def citas_en_proceso(self, request):
         try:
 
-            estado_en_proceso = EstadoCita.objects.get(Estado='En proceso')
-            estado_pendiente = EstadoCita.objects.get(Estado='Pendiente')
-
-            citas = CitaVenta.objects.filter(
-                 Q(estado_id=estado_en_proceso.id) | Q(estado_id=estado_pendiente.id)
-            )
+            citas = citas_para_serializar(CitaVenta.objects.filter(
+                estado_id__in=estados_cita.ids_existentes(ESTADO_CITA_EN_PROCESO, ESTADO_CITA_PENDIENTE)
+            ))
 
 
             serializer = self.get_serializer(citas, many=True)
@@ -444,9 +563,7 @@ Gracias por su comprensión.
     def terminar_cita(self, request, pk=None):
       try:
         cita = CitaVenta.objects.get(pk=pk)
-        estado_terminada = EstadoCita.objects.get(Estado='Terminada')
-
-        cita.estado_id = estado_terminada
+        cita.estado_id = estados_cita.obtener(ESTADO_CITA_TERMINADA)
         cita.save()
 
         return Response({"mensaje": "Cita terminada correctamente."}, status=status.HTTP_200_OK)
@@ -473,57 +590,51 @@ Gracias por su comprensión.
         except ValueError:
            return Response({"error": "Fecha inválida"}, status=400)
 
-        manicurista = Manicurista.objects.get(pk=manicurista_id)
-
-        jornada_inicio = time(8, 0)
-        jornada_fin = time(17, 30)
-        intervalo = timedelta(minutes=30)
-
-        horas_disponibles = []
-        actual = datetime.combine(fecha, jornada_inicio)
-        fin = datetime.combine(fecha, jornada_fin)
-
-        while actual <= fin:
-           horas_disponibles.append(actual.time())
-           actual += intervalo
+        manicurista = Manicurista.objects.filter(pk=manicurista_id).first() if manicurista_id.isdigit() else None
+        if manicurista is None:
+           return Response({"error": "Manicurista no encontrada"}, status=400)
 
-        novedades = Novedades.objects.filter(manicurista_id=manicurista, Fecha=fecha)
-        for novedad in novedades:
-         horas_disponibles = [
-            h for h in horas_disponibles
-            if not (novedad.HoraEntrada <= h < novedad.HoraSalida)
-         ]
+        return Response(disponibilidad_manicurista(manicurista, fecha))
 
-        citas = CitaVenta.objects.filter(
-           manicurista_id=manicurista,
-           Fecha=fecha,
-           estado_id__Estado__in=["Pendiente", "En proceso"]
-        )
-
-        horas_no_recomendables = set()
+    @action(detail=False, methods=['get'], url_path='disponibilidad')
+    def disponibilidad(self, request):
+        """
+        Disponibilidad de varias manicuristas en un rango de fechas en una sola petición.
+        Si no se envía 'manicurista_ids' (lista separada por comas) se usan las manicuristas activas.
+        """
+        fecha_inicio_str = request.GET.get('fecha_inicio')
+        fecha_fin_str = request.GET.get('fecha_fin')
+        manicurista_ids_str = request.GET.get('manicurista_ids')
 
-        for cita in citas:
-            servicios = ServicioCita.objects.filter(cita_id=cita.id)
-            if not servicios.exists():
-               continue
+        if not fecha_inicio_str or not fecha_fin_str:
+            return Response({"error": "Se requieren los parámetros fecha_inicio y fecha_fin"}, status=400)
 
-            duracion = sum((sc.servicio_id.duracion for sc in servicios), timedelta())
-            inicio = datetime.combine(fecha, cita.Hora)
-            fin_cita = inicio + duracion
+        try:
+            fecha_inicio = datetime.strptime(fecha_inicio_str, "%Y-%m-%d").date()
+            fecha_fin = datetime.strptime(fecha_fin_str, "%Y-%m-%d").date()
+        except ValueError:
+            return Response({"error": "Fecha inválida"}, status=400)
 
-            inicio_bloqueo = inicio - timedelta(minutes=30)
+        if fecha_fin < fecha_inicio:
+            return Response({"error": "La fecha final no puede ser anterior a la fecha inicial"}, status=400)
 
-            horas_disponibles = [
-               h for h in horas_disponibles
-              if not (inicio_bloqueo.time() <= h < fin_cita.time())
-            ]
+        if (fecha_fin - fecha_inicio).days >= MAX_DIAS_RANGO:
+            return Response({"error": f"El rango no puede superar {MAX_DIAS_RANGO} días"}, status=400)
 
-            margen = inicio - timedelta(minutes=30)
-            if jornada_inicio <= margen.time() <= jornada_fin:
-               horas_no_recomendables.add(margen.time())
-
-        return Response({
-          "horas_disponibles": [h.strftime("%H:%M") for h in horas_disponibles],
-          "no_recomendables": [h.strftime("%H:%M") for h in horas_no_recomendables]
-        })
+        if manicurista_ids_str:
+            try:
+                manicurista_ids = [int(valor) for valor in manicurista_ids_str.split(',') if valor.strip()]
+            except ValueError:
+                return Response({"error": "Lista de manicuristas inválida"}, status=400)
+            inexistentes = set(manicurista_ids) - set(
+                Manicurista.objects.filter(pk__in=manicurista_ids).values_list('pk', flat=True)
+            )
+            if inexistentes:
+                return Response(
+                    {"error": f"Manicuristas no encontradas: {', '.join(map(str, sorted(inexistentes)))}"},
+                    status=400
+                )
+        else:
+            manicurista_ids = Manicurista.objects.filter(estado="Activo").values_list('pk', flat=True)
 
+        return Response(disponibilidad_rango(manicurista_ids, fecha_inicio, fecha_fin))
@@ -0,0 +1,38 @@
+import requests
+from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from ..models.servicio_catalogo_model import ServicioCatalogo
+from ..serializers.servicio_catalogo_serializer import ServicioCatalogoSerializer
+from ..services.catalogo import aplicar_cambio_catalogo, sincronizar_catalogo
+from utils.permisos import TokenCatalogo
+
+class ServicioCatalogoViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = ServicioCatalogo.objects.all()
+    serializer_class = ServicioCatalogoSerializer
+
+    @action(detail=False, methods=['post'], url_path='sincronizar', permission_classes=[TokenCatalogo])
+    def sincronizar(self, request):
+        """
+        Aviso de microservicio_servicios cuando cambia un servicio; exige X-Catalogo-Token.
+        Con {"servicio": {...}} o {"eliminado": id} aplica solo ese cambio; sin cuerpo
+        vuelve a descargar el catálogo completo.
+        """
+        servicio = request.data.get('servicio')
+        eliminado = request.data.get('eliminado')
+        if servicio is not None or eliminado is not None:
+            try:
+                aplicar_cambio_catalogo(servicio=servicio, eliminado=eliminado)
+            except (KeyError, TypeError, ValueError) as e:
+                return Response({"error": f"Cambio de catálogo inválido: {e}"}, status=status.HTTP_400_BAD_REQUEST)
+            return Response({"message": "Catálogo actualizado"}, status=status.HTTP_200_OK)
+
+        try:
+            resumen = sincronizar_catalogo()
+            return Response(resumen, status=status.HTTP_200_OK)
+        except requests.exceptions.RequestException as e:
+            return Response(
+                {"error": f"No se pudo conectar con el microservicio de servicios: {str(e)}"},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
@@ -1,11 +1,10 @@
-import requests
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from django.utils.timezone import now
 from django.db.models import Count, Q
 from datetime import timedelta
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings # Usar settings para URL de microservicios
 
 from ..models.cita_venta_model import CitaVenta
@@ -13,12 +12,18 @@ from ..models.estado_cita_model import EstadoCita
 from ..models.servicio_cita_model import ServicioCita
 
 from ..serializers.servicio_cita_serializer import ServicioCitaSerializer
+from ..services.catalogo import asegurar_servicios, catalogo_servicios, obtener_servicio, nombre_servicio
+from ..services.disponibilidad import actualizar_duracion_cita
 
 from utils.email_utils import enviar_correo_confirmacion
+from utils.estados import estados_cita, ESTADO_CITA_TERMINADA
+from utils.paginacion import PaginacionCursor
 
 class ServicioCitaViewSet(viewsets.ModelViewSet):
     queryset = ServicioCita.objects.all()
     serializer_class = ServicioCitaSerializer
+    pagination_class = PaginacionCursor
+    orden_cursor = ('cita_id', 'id')
     
     def get_queryset(self):
         cita_id = self.request.query_params.get('cita_id')
@@ -26,19 +31,6 @@ class ServicioCitaViewSet(viewsets.ModelViewSet):
             return ServicioCita.objects.filter(cita_id=cita_id)
         return ServicioCita.objects.all()
     
-    def _obtener_precio_servicio(self, servicio_id):
-        """Función auxiliar para obtener el precio de un servicio desde su API."""
-        try:
-            # URL del microservicio de servicios
-            url = f"http://127.0.0.1:8001/micro-servicios/servicio/{servicio_id}/"
-            response = requests.get(url)
-            print(response)
-            print(url)
-            response.raise_for_status() # Lanza un error para códigos de estado
-            return response.json().get('precio')
-        except requests.exceptions.RequestException:
-            return None
-
     def create(self, request, *args, **kwargs):
         data = request.data.copy()
         serializer = self.get_serializer(data=data)
@@ -57,51 +49,64 @@ class ServicioCitaViewSet(viewsets.ModelViewSet):
         errors = []
         citas_servicios = {}
         
+        # Los servicios que no estén en la réplica local se piden al microservicio en una sola llamada
+        servicio_ids = set()
+        for entry in data:
+            try:
+                servicio_ids.add(int(entry['servicio_id']))
+            except (KeyError, TypeError, ValueError):
+                pass
+        servicios, errores_servicios = asegurar_servicios(servicio_ids)
+
         for entry in data:
             if 'servicio_id' in entry and 'subtotal' not in entry:
-                precio = self._obtener_precio_servicio(entry['servicio_id'])
-                if precio is None:
-                    errors.append({"error": f"El servicio con ID {entry['servicio_id']} no existe o no se pudo obtener su precio."})
+                try:
+                    servicio_id = int(entry['servicio_id'])
+                except (TypeError, ValueError):
+                    servicio_id = None
+                servicio = servicios.get(servicio_id)
+                if servicio is None:
+                    motivo = errores_servicios.get(servicio_id, "El servicio no existe")
+                    errors.append({"error": f"El servicio con ID {entry['servicio_id']} no se pudo obtener: {motivo}"})
                     continue
-                entry['subtotal'] = precio
+                entry['subtotal'] = servicio.precio
             
             servicios_a_crear.append(entry)
         
         serializer = self.get_serializer(data=servicios_a_crear, many=True)
         
         if serializer.is_valid():
-            instances = serializer.save()
-            
-            # Procesar los servicios creados para el correo
-            for item in instances:
-                cita = item.cita_id
-                cliente = cita.cliente_id
-                
-                if cita.id not in citas_servicios:
-                    citas_servicios[cita.id] = {
-                        "cita": cita,
-                        "cliente": cliente,
-                        "servicios": []
-                    }
-            
-                # petición HTTP al microservicio de servicios o lo pases desde el frontend
-                servicios_a_crear_dict = {s['servicio_id']: s for s in servicios_a_crear}   
-                servicio_data = servicios_a_crear_dict.get(item.servicio_id)
-                
-                citas_servicios[cita.id]["servicios"].append({
-                    "nombre":item.nombre,
-                    "subtotal": item.subtotal
-                })
-            
-            # Enviar correos
-            for data in citas_servicios.values():
-                enviar_correo_confirmacion(
-                    destinatario=data["cliente"].correo,
-                    nombre_cliente=data["cliente"].nombre,
-                    fecha=data["cita"].Fecha,
-                    hora=data["cita"].Hora,
-                    servicios=data["servicios"]
-                )
+            with transaction.atomic():
+                instances = serializer.save()
+
+                # Procesar los servicios creados para el correo
+                for item in instances:
+                    cita = item.cita_id
+                    cliente = cita.cliente_id
+
+                    if cita.id not in citas_servicios:
+                        citas_servicios[cita.id] = {
+                            "cita": cita,
+                            "cliente": cliente,
+                            "servicios": []
+                        }
+
+                    servicio = obtener_servicio(item.servicio_id)
+
+                    citas_servicios[cita.id]["servicios"].append({
+                        "nombre": servicio.nombre if servicio else f"Servicio {item.servicio_id}",
+                        "subtotal": item.subtotal
+                    })
+
+                # Encolar correos en la misma transacción que los servicios
+                for data in citas_servicios.values():
+                    enviar_correo_confirmacion(
+                        destinatario=data["cliente"].correo,
+                        nombre_cliente=data["cliente"].nombre,
+                        fecha=data["cita"].Fecha,
+                        hora=data["cita"].Hora,
+                        servicios=data["servicios"]
+                    )
 
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         else:
@@ -118,11 +123,12 @@ class ServicioCitaViewSet(viewsets.ModelViewSet):
             
             # Recalcular el total de la cita después de eliminar el servicio
             nuevo_total = ServicioCita.objects.filter(cita_id=cita).aggregate(
-                total=Sum('subtotal')
+                total=models.Sum('subtotal')
             )['total'] or 0
             
             cita.Total = nuevo_total
             cita.save()
+            actualizar_duracion_cita(cita)
             
             print(f"✅ Total actualizado para la cita {cita.id}: ${nuevo_total}")
             
@@ -147,17 +153,18 @@ class ServicioCitaViewSet(viewsets.ModelViewSet):
 
             # Usar Q object para manejar la consulta de estado de forma segura
             query = Q(cita_id__Fecha__gte=inicio_mes) & Q(cita_id__Fecha__lte=hoy)
-            query &= Q(cita_id__estado_id__Estado='Terminada') 
+            query &= Q(cita_id__estado_id=estados_cita.id(ESTADO_CITA_TERMINADA)) 
             
             servicios_vendidos = (
                 ServicioCita.objects.filter(query)
-                .values('servicio_id', 'servicio_id__nombre')
+                .values('servicio_id')
                 .annotate(ventas=Count('id'))
                 .order_by('-ventas')[:3]
             )
 
+            catalogo = catalogo_servicios()
             data = [
-                {"name": item['servicio_id__nombre'], "ventas": item['ventas']}
+                {"name": nombre_servicio(catalogo, item['servicio_id']), "ventas": item['ventas']}
                 for item in servicios_vendidos
             ]
 
@@ -184,17 +191,18 @@ class ServicioCitaViewSet(viewsets.ModelViewSet):
 
             query = Q(cita_id__Fecha__range=(inicio_semana, fin_semana))
             query &= Q(cita_id__manicurista_id=manicurista_id)
-            query &= Q(cita_id__estado_id__Estado='Terminada')
+            query &= Q(cita_id__estado_id=estados_cita.id(ESTADO_CITA_TERMINADA))
 
             servicios_semana = (
                 ServicioCita.objects.filter(query)
-                .values('servicio_id', 'servicio_id__nombre')
+                .values('servicio_id')
                 .annotate(cantidad=Count('id'))
                 .order_by('-cantidad')[:5]
             )
 
+            catalogo = catalogo_servicios()
             data = [
-                {"servicio": item['servicio_id__nombre'], "cantidad": item['cantidad']}
+                {"servicio": nombre_servicio(catalogo, item['servicio_id']), "cantidad": item['cantidad']}
                 for item in servicios_semana
             ]
 
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-17 18:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compra', '0001_initial'),
+        ('proveedor', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='compra',
+            index=models.Index(fields=['-fechaCompra', 'id'], name='compra_listado_idx'),
+        ),
+    ]
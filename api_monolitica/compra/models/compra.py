@@ -15,5 +15,10 @@ class Compra(models.Model):
     
     observacion = models.TextField(null=True, blank=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['-fechaCompra', 'id'], name='compra_listado_idx'),
+        ]
+    
     def __str__(self):
         return f"{self.fechaIngreso} - {self.fechaCompra} - {self.total} - {self.IVA} - {self.estadoCompra_id} - {self.proveedor_id}"
\ No newline at end of file
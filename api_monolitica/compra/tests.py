@@ -1,3 +1,84 @@
+from unittest import mock
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+
+from insumo.models import Marca, Insumo, InventarioMovimiento
+from proveedor.models import Proveedor
+from .models.compra import Compra
+from .models.compra_insumo import CompraInsumo
+from .models.estado_compra import EstadoCompra
+from .views.compra import CompraViewSet
+from utils.estados import (
+    estados_compra, ESTADO_COMPRA_PENDIENTE, ESTADO_COMPRA_EN_PROCESO, ESTADO_COMPRA_CANCELADA,
+)
+
+
+class CompletarCompraTest(TestCase):
+    """Completar una compra suma el stock con UPDATE por lotes y no lo duplica si se repite."""
+
+    @classmethod
+    def setUpTestData(cls):
+        estado = EstadoCompra.objects.create(Estado="Completada")
+        proveedor = Proveedor.objects.create(
+            tipo_persona="NATURAL", tipo_documento="CC", numero_documento="123", telefono="3000000000",
+            email="proveedor@correo.com", direccion="Calle 1", ciudad="Ciudad",
+        )
+        marca = Marca.objects.create(nombre="Marca")
+        cls.insumos = [Insumo.objects.create(nombre=f"Insumo {n}", stock=0, marca_id=marca) for n in range(30)]
+        cls.compra = Compra.objects.create(estadoCompra_id=estado, proveedor_id=proveedor)
+        CompraInsumo.objects.bulk_create([
+            CompraInsumo(compra_id=cls.compra, insumo_id=insumo, cantidad=n + 1)
+            for n, insumo in enumerate(cls.insumos)
+        ])
+
+    def test_consultas_constantes_y_sin_duplicar(self):
+        vista = CompraViewSet()
+        with CaptureQueriesContext(connection) as consultas:
+            vista._actualizar_stock_al_completar_compra(self.compra)
+        # existe en el historial, líneas, UPDATE de stock, UPDATE de estado, stocks, historial
+        sentencias = [consulta['sql'] for consulta in consultas.captured_queries if 'SAVEPOINT' not in consulta['sql']]
+        self.assertEqual(len(sentencias), 6)
+
+        vista._actualizar_stock_al_completar_compra(self.compra)
+        stocks = dict(Insumo.objects.values_list('id', 'stock'))
+        self.assertEqual([stocks[insumo.pk] for insumo in self.insumos], list(range(1, 31)))
+        self.assertEqual(Insumo.objects.get(pk=self.insumos[-1].pk).estado, "Activo")
+        self.assertEqual(Insumo.objects.get(pk=self.insumos[0].pk).estado, "Bajo")
+        self.assertEqual(InventarioMovimiento.objects.count(), 30)
+
+
+class RegistroEstadosCompraTest(TestCase):
+    """Los estados de compra se resuelven por nombre y, si falta, por el id fijo que usaban las vistas."""
+
+    def setUp(self):
+        EstadoCompra.objects.create(id=2, Estado="En Proceso ")
+        EstadoCompra.objects.create(id=4, Estado="Anulada")
+        estados_compra.invalidar()
+
+    def test_nombre_e_id_heredado(self):
+        self.assertEqual(estados_compra.id(ESTADO_COMPRA_EN_PROCESO), 2)
+        with self.assertLogs('utils.estados', level='WARNING'):
+            self.assertEqual(estados_compra.id(ESTADO_COMPRA_CANCELADA), 4)
+        with self.assertRaises(EstadoCompra.DoesNotExist):
+            estados_compra.id(ESTADO_COMPRA_PENDIENTE)
+
+    def test_ids_existentes_omite_los_que_faltan(self):
+        self.assertEqual(estados_compra.ids_existentes(ESTADO_COMPRA_PENDIENTE, ESTADO_COMPRA_EN_PROCESO), [2])
+
+
+class CrearCompraTest(TestCase):
+    """Sin estado En proceso para asignar por defecto, crear una compra responde 400 y no 500."""
+
+    def setUp(self):
+        estados_compra.invalidar()
 
-# Create your tests here.
+    def test_sin_estado_por_defecto(self):
+        peticion = APIRequestFactory().post('/compras/', {}, format='json')
+        with mock.patch.object(CompraViewSet, 'permission_classes', []):
+            respuesta = CompraViewSet.as_view({'post': 'create'})(peticion)
+        self.assertEqual(respuesta.status_code, 400)
+        self.assertIn(ESTADO_COMPRA_EN_PROCESO, respuesta.data['error'])
+        self.assertFalse(Compra.objects.exists())
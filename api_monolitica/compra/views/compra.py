@@ -2,21 +2,29 @@ from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from django.shortcuts import get_object_or_404
+from django.db import transaction
 from ..serializers.compra import ComprasSerializer
 from ..serializers.compra_insumo import CompraInsumoSerializer  # Importa el serializer de CompraInsumo
 from ..models.compra import Compra
 from ..models.estado_compra import EstadoCompra
 from ..models.compra_insumo import CompraInsumo  # Importa el modelo de CompraInsumo
 from proveedor.models import Proveedor
-from insumo.models import Insumo  # Importa el modelo de Insumo
+from insumo.models import Insumo, InventarioMovimiento  # Importa el modelo de Insumo
+from insumo.services.inventario import aplicar_movimientos, MOVIMIENTO_COMPRA
 
+from utils.paginacion import PaginacionCursor
 from utils.permisos import TienePermisoModulo
+from utils.estados import (
+    estados_compra, ESTADO_COMPRA_EN_PROCESO, ESTADO_COMPRA_COMPLETADA, ESTADO_COMPRA_CANCELADA
+)
 
 
 class CompraViewSet(viewsets.ModelViewSet):
     queryset = Compra.objects.all()
     serializer_class = ComprasSerializer
     http_method_names = ['get', 'post', 'delete', 'head']
+    pagination_class = PaginacionCursor
+    orden_cursor = ('-fechaCompra', 'id')
     permission_classes = [TienePermisoModulo("Compra")];
 
     def get_queryset(self):
@@ -43,7 +51,13 @@ class CompraViewSet(viewsets.ModelViewSet):
 
         # Asignar estado por defecto si no viene en la petición
         if 'estadoCompra_id' not in data or not data['estadoCompra_id']:
-            data['estadoCompra_id'] = 2  # Asume que 1 es el ID del estado "Pendiente"
+            try:
+                data['estadoCompra_id'] = estados_compra.id(ESTADO_COMPRA_EN_PROCESO)
+            except EstadoCompra.DoesNotExist:
+                return Response(
+                    {"error": f"No existe el estado de compra '{ESTADO_COMPRA_EN_PROCESO}' para asignar por defecto"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
 
         serializer = self.get_serializer(data=data)
         if serializer.is_valid():
@@ -54,12 +68,11 @@ class CompraViewSet(viewsets.ModelViewSet):
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
 
-        if instance.estadoCompra_id.id == 4:  # Asumiendo que 4 es "Cancelada"
+        if estados_compra.es(instance.estadoCompra_id_id, ESTADO_COMPRA_CANCELADA):
             instance.delete()
             return Response(status=status.HTTP_204_NO_CONTENT)
         else:
-            estado_cancelada = EstadoCompra.objects.get(id=4)
-            instance.estadoCompra_id = estado_cancelada
+            instance.estadoCompra_id = estados_compra.obtener(ESTADO_COMPRA_CANCELADA)
             instance.save()
             serializer = self.get_serializer(instance)
             return Response(serializer.data)
@@ -77,18 +90,22 @@ class CompraViewSet(viewsets.ModelViewSet):
         )
 
         try:
-            nuevo_estado = EstadoCompra.objects.get(id=estado_id)
-            compra.estadoCompra_id = nuevo_estado
+            nuevo_estado = estados_compra.por_id(estado_id)
 
-            # Solo guardar observación si se está cancelando (ID 4)
-            if nuevo_estado.id == 4 and observacion:
-               compra.observacion = observacion
+            with transaction.atomic():
+                # Se bloquea la fila para que dos peticiones que completan la misma compra se esperen
+                compra = Compra.objects.select_for_update().get(pk=compra.pk)
+                compra.estadoCompra_id = nuevo_estado
 
-            compra.save()
+                # Solo guardar observación si se está cancelando
+                if estados_compra.es(nuevo_estado.id, ESTADO_COMPRA_CANCELADA) and observacion:
+                   compra.observacion = observacion
 
-            # Actualizar stock si se completa (ID 3)
-            if nuevo_estado.id == 3:
-               self._actualizar_stock_al_completar_compra(compra)
+                compra.save()
+
+                # Actualizar stock si se completa
+                if estados_compra.es(nuevo_estado.id, ESTADO_COMPRA_COMPLETADA):
+                   self._actualizar_stock_al_completar_compra(compra)
 
             serializer = self.get_serializer(compra)
             return Response(serializer.data)
@@ -101,12 +118,18 @@ class CompraViewSet(viewsets.ModelViewSet):
 
 
     def _actualizar_stock_al_completar_compra(self, compra):
-        compra_insumos = CompraInsumo.objects.filter(compra_id=compra)
-        for compra_insumo in compra_insumos:
-            insumo = compra_insumo.insumo_id
-            cantidad_comprada = compra_insumo.cantidad
-            insumo.stock += cantidad_comprada
-            insumo.save()
+        """
+        Suma las cantidades de la compra al stock en un UPDATE para todos los insumos. Si el
+        historial ya tiene la entrada de esta compra no hace nada, así completarla otra vez
+        (o cancelarla y volver a completarla) no duplica el stock.
+        """
+        referencia = f"compra:{compra.pk}"
+        if InventarioMovimiento.objects.filter(tipo=MOVIMIENTO_COMPRA, referencia=referencia).exists():
+            return
+        aplicar_movimientos(
+            CompraInsumo.objects.filter(compra_id=compra).values_list('insumo_id', 'cantidad'),
+            MOVIMIENTO_COMPRA, referencia
+        )
 
     @action(detail=False, methods=['get'])
     def by_proveedor(self, request):
@@ -0,0 +1,29 @@
+# Generated by Django 5.2 on 2026-10-17 18:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('insumo', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventarioMovimiento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cantidad', models.IntegerField()),
+                ('stock_resultante', models.IntegerField()),
+                ('tipo', models.CharField(choices=[('Compra', 'Compra'), ('Abastecimiento', 'Abastecimiento'), ('Devolucion', 'Devolución')], max_length=20)),
+                ('referencia', models.CharField(blank=True, default='', max_length=60)),
+                ('fecha', models.DateTimeField(auto_now_add=True)),
+                ('insumo_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='insumo.insumo')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['insumo_id', 'fecha'], name='movimiento_insumo_fecha_idx')],
+            },
+        ),
+    ]
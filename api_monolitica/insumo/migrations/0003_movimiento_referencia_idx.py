@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-17 18:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('insumo', '0002_inventariomovimiento'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='inventariomovimiento',
+            index=models.Index(fields=['tipo', 'referencia'], name='movimiento_referencia_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-17 18:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('insumo', '0004_insumo_estado_stock_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='insumo',
+            index=models.Index(fields=['nombre', 'id'], name='insumo_cursor_idx'),
+        ),
+    ]
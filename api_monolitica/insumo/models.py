@@ -19,14 +19,50 @@ class Insumo(models.Model):
     marca_id = models.ForeignKey(Marca, on_delete=models.PROTECT)
     estado = models.CharField(max_length=9,choices=ESTADOS_CHOICES,default="Activo")
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['estado', 'stock'], name='insumo_estado_stock_idx'),
+            models.Index(fields=['nombre', 'id'], name='insumo_cursor_idx'),
+        ]
+    
     def __str__(self):
         return f"{self.nombre} - {self.stock} - {self.marca_id}";
     
+    STOCK_BAJO = 5
+    
+    @classmethod
+    def estado_para_stock(cls, stock):
+        if stock <= 0:
+            return "Agotado"
+        elif stock <= cls.STOCK_BAJO:
+            return "Bajo"
+        return "Activo"
+    
     def save(self,*args,**kwargs):
-        if self.stock <= 0:
-            self.estado = "Agotado"
-        elif self.stock <= 5:
-            self.estado = "Bajo"
-        else:
-            self.estado = "Activo"
-        super().save(*args,**kwargs)
\ No newline at end of file
+        self.estado = self.estado_para_stock(self.stock)
+        super().save(*args,**kwargs)
+
+
+class InventarioMovimiento(models.Model):
+    # Cada cambio de stock hecho por insumo/services/inventario.py queda registrado aquí
+    TIPOS_CHOICES = (
+        ("Compra", "Compra"),
+        ("Abastecimiento", "Abastecimiento"),
+        ("Devolucion", "Devolución"),
+    );
+    
+    insumo_id = models.ForeignKey(Insumo, on_delete=models.CASCADE)
+    cantidad = models.IntegerField(null=False)
+    stock_resultante = models.IntegerField(null=False)
+    tipo = models.CharField(max_length=20,choices=TIPOS_CHOICES)
+    referencia = models.CharField(max_length=60,blank=True,default="")
+    fecha = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['insumo_id', 'fecha'], name='movimiento_insumo_fecha_idx'),
+            models.Index(fields=['tipo', 'referencia'], name='movimiento_referencia_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.insumo_id_id} - {self.tipo} - {self.cantidad} - {self.stock_resultante}";
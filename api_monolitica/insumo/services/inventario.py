@@ -0,0 +1,107 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Value, When
+
+from ..models import Insumo, InventarioMovimiento
+
+MOVIMIENTO_COMPRA = "Compra"
+MOVIMIENTO_ABASTECIMIENTO = "Abastecimiento"
+MOVIMIENTO_DEVOLUCION = "Devolucion"
+
+
+class StockInsuficiente(Exception):
+    """El movimiento dejaría el stock de un insumo en negativo; no se aplicó ningún cambio."""
+
+    def __init__(self, insumo_id, disponible, solicitado):
+        self.insumo_id = insumo_id
+        self.disponible = disponible
+        self.solicitado = solicitado
+        super().__init__(f"No hay suficiente stock. Stock disponible: {disponible}")
+
+
+def estado_segun_stock():
+    """Expresión SQL equivalente a Insumo.estado_para_stock sobre la columna stock."""
+    return Case(
+        When(stock__lte=0, then=Value("Agotado")),
+        When(stock__lte=Insumo.STOCK_BAJO, then=Value("Bajo")),
+        default=Value("Activo"),
+    )
+
+
+def _por_insumo(valores):
+    """CASE id WHEN ... THEN valor END para usar en un solo UPDATE de varios insumos."""
+    return Case(
+        *[When(pk=insumo_id, then=Value(valor)) for insumo_id, valor in valores.items()],
+        output_field=IntegerField(),
+    )
+
+
+def aplicar_movimientos(movimientos, tipo, referencia=""):
+    """
+    Aplica cambios de stock [(insumo_id, delta), ...] con UPDATE stock = stock + delta:
+    un UPDATE para todas las entradas y otro para todas las salidas, sin importar cuántos
+    insumos sean. Las salidas llevan la condición stock >= cantidad en el mismo UPDATE, así
+    que dos peticiones a la vez no pueden dejar el stock en negativo ni pisarse el valor.
+    Si algún insumo no alcanza lanza StockInsuficiente y la transacción se deshace completa.
+    Cada movimiento queda en InventarioMovimiento con el stock resultante.
+    """
+    deltas = defaultdict(int)
+    for insumo_id, delta in movimientos:
+        deltas[int(insumo_id)] += delta
+    deltas = {insumo_id: delta for insumo_id, delta in deltas.items() if delta}
+    if not deltas:
+        return {}
+
+    entradas = {insumo_id: delta for insumo_id, delta in deltas.items() if delta > 0}
+    salidas = {insumo_id: -delta for insumo_id, delta in deltas.items() if delta < 0}
+
+    with transaction.atomic():
+        if salidas:
+            _actualizar_todos(
+                Insumo.objects.filter(pk__in=salidas, stock__gte=_por_insumo(salidas)),
+                F('stock') - _por_insumo(salidas), salidas
+            )
+        if entradas:
+            _actualizar_todos(Insumo.objects.filter(pk__in=entradas), F('stock') + _por_insumo(entradas), entradas)
+
+        # El estado se recalcula en un UPDATE aparte: en MySQL las asignaciones del mismo
+        # SET ven el stock ya modificado y en otros motores no
+        Insumo.objects.filter(pk__in=deltas).update(estado=estado_segun_stock())
+        stocks = dict(Insumo.objects.filter(pk__in=deltas).values_list('id', 'stock'))
+        InventarioMovimiento.objects.bulk_create([
+            InventarioMovimiento(
+                insumo_id_id=insumo_id, cantidad=delta, stock_resultante=stocks[insumo_id],
+                tipo=tipo, referencia=referencia,
+            )
+            for insumo_id, delta in deltas.items()
+        ])
+    return stocks
+
+
+class _UpdateIncompleto(Exception):
+    pass
+
+
+def _actualizar_todos(filas, nuevo_stock, cantidades):
+    """
+    UPDATE de stock que debe tocar todas las filas de `cantidades`. Si toca menos, se deshace
+    en su savepoint y se lanza el error del primer insumo que no existe o no alcanza.
+    """
+    try:
+        with transaction.atomic():
+            if filas.update(stock=nuevo_stock) < len(cantidades):
+                raise _UpdateIncompleto()
+    except _UpdateIncompleto:
+        disponibles = dict(Insumo.objects.filter(pk__in=cantidades).values_list('id', 'stock'))
+        for insumo_id in sorted(cantidades):
+            if insumo_id not in disponibles:
+                raise Insumo.DoesNotExist(f"El insumo {insumo_id} no existe")
+            if disponibles[insumo_id] < cantidades[insumo_id]:
+                raise StockInsuficiente(insumo_id, disponibles[insumo_id], cantidades[insumo_id])
+        raise StockInsuficiente(min(cantidades), disponibles[min(cantidades)], cantidades[min(cantidades)])
+
+
+def mover_stock(insumo_id, delta, tipo, referencia=""):
+    """Un solo movimiento; devuelve el stock resultante del insumo."""
+    return aplicar_movimientos([(insumo_id, delta)], tipo, referencia).get(int(insumo_id))
@@ -0,0 +1,83 @@
+import math
+from datetime import date, timedelta
+
+from django.db.models import Max, Sum
+
+from abastecimiento.models.insumoAbastecimiento import InsumoAbastecimiento
+from compra.models.compra_insumo import CompraInsumo
+from utils.estados import estados_compra, ESTADO_COMPRA_COMPLETADA
+from ..models import Insumo
+
+ESTADOS_REABASTECER = ("Agotado", "Bajo")
+DIAS_CONSUMO = 30
+DIAS_COBERTURA = 30
+
+
+def _nombre_proveedor(fila):
+    if fila['compra_id__proveedor_id__nombre_empresa']:
+        return fila['compra_id__proveedor_id__nombre_empresa']
+    return f"{fila['compra_id__proveedor_id__nombre_representante'] or ''} " \
+           f"{fila['compra_id__proveedor_id__apellido_representante'] or ''}".strip()
+
+
+def sugerencias_reabastecimiento(dias_consumo=DIAS_CONSUMO, dias_cobertura=DIAS_COBERTURA, hoy=None):
+    """
+    Insumos en estado Bajo o Agotado con la cantidad sugerida para cubrir dias_cobertura
+    según lo abastecido en los últimos dias_consumo días, y el proveedor y precio de su
+    última compra completada. Son tres consultas sin importar cuántos insumos haya: la
+    lista por el índice (estado, stock), el consumo agrupado y la última compra por insumo.
+    """
+    hoy = hoy or date.today()
+    insumos = list(
+        Insumo.objects.filter(estado__in=ESTADOS_REABASTECER).order_by('stock', 'id')
+        .values('id', 'nombre', 'stock', 'estado', 'marca_id__nombre')
+    )
+    if not insumos:
+        return []
+    ids = [insumo['id'] for insumo in insumos]
+
+    consumos = dict(
+        InsumoAbastecimiento.objects.filter(
+            insumo_id__in=ids, abastecimiento_id__fecha_creacion__gt=hoy - timedelta(days=dias_consumo)
+        ).values('insumo_id').annotate(consumo=Sum('cantidad')).values_list('insumo_id', 'consumo')
+    )
+
+    # La línea más reciente de cada insumo entre las compras completadas; si el estado no existe
+    # no hay compras completadas y las sugerencias salen sin proveedor ni precio
+    compras = {}
+    completadas = estados_compra.ids_existentes(ESTADO_COMPRA_COMPLETADA)
+    if completadas:
+        ultimas = CompraInsumo.objects.filter(
+            insumo_id__in=ids, compra_id__estadoCompra_id__in=completadas
+        ).values('insumo_id').annotate(ultima=Max('id')).values('ultima')
+        compras = {
+            fila['insumo_id']: fila
+            for fila in CompraInsumo.objects.filter(id__in=ultimas).values(
+                'insumo_id', 'precioUnitario', 'compra_id__fechaCompra', 'compra_id__proveedor_id',
+                'compra_id__proveedor_id__nombre_empresa', 'compra_id__proveedor_id__nombre_representante',
+                'compra_id__proveedor_id__apellido_representante',
+            )
+        }
+
+    sugerencias = []
+    for insumo in insumos:
+        consumo = consumos.get(insumo['id'], 0)
+        objetivo = math.ceil(consumo * dias_cobertura / dias_consumo)
+        # Como mínimo se pide lo necesario para salir de Bajo
+        cantidad = max(objetivo, Insumo.STOCK_BAJO + 1) - insumo['stock']
+        compra = compras.get(insumo['id'])
+        sugerencias.append({
+            "insumo_id": insumo['id'],
+            "nombre": insumo['nombre'],
+            "marca": insumo['marca_id__nombre'],
+            "estado": insumo['estado'],
+            "stock": insumo['stock'],
+            "consumo": consumo,
+            "cantidad_sugerida": max(cantidad, 0),
+            "proveedor_id": compra['compra_id__proveedor_id'] if compra else None,
+            "proveedor": _nombre_proveedor(compra) if compra else None,
+            "ultimo_precio": compra['precioUnitario'] if compra else None,
+            "ultima_compra": compra['compra_id__fechaCompra'] if compra else None,
+            "costo_estimado": compra['precioUnitario'] * max(cantidad, 0) if compra else None,
+        })
+    return sugerencias
@@ -1,3 +1,138 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from rol.models import Rol
+from usuario.models.usuario_model import Usuario
+from usuario.models.manicurista_model import Manicurista
+from abastecimiento.models.abastecimiento import Abastecimiento
+from abastecimiento.models.insumoAbastecimiento import InsumoAbastecimiento
+from compra.models.compra import Compra
+from compra.models.compra_insumo import CompraInsumo
+from compra.models.estado_compra import EstadoCompra
+from proveedor.models import Proveedor
+from utils.estados import estados_compra, ESTADO_COMPRA_COMPLETADA
+
+from .models import Marca, Insumo, InventarioMovimiento
+from .services.reabastecimiento import sugerencias_reabastecimiento
+from .services.inventario import (
+    aplicar_movimientos, mover_stock, StockInsuficiente, MOVIMIENTO_COMPRA, MOVIMIENTO_ABASTECIMIENTO
+)
+
+
+class InventarioTest(TestCase):
+    """Los movimientos de stock se aplican en SQL, rechazan sobregiros y quedan en el historial."""
+
+    @classmethod
+    def setUpTestData(cls):
+        marca = Marca.objects.create(nombre="Marca")
+        cls.esmalte = Insumo.objects.create(nombre="Esmalte", stock=10, marca_id=marca)
+        cls.lima = Insumo.objects.create(nombre="Lima", stock=2, marca_id=marca)
+
+    def test_aplica_deltas_y_recalcula_estado(self):
+        stocks = aplicar_movimientos(
+            [(self.esmalte.pk, -4), (self.esmalte.pk, -3), (self.lima.pk, 8)], MOVIMIENTO_COMPRA, "compra:1"
+        )
+        self.assertEqual(stocks, {self.esmalte.pk: 3, self.lima.pk: 10})
+        self.esmalte.refresh_from_db()
+        self.lima.refresh_from_db()
+        self.assertEqual((self.esmalte.stock, self.esmalte.estado), (3, "Bajo"))
+        self.assertEqual((self.lima.stock, self.lima.estado), (10, "Activo"))
+        self.assertEqual(
+            sorted(InventarioMovimiento.objects.values_list('insumo_id', 'cantidad', 'stock_resultante')),
+            sorted([(self.esmalte.pk, -7, 3), (self.lima.pk, 8, 10)])
+        )
+
+    def test_sobregiro_no_aplica_nada(self):
+        with self.assertRaises(StockInsuficiente) as contexto:
+            aplicar_movimientos([(self.esmalte.pk, -5), (self.lima.pk, -3)], MOVIMIENTO_ABASTECIMIENTO)
+        self.assertEqual((contexto.exception.disponible, contexto.exception.solicitado), (2, 3))
+        self.esmalte.refresh_from_db()
+        self.assertEqual(self.esmalte.stock, 10)
+        self.assertFalse(InventarioMovimiento.objects.exists())
+
+    def test_no_pisa_cambios_de_otra_instancia(self):
+        # La instancia cargada antes queda vieja, pero el UPDATE parte del valor actual en la base
+        vieja = Insumo.objects.get(pk=self.esmalte.pk)
+        mover_stock(self.esmalte.pk, -6, MOVIMIENTO_ABASTECIMIENTO)
+        self.assertEqual(mover_stock(vieja.pk, -4, MOVIMIENTO_ABASTECIMIENTO), 0)
+        with self.assertRaises(StockInsuficiente):
+            mover_stock(vieja.pk, -1, MOVIMIENTO_ABASTECIMIENTO)
+        vieja.refresh_from_db()
+        self.assertEqual((vieja.stock, vieja.estado), (0, "Agotado"))
+
+
+class ReabastecimientoTest(TestCase):
+    """Las sugerencias de compra salen del consumo reciente y la última compra completada."""
+
+    @classmethod
+    def setUpTestData(cls):
+        marca = Marca.objects.create(nombre="Marca")
+        cls.esmalte = Insumo.objects.create(nombre="Esmalte", stock=2, marca_id=marca)
+        cls.lima = Insumo.objects.create(nombre="Lima", stock=0, marca_id=marca)
+        Insumo.objects.create(nombre="Algodón", stock=40, marca_id=marca)
+
+        rol = Rol.objects.create(nombre="Manicurista")
+        usuario = Usuario.objects.create(
+            username="man1", correo="man1@correo.com", nombre="Nombre",
+            apellido="Apellido", rol_id=rol, numero_documento="m1",
+        )
+        manicurista = Manicurista.objects.create(
+            usuario=usuario, nombre="man1", apellido="Apellido", tipo_documento="CC",
+            numero_documento="m1", correo="man1@correo.com", celular="3000000001",
+            fecha_nacimiento=date(1990, 1, 1), fecha_contratacion=date(2020, 1, 1),
+        )
+        reciente = Abastecimiento.objects.create(manicurista_id=manicurista)
+        antiguo = Abastecimiento.objects.create(manicurista_id=manicurista)
+        Abastecimiento.objects.filter(pk=antiguo.pk).update(fecha_creacion=date.today() - timedelta(days=90))
+        InsumoAbastecimiento.objects.bulk_create([
+            InsumoAbastecimiento(insumo_id=cls.esmalte, abastecimiento_id=reciente, cantidad=12),
+            InsumoAbastecimiento(insumo_id=cls.esmalte, abastecimiento_id=reciente, cantidad=3),
+            InsumoAbastecimiento(insumo_id=cls.esmalte, abastecimiento_id=antiguo, cantidad=100),
+        ])
+
+        completada = EstadoCompra.objects.create(Estado="Completada")
+        pendiente = EstadoCompra.objects.create(Estado="Pendiente")
+        proveedores = [
+            Proveedor.objects.create(
+                tipo_persona="JURIDICA", tipo_documento="NIT", numero_documento=f"90{n}", telefono="3000000000",
+                email=f"proveedor{n}@correo.com", direccion="Calle 1", ciudad="Ciudad", nombre_empresa=f"Proveedor {n}",
+            )
+            for n in range(3)
+        ]
+        for proveedor, estado, precio in (
+            (proveedores[0], completada, '1000'), (proveedores[1], completada, '1500'), (proveedores[2], pendiente, '900'),
+        ):
+            compra = Compra.objects.create(estadoCompra_id=estado, proveedor_id=proveedor)
+            CompraInsumo.objects.create(compra_id=compra, insumo_id=cls.esmalte, cantidad=10, precioUnitario=Decimal(precio))
+
+    def setUp(self):
+        estados_compra.invalidar()
+
+    def test_sugerencias_en_consultas_fijas(self):
+        estados_compra.id(ESTADO_COMPRA_COMPLETADA)
+        with CaptureQueriesContext(connection) as consultas:
+            sugerencias = sugerencias_reabastecimiento(dias_consumo=30, dias_cobertura=60)
+        self.assertEqual(len(consultas), 3)
+
+        self.assertEqual([sugerencia['insumo_id'] for sugerencia in sugerencias], [self.lima.pk, self.esmalte.pk])
+        esmalte = sugerencias[1]
+        self.assertEqual(esmalte['consumo'], 15)
+        self.assertEqual(esmalte['cantidad_sugerida'], 28)
+        self.assertEqual((esmalte['proveedor'], esmalte['ultimo_precio']), ("Proveedor 1", Decimal('1500')))
+        self.assertEqual(esmalte['costo_estimado'], Decimal('42000'))
+        lima = sugerencias[0]
+        self.assertEqual((lima['cantidad_sugerida'], lima['proveedor']), (Insumo.STOCK_BAJO + 1, None))
+
+    def test_sin_estado_completada_no_hay_ultima_compra(self):
+        EstadoCompra.objects.filter(Estado="Completada").update(Estado="Cerrada")
+        with mock.patch.dict(estados_compra.ids_heredados, clear=True):
+            sugerencias = sugerencias_reabastecimiento(dias_consumo=30, dias_cobertura=60)
 
-# Create your tests here.
+        esmalte = sugerencias[1]
+        self.assertEqual((esmalte['consumo'], esmalte['cantidad_sugerida']), (15, 28))
+        self.assertEqual((esmalte['proveedor'], esmalte['ultimo_precio'], esmalte['costo_estimado']), (None, None, None))
@@ -8,8 +8,11 @@ from abastecimiento.models.insumoAbastecimiento import InsumoAbastecimiento
 
 from .models import Marca, Insumo
 from .serializers import MarcaSerializer, InsumoSerializer
+from .services.reabastecimiento import sugerencias_reabastecimiento, DIAS_CONSUMO, DIAS_COBERTURA
 
 from utils.permisos import TienePermisoModulo
+from utils.paginacion import PaginacionCursor
+from utils.estados import estados_compra, ESTADO_COMPRA_PENDIENTE, ESTADO_COMPRA_EN_PROCESO
 # Create your views here.
 
 class MarcaViewSet(viewsets.ModelViewSet):
@@ -30,13 +33,15 @@ class InsumoViewSet(viewsets.ModelViewSet):
     queryset = Insumo.objects.all()
     serializer_class = InsumoSerializer
     permission_classes = [TienePermisoModulo("Insumo")];
+    pagination_class = PaginacionCursor
+    orden_cursor = ('nombre', 'id')
     def destroy(self, request, *args, **kwargs):
         insumo = self.get_object()
 
-        # Verificar si el insumo está en alguna CompraInsumo con estado de compra no completada (1: Pendiente, 2: En proceso)
+        # Verificar si el insumo está en alguna CompraInsumo con estado de compra no completada
         compras_relacionadas = CompraInsumo.objects.filter(insumo_id=insumo)
         hay_compra_no_completada = compras_relacionadas.filter(
-           compra_id__estadoCompra_id__id__in=[1, 2]
+           compra_id__estadoCompra_id__in=estados_compra.ids_existentes(ESTADO_COMPRA_PENDIENTE, ESTADO_COMPRA_EN_PROCESO)
         ).exists()
 
         if hay_compra_no_completada:
@@ -66,3 +71,19 @@ class InsumoViewSet(viewsets.ModelViewSet):
         # Si pasa todas las validaciones, eliminar
         self.perform_destroy(insumo)
         return Response({"eliminado": True}, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'])
+    def reabastecer(self, request):
+        """
+        Insumos en Bajo o Agotado con la cantidad sugerida a comprar y su último proveedor y precio.
+        ?dias=N es la ventana de consumo y ?cobertura=N los días que debe alcanzar lo comprado.
+        """
+        try:
+            dias = int(request.query_params.get('dias', DIAS_CONSUMO))
+            cobertura = int(request.query_params.get('cobertura', DIAS_COBERTURA))
+        except ValueError:
+            return Response({"error": "dias y cobertura deben ser números enteros"}, status=status.HTTP_400_BAD_REQUEST)
+        if dias < 1 or cobertura < 1:
+            return Response({"error": "dias y cobertura deben ser mayores a 0"}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(sugerencias_reabastecimiento(dias, cobertura))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-17 18:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manicurista', '0002_initial'),
+        ('usuario', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='liquidacion',
+            constraint=models.UniqueConstraint(fields=('manicurista_id', 'FechaInicial', 'FechaFinal'), name='liquidacion_periodo_unico'),
+        ),
+    ]
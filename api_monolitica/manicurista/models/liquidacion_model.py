@@ -7,4 +7,9 @@ class Liquidacion(models.Model):
     TotalGenerado = models.DecimalField(max_digits=10,decimal_places=2,null=False,default=0.00)
     Comision = models.DecimalField(max_digits=10,decimal_places=2,null=False,default=0.00)
     Local = models.DecimalField(max_digits=10,decimal_places=2,null=False,default=0.00)
-    FechaFinal = models.DateField(null=False)
\ No newline at end of file
+    FechaFinal = models.DateField(null=False)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['manicurista_id', 'FechaInicial', 'FechaFinal'], name='liquidacion_periodo_unico'),
+        ]
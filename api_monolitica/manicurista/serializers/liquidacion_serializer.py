@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from django.db import transaction
 from datetime import date, timedelta
 from decimal import Decimal
 from django.conf import settings
@@ -6,9 +7,31 @@ from django.core.mail import send_mail
 
 from ..models.liquidacion_model import Liquidacion
 from usuario.models.manicurista_model import Manicurista
-from cita.models.cita_venta_model import CitaVenta
+from cita.services.consultas import totales_citas_terminadas
 from utils.email_utils import enviar_correo_liquidacion_realizada  
 
+PORCENTAJE_COMISION = Decimal("0.5")
+
+
+def validar_periodo(fecha_inicial, fecha_final):
+    """Una liquidación cubre los 5 días anteriores y termina hoy."""
+    if fecha_final != date.today():
+        raise serializers.ValidationError({
+            "FechaFinal": f"La fecha final debe ser hoy ({date.today()})"
+        })
+
+    if fecha_inicial != fecha_final - timedelta(days=5):
+        raise serializers.ValidationError({
+            "FechaInicial": f"La fecha inicial debe ser exactamente 5 días antes de la fecha final ({fecha_final - timedelta(days=5)})"
+        })
+
+
+def repartir_total(total_generado):
+    """(comisión, local) de un total generado."""
+    comision = total_generado * PORCENTAJE_COMISION
+    return comision, total_generado - comision
+
+
 class LiquidacionSerializer(serializers.ModelSerializer):
     manicurista_id = serializers.PrimaryKeyRelatedField(queryset=Manicurista.objects.all())
     manicurista_nombre = serializers.SerializerMethodField(read_only=True)
@@ -43,15 +66,7 @@ class LiquidacionSerializer(serializers.ModelSerializer):
         if not (manicurista and fecha_inicial and fecha_final):
             raise serializers.ValidationError("Debe proporcionar manicurista, fecha inicial y fecha final")
 
-        if fecha_final != date.today():
-            raise serializers.ValidationError({
-                "FechaFinal": f"La fecha final debe ser hoy ({date.today()})"
-            })
-
-        if fecha_inicial != fecha_final - timedelta(days=5):
-            raise serializers.ValidationError({
-                "FechaInicial": f"La fecha inicial debe ser exactamente 5 días antes de la fecha final ({fecha_final - timedelta(days=5)})"
-            })
+        validar_periodo(fecha_inicial, fecha_final)
 
         if Liquidacion.objects.filter(
             manicurista_id=manicurista,
@@ -62,20 +77,15 @@ class LiquidacionSerializer(serializers.ModelSerializer):
 
         return data
 
+    @transaction.atomic
     def create(self, validated_data):
         manicurista = validated_data['manicurista_id']
         fecha_inicial = validated_data['FechaInicial']
         fecha_final = validated_data['FechaFinal']
 
-        citas_venta = CitaVenta.objects.filter(
-            manicurista_id=manicurista,
-            Fecha__gte=fecha_inicial,
-            Fecha__lte=fecha_final
-        )
-
-        total_generado = sum(cita.Total for cita in citas_venta)
-        comision = total_generado * Decimal("0.5")
-        local = total_generado * Decimal("0.5")
+        # Solo cuentan las citas terminadas; la suma se hace en la base de datos
+        total_generado = totales_citas_terminadas(manicurista, fecha_inicial, fecha_final)['total']
+        comision, local = repartir_total(total_generado)
 
         validated_data['TotalGenerado'] = total_generado
         validated_data['Comision'] = comision
@@ -94,3 +104,16 @@ class LiquidacionSerializer(serializers.ModelSerializer):
         )
 
         return liquidacion
+
+
+
+class LiquidacionMasivaSerializer(serializers.Serializer):
+    """Periodo de una liquidación masiva; por defecto los 5 días que terminan hoy."""
+    FechaInicial = serializers.DateField(required=False)
+    FechaFinal = serializers.DateField(required=False)
+
+    def validate(self, data):
+        data.setdefault('FechaFinal', date.today())
+        data.setdefault('FechaInicial', data['FechaFinal'] - timedelta(days=5))
+        validar_periodo(data['FechaInicial'], data['FechaFinal'])
+        return data
@@ -0,0 +1,85 @@
+from decimal import Decimal
+
+from django.db import transaction
+
+from ..models.liquidacion_model import Liquidacion
+from ..serializers.liquidacion_serializer import repartir_total
+from usuario.models.manicurista_model import Manicurista
+from cita.services.consultas import totales_terminadas_por_manicurista
+from utils.email_utils import enviar_correos_liquidacion
+
+
+def _resumen(manicurista, estado, cantidad, total, comision, local):
+    return {
+        "manicurista_id": manicurista.pk,
+        "manicurista_nombre": f"{manicurista.nombre} {manicurista.apellido}",
+        "estado": estado,
+        "total_citas": cantidad,
+        "TotalGenerado": total,
+        "Comision": comision,
+        "Local": local,
+    }
+
+
+def liquidar_periodo(fecha_inicial, fecha_final):
+    """
+    Liquida a todos los manicuristas activos en el periodo. Los totales salen de un solo
+    GROUP BY, las liquidaciones se insertan con bulk_create y los correos se encolan en la
+    misma transacción. Quien ya tiene liquidación para el periodo se reporta como 'existente',
+    así que repetir la llamada no crea duplicados.
+    """
+    with transaction.atomic():
+        manicuristas = list(
+            Manicurista.objects.filter(estado="Activo")
+            .select_for_update()
+            .only('usuario', 'nombre', 'apellido', 'correo')
+            .order_by('nombre', 'apellido')
+        )
+        existentes = {
+            liquidacion.manicurista_id_id: liquidacion
+            for liquidacion in Liquidacion.objects.filter(
+                manicurista_id__in=manicuristas, FechaInicial=fecha_inicial, FechaFinal=fecha_final
+            )
+        }
+        totales = totales_terminadas_por_manicurista(
+            fecha_inicial, fecha_final, [manicurista.pk for manicurista in manicuristas]
+        )
+
+        nuevas, correos, resumen = [], [], []
+        for manicurista in manicuristas:
+            datos = totales.get(manicurista.pk, {'cantidad': 0, 'total': Decimal('0')})
+            cantidad = datos['cantidad']
+            existente = existentes.get(manicurista.pk)
+            if existente:
+                resumen.append(_resumen(
+                    manicurista, "existente", cantidad,
+                    existente.TotalGenerado, existente.Comision, existente.Local
+                ))
+                continue
+
+            total = datos['total']
+            comision, local = repartir_total(total)
+            nuevas.append(Liquidacion(
+                manicurista_id=manicurista, FechaInicial=fecha_inicial, FechaFinal=fecha_final,
+                TotalGenerado=total, Comision=comision, Local=local,
+            ))
+            correos.append({
+                "destinatario": manicurista.correo,
+                "nombre_empleada": f"{manicurista.nombre} {manicurista.apellido}",
+                "fecha_inicial": fecha_inicial,
+                "fecha_final": fecha_final,
+                "comision": comision,
+            })
+            resumen.append(_resumen(manicurista, "creada", cantidad, total, comision, local))
+
+        Liquidacion.objects.bulk_create(nuevas)
+        if correos:
+            enviar_correos_liquidacion(correos)
+
+    return {
+        "FechaInicial": fecha_inicial,
+        "FechaFinal": fecha_final,
+        "creadas": len(nuevas),
+        "existentes": len(existentes),
+        "liquidaciones": resumen,
+    }
@@ -1,3 +1,81 @@
+from datetime import date, time, timedelta
+from decimal import Decimal
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from rol.models import Rol
+from usuario.models.usuario_model import Usuario
+from usuario.models.manicurista_model import Manicurista
+from cita.models.estado_cita_model import EstadoCita
+from cita.models.cita_venta_model import CitaVenta
+from notificacion.models import CorreoSaliente
+from utils.estados import estados_cita
+from .models.liquidacion_model import Liquidacion
+from .services.liquidacion_masiva import liquidar_periodo
+
+
+class LiquidacionMasivaTest(TestCase):
+    """La liquidación masiva crea una liquidación por manicurista activo y no duplica al repetirse."""
+
+    @classmethod
+    def setUpTestData(cls):
+        rol = Rol.objects.create(nombre="Manicurista")
+        terminada = EstadoCita.objects.create(Estado="Terminada")
+        cancelada = EstadoCita.objects.create(Estado="Cancelada")
+        cls.manicuristas = []
+        for n, estado in enumerate(("Activo", "Activo", "Inactivo"), start=1):
+            usuario = Usuario.objects.create(
+                username=f"man{n}", correo=f"man{n}@correo.com", nombre="Nombre",
+                apellido="Apellido", rol_id=rol, numero_documento=f"m{n}",
+            )
+            cls.manicuristas.append(Manicurista.objects.create(
+                usuario=usuario, nombre=f"man{n}", apellido="Apellido", tipo_documento="CC",
+                numero_documento=f"m{n}", correo=f"man{n}@correo.com", celular=f"300000000{n}",
+                fecha_nacimiento=date(1990, 1, 1), fecha_contratacion=date(2020, 1, 1), estado=estado,
+            ))
+        cls.fecha_final = date.today()
+        cls.fecha_inicial = cls.fecha_final - timedelta(days=5)
+        for estado, total in ((terminada, '30000.00'), (terminada, '10000.00'), (cancelada, '50000.00')):
+            CitaVenta.objects.create(
+                manicurista_id=cls.manicuristas[0], estado_id=estado, Fecha=cls.fecha_inicial,
+                Hora=time(9, 0), Descripcion="Cita", Total=Decimal(total),
+            )
+
+    def test_liquida_activos_y_es_idempotente(self):
+        resultado = liquidar_periodo(self.fecha_inicial, self.fecha_final)
+        self.assertEqual(resultado['creadas'], 2)
+        primera = {fila['manicurista_nombre']: fila for fila in resultado['liquidaciones']}
+        self.assertEqual(set(primera), {"man1 Apellido", "man2 Apellido"})
+        self.assertEqual(primera["man1 Apellido"]['total_citas'], 2)
+        self.assertEqual(primera["man1 Apellido"]['TotalGenerado'], Decimal('40000.00'))
+        self.assertEqual(primera["man1 Apellido"]['Comision'], Decimal('20000.00'))
+        self.assertEqual(primera["man2 Apellido"]['TotalGenerado'], Decimal('0'))
+        self.assertEqual(CorreoSaliente.objects.count(), 2)
+
+        repetido = liquidar_periodo(self.fecha_inicial, self.fecha_final)
+        self.assertEqual(repetido['creadas'], 0)
+        self.assertEqual(repetido['existentes'], 2)
+        self.assertTrue(all(fila['estado'] == "existente" for fila in repetido['liquidaciones']))
+        self.assertEqual(Liquidacion.objects.count(), 2)
+        self.assertEqual(CorreoSaliente.objects.count(), 2)
 
-# Create your tests here.
+    def test_consultas_no_crecen_con_los_manicuristas(self):
+        estados_cita.id("Terminada")  # carga el registro de estados antes de contar
+        with CaptureQueriesContext(connection) as pocas:
+            liquidar_periodo(self.fecha_inicial, self.fecha_final)
+        rol = Rol.objects.get()
+        for n in range(4, 12):
+            usuario = Usuario.objects.create(
+                username=f"man{n}", correo=f"man{n}@correo.com", nombre="Nombre",
+                apellido="Apellido", rol_id=rol, numero_documento=f"m{n}",
+            )
+            Manicurista.objects.create(
+                usuario=usuario, nombre=f"man{n}", apellido="Apellido", tipo_documento="CC",
+                numero_documento=f"m{n}", correo=f"man{n}@correo.com", celular=f"30000000{n:02d}",
+                fecha_nacimiento=date(1990, 1, 1), fecha_contratacion=date(2020, 1, 1),
+            )
+        with CaptureQueriesContext(connection) as muchas:
+            liquidar_periodo(self.fecha_inicial - timedelta(days=6), self.fecha_final - timedelta(days=6))
+        self.assertEqual(len(pocas.captured_queries), len(muchas.captured_queries))
@@ -1,10 +1,12 @@
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
+from django.db import IntegrityError
 from django.db.models import Max
 
 from ..models.liquidacion_model import Liquidacion
-from ..serializers.liquidacion_serializer import LiquidacionSerializer
+from ..serializers.liquidacion_serializer import LiquidacionSerializer, LiquidacionMasivaSerializer
+from ..services import liquidacion_masiva
 
 from utils.permisos import TienePermisoModulo
 
@@ -25,4 +27,22 @@ class LiquidacionViewSet(viewsets.ModelViewSet):
             Liquidacion.objects.values('manicurista_id').annotate(ultima_fecha=Max('FechaFinal'))
         )
         
-        return Response(list(datos),status=status.HTTP_200_OK)
\ No newline at end of file
+        return Response(list(datos),status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'], url_path='liquidar-periodo')
+    def liquidar_periodo(self, request):
+        """
+        Liquida a todos los manicuristas activos en el periodo (FechaInicial, FechaFinal; por
+        defecto los 5 días que terminan hoy). Repetirla no duplica liquidaciones.
+        """
+        serializer = LiquidacionMasivaSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            resultado = liquidacion_masiva.liquidar_periodo(
+                serializer.validated_data['FechaInicial'], serializer.validated_data['FechaFinal']
+            )
+        except IntegrityError:
+            return Response({"error": "Otra liquidación del mismo periodo se registró al mismo tiempo, intente de nuevo."},
+                            status=status.HTTP_409_CONFLICT)
+        estado_http = status.HTTP_201_CREATED if resultado['creadas'] else status.HTTP_200_OK
+        return Response(resultado, status=estado_http)
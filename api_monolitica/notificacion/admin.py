@@ -0,0 +1,14 @@
+from django.contrib import admin
+from .models import CorreoSaliente
+
+
+@admin.register(CorreoSaliente)
+class CorreoSalienteAdmin(admin.ModelAdmin):
+    # El cuerpo no se muestra: puede traer contraseñas temporales o códigos de recuperación
+    exclude = ('mensaje_texto', 'mensaje_html')
+    list_display = ('asunto', 'destinatario', 'estado', 'intentos', 'creado', 'enviado')
+    list_filter = ('estado',)
+    readonly_fields = ('destinatario', 'asunto', 'estado', 'intentos', 'proximo_intento', 'ultimo_error', 'creado', 'enviado')
+
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,56 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from notificacion.models import CorreoSaliente
+from notificacion.services.entrega import SUMIDEROS, Entregador
+from notificacion.services.outbox import enviar_lote
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide mensajes/segundo de la entrega de la bandeja de salida contra un sumidero local, "
+        "con una conexión por mensaje frente a una conexión por lote."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tamanos', type=str, default="1,50,500", help="Tamaños de lote separados por coma")
+        parser.add_argument('--sumidero', choices=list(SUMIDEROS), default='memoria')
+        parser.add_argument('--tasa', type=float, default=0, help="Máximo de mensajes por segundo (0 = sin límite)")
+
+    def handle(self, *args, **options):
+        tamanos = [int(valor) for valor in options['tamanos'].split(',')]
+
+        self.stdout.write(f"{'mensajes':>10}{'modo':>22}{'segundos':>12}{'msg/s':>12}")
+        for tamano in tamanos:
+            for modo, funcion in (("conexión por mensaje", self._por_mensaje), ("conexión por lote", self._por_lote)):
+                segundos = self._medir(tamano, funcion, options['sumidero'], options['tasa'])
+                self.stdout.write(f"{tamano:>10}{modo:>22}{segundos:>12.4f}{tamano / segundos:>12.1f}")
+
+    def _medir(self, tamano, funcion, sumidero, tasa):
+        # Las filas de prueba se descartan al final para no dejar rastro en la bandeja real
+        with transaction.atomic():
+            correos = CorreoSaliente.objects.bulk_create([
+                CorreoSaliente(
+                    destinatario=f"prueba{i}@example.com",
+                    asunto="Prueba de carga",
+                    mensaje_texto="Mensaje de prueba",
+                    mensaje_html="<p>Mensaje de prueba</p>",
+                )
+                for i in range(tamano)
+            ])
+            inicio = perf_counter()
+            funcion(correos, sumidero, tasa)
+            segundos = perf_counter() - inicio
+            transaction.set_rollback(True)
+        return segundos
+
+    def _por_mensaje(self, correos, sumidero, tasa):
+        for correo in correos:
+            with Entregador(sumidero, tasa) as entregador:
+                enviar_lote([correo], entregador)
+
+    def _por_lote(self, correos, sumidero, tasa):
+        with Entregador(sumidero, tasa) as entregador:
+            enviar_lote(correos, entregador)
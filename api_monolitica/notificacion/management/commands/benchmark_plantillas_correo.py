@@ -0,0 +1,49 @@
+from datetime import date
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+from django.template import Context, Engine
+
+from notificacion.services.plantillas import renderizar_correo, texto_plano
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara el costo de renderizar correos de liquidación leyendo y compilando la "
+        "plantilla en cada envío frente al cached.Loader configurado en TEMPLATES."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mensajes', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        mensajes = options['mensajes']
+        contextos = [
+            {
+                "nombre_empleada": f"Manicurista {i}",
+                "fecha_inicial": date(2026, 1, 1).strftime('%d/%m/%Y'),
+                "fecha_final": date(2026, 1, 15).strftime('%d/%m/%Y'),
+                "comision": f"{i * 1000:,.2f}",
+            }
+            for i in range(mensajes)
+        ]
+
+        # Mismo motor sin cached.Loader: cada get_template vuelve a leer y compilar el archivo
+        sin_cache = Engine(loaders=['django.template.loaders.app_directories.Loader'])
+
+        def compilando():
+            for contexto in contextos:
+                mensaje_html = sin_cache.get_template("correos/liquidacion.html").render(Context(contexto))
+                texto_plano(mensaje_html)
+
+        def cacheada():
+            for contexto in contextos:
+                renderizar_correo("liquidacion", contexto)
+
+        cacheada()  # la primera llamada llena la cache del loader
+        self.stdout.write(f"{'modo':<16}{'µs/mensaje':>12}")
+        for modo, funcion in (("sin cache", compilando), ("cached.Loader", cacheada)):
+            inicio = perf_counter()
+            funcion()
+            microsegundos = (perf_counter() - inicio) * 1e6 / mensajes
+            self.stdout.write(f"{modo:<16}{microsegundos:>12.1f}")
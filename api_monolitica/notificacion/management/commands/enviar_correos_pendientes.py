@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from notificacion.services.entrega import SUMIDEROS
+from notificacion.services.outbox import vaciar_bandeja
+
+
+class Command(BaseCommand):
+    help = "Envía los correos de la bandeja de salida por una conexión de correo reutilizada."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=50, help="Correos reservados por lote")
+        parser.add_argument('--continuo', action='store_true', help="Seguir revisando la bandeja indefinidamente")
+        parser.add_argument('--intervalo', type=float, default=5, help="Segundos entre revisiones en modo continuo")
+        parser.add_argument('--tasa', type=float, default=None, help="Máximo de mensajes por segundo (0 = sin límite)")
+        parser.add_argument('--sumidero', choices=list(SUMIDEROS), default=None,
+                            help="Entregar a un backend local en lugar del servidor de correo")
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                totales = vaciar_bandeja(options['lote'], options['sumidero'], options['tasa'])
+            except Exception as e:
+                # Servidor de correo caído: en modo continuo se vuelve a intentar en la siguiente vuelta
+                if not options['continuo']:
+                    raise
+                self.stderr.write(f"Error al conectar con el servidor de correo: {e}")
+            else:
+                if any(totales.values()):
+                    self.stdout.write(
+                        f"{totales['enviados']} enviados, {totales['reintentos']} para reintento, "
+                        f"{totales['descartados']} descartados"
+                    )
+            if not options['continuo']:
+                break
+            time.sleep(options['intervalo'])
@@ -0,0 +1,17 @@
+from django.db import migrations
+
+
+def borrar_cuerpos(apps, schema_editor):
+    CorreoSaliente = apps.get_model('notificacion', 'CorreoSaliente')
+    CorreoSaliente.objects.filter(estado__in=['Enviado', 'Descartado']).update(mensaje_texto='', mensaje_html='')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notificacion', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(borrar_cuerpos, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+from django.db import models
+from django.utils import timezone
+
+
+class CorreoSaliente(models.Model):
+    """
+    Bandeja de salida de correos. Se escribe en la misma transacción que el cambio de negocio
+    y la vacía el comando enviar_correos_pendientes fuera del ciclo de la petición. El cuerpo
+    se borra cuando el correo se envía o se descarta; la fila queda solo como registro.
+    """
+    ESTADOS = [
+        ('Pendiente', 'Pendiente'),
+        ('Enviado', 'Enviado'),
+        ('Descartado', 'Descartado'),
+    ]
+
+    destinatario = models.EmailField()
+    asunto = models.CharField(max_length=255)
+    mensaje_texto = models.TextField()
+    mensaje_html = models.TextField(blank=True)
+    estado = models.CharField(max_length=20, choices=ESTADOS, default='Pendiente')
+    intentos = models.PositiveIntegerField(default=0)
+    proximo_intento = models.DateTimeField(default=timezone.now)
+    ultimo_error = models.TextField(blank=True)
+    creado = models.DateTimeField(auto_now_add=True)
+    enviado = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['estado', 'proximo_intento'], name='correo_pendiente_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.asunto} -> {self.destinatario} ({self.estado})"
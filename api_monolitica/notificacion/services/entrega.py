@@ -0,0 +1,98 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+
+# Backends locales para pruebas de carga sin servidor de correo
+SUMIDEROS = {
+    'memoria': 'django.core.mail.backends.locmem.EmailBackend',
+    'archivo': 'django.core.mail.backends.filebased.EmailBackend',
+}
+
+logger = logging.getLogger(__name__)
+
+
+class LimitadorTasa:
+    """
+    Espacia los envíos para no superar `mensajes_por_segundo`. Con 0 o None no limita.
+    """
+
+    def __init__(self, mensajes_por_segundo=None):
+        self.intervalo = 1 / mensajes_por_segundo if mensajes_por_segundo else 0
+        self._siguiente = 0
+
+    def esperar(self):
+        if not self.intervalo:
+            return
+        ahora = time.monotonic()
+        if ahora < self._siguiente:
+            time.sleep(self._siguiente - ahora)
+            ahora = self._siguiente
+        self._siguiente = ahora + self.intervalo
+
+
+def backend_correo(sumidero=None):
+    """
+    Ruta del backend de correo: el sumidero pedido, el de settings.CORREO_SUMIDERO
+    o el EMAIL_BACKEND configurado.
+    """
+    sumidero = sumidero or getattr(settings, 'CORREO_SUMIDERO', None)
+    if sumidero:
+        return SUMIDEROS[sumidero]
+    return settings.EMAIL_BACKEND
+
+
+def construir_mensaje(correo, conexion):
+    mensaje = EmailMultiAlternatives(
+        subject=correo.asunto,
+        body=correo.mensaje_texto,
+        from_email=settings.EMAIL_HOST_USER,
+        to=[correo.destinatario],
+        connection=conexion,
+    )
+    if correo.mensaje_html:
+        mensaje.attach_alternative(correo.mensaje_html, "text/html")
+    return mensaje
+
+
+class Entregador:
+    """
+    Sesión de entrega: abre una sola conexión (get_connection) para todos los lotes
+    que se envíen dentro del bloque `with` y respeta la tasa máxima configurada.
+    """
+
+    def __init__(self, sumidero=None, mensajes_por_segundo=None):
+        if mensajes_por_segundo is None:
+            mensajes_por_segundo = getattr(settings, 'CORREO_MENSAJES_POR_SEGUNDO', 0)
+        self.limitador = LimitadorTasa(mensajes_por_segundo)
+        self.conexion = get_connection(backend=backend_correo(sumidero))
+
+    def __enter__(self):
+        self.conexion.open()
+        return self
+
+    def __exit__(self, *exc):
+        self.conexion.close()
+
+    def enviar_lote(self, correos):
+        """
+        Envía cada correo por la conexión abierta. Devuelve una lista paralela con
+        None para los enviados o la excepción de los que fallaron.
+        """
+        resultados = []
+        for correo in correos:
+            self.limitador.esperar()
+            try:
+                construir_mensaje(correo, self.conexion).send()
+            except Exception as e:
+                resultados.append(e)
+                # Una conexión SMTP caída no se recupera sola: se reabre para el resto del lote
+                self.conexion.close()
+                try:
+                    self.conexion.open()
+                except Exception:
+                    logger.exception("Error al reabrir la conexión de correo")
+            else:
+                resultados.append(None)
+        return resultados
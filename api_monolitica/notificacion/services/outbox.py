@@ -0,0 +1,122 @@
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import CorreoSaliente
+from .entrega import Entregador
+
+MAX_INTENTOS = getattr(settings, 'CORREO_MAX_INTENTOS', 5)
+BACKOFF_BASE = timedelta(seconds=30)
+BACKOFF_MAX = timedelta(hours=1)
+# Tiempo que un lote queda reservado para un worker; si el proceso muere, otro lo retoma
+RESERVA = timedelta(minutes=5)
+
+
+def encolar_correo(destinatario, asunto, mensaje_texto, mensaje_html=''):
+    """
+    Guarda el correo en la bandeja de salida. Si se llama dentro de transaction.atomic,
+    la fila se confirma o se descarta junto con el cambio de negocio.
+    """
+    return CorreoSaliente.objects.create(
+        destinatario=destinatario,
+        asunto=asunto,
+        mensaje_texto=mensaje_texto,
+        mensaje_html=mensaje_html or '',
+    )
+
+
+def encolar_correos(correos):
+    """
+    Guarda varios correos en un solo INSERT. Cada elemento es un dict con destinatario,
+    asunto, mensaje_texto y mensaje_html.
+    """
+    return CorreoSaliente.objects.bulk_create([
+        CorreoSaliente(
+            destinatario=correo['destinatario'],
+            asunto=correo['asunto'],
+            mensaje_texto=correo['mensaje_texto'],
+            mensaje_html=correo.get('mensaje_html') or '',
+        )
+        for correo in correos
+    ])
+
+
+def _siguiente_intento(intentos):
+    """Backoff exponencial con jitter a partir del número de intentos fallidos."""
+    espera = min(BACKOFF_BASE * (2 ** (intentos - 1)), BACKOFF_MAX)
+    return timezone.now() + espera * random.uniform(0.5, 1)
+
+
+def reservar_lote(tamano):
+    """
+    Toma hasta `tamano` correos pendientes cuyo intento ya venció y los reserva moviendo
+    proximo_intento hacia adelante, para que otro worker no los envíe a la vez.
+    """
+    ahora = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            CorreoSaliente.objects.select_for_update(skip_locked=True)
+            .filter(estado='Pendiente', proximo_intento__lte=ahora)
+            .order_by('proximo_intento')
+            .values_list('id', flat=True)[:tamano]
+        )
+        CorreoSaliente.objects.filter(id__in=ids).update(proximo_intento=ahora + RESERVA)
+    return list(CorreoSaliente.objects.filter(id__in=ids).order_by('id'))
+
+
+def _borrar_cuerpo(correo):
+    # El cuerpo puede traer contraseñas temporales o códigos de recuperación: no se guarda
+    # una vez que el correo ya no se va a enviar
+    correo.mensaje_texto = ''
+    correo.mensaje_html = ''
+
+
+def enviar_lote(correos, entregador):
+    """
+    Envía los correos reservados con el entregador abierto y guarda el resultado de cada uno.
+    Los enviados y descartados quedan sin cuerpo. Devuelve (enviados, reintentos, descartados).
+    """
+    enviados = reintentos = descartados = 0
+    for correo, error in zip(correos, entregador.enviar_lote(correos)):
+        correo.intentos += 1
+        if error is None:
+            correo.estado = 'Enviado'
+            correo.enviado = timezone.now()
+            correo.ultimo_error = ''
+            _borrar_cuerpo(correo)
+            enviados += 1
+        else:
+            correo.ultimo_error = str(error)
+            if correo.intentos >= MAX_INTENTOS:
+                correo.estado = 'Descartado'
+                _borrar_cuerpo(correo)
+                descartados += 1
+            else:
+                correo.proximo_intento = _siguiente_intento(correo.intentos)
+                reintentos += 1
+
+    CorreoSaliente.objects.bulk_update(
+        correos,
+        ['estado', 'intentos', 'proximo_intento', 'ultimo_error', 'enviado', 'mensaje_texto', 'mensaje_html']
+    )
+    return enviados, reintentos, descartados
+
+
+def vaciar_bandeja(tamano_lote=50, sumidero=None, mensajes_por_segundo=None):
+    """
+    Envía todos los correos pendientes por lotes, reutilizando una sola conexión de correo.
+    """
+    totales = {"enviados": 0, "reintentos": 0, "descartados": 0}
+    with Entregador(sumidero, mensajes_por_segundo) as entregador:
+        while True:
+            correos = reservar_lote(tamano_lote)
+            if not correos:
+                break
+            enviados, reintentos, descartados = enviar_lote(correos, entregador)
+            totales["enviados"] += enviados
+            totales["reintentos"] += reintentos
+            totales["descartados"] += descartados
+    return totales
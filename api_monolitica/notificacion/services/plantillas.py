@@ -0,0 +1,37 @@
+import html
+import re
+
+from django.template.loader import render_to_string
+from django.utils.html import strip_tags
+
+# Cierres que en texto plano separan párrafos o solo líneas
+_FIN_PARRAFO = re.compile(r'</(p|div|h[1-6]|table)>', re.IGNORECASE)
+_FIN_LINEA = re.compile(r'</tr>|<br\s*/?>', re.IGNORECASE)
+_CELDA = re.compile(r'</t[dh]>', re.IGNORECASE)
+_ENLACE = re.compile(r'<a\s[^>]*href="([^"]+)"[^>]*>(.*?)</a>', re.IGNORECASE | re.DOTALL)
+_ESPACIOS = re.compile(r'\s+')
+_LINEAS_VACIAS = re.compile(r'\n\s*\n+')
+
+
+def texto_plano(mensaje_html):
+    """
+    Versión en texto plano de un correo HTML: párrafos separados por una línea en blanco,
+    filas de tabla en una línea y los botones como 'texto: url'.
+    """
+    texto = _ESPACIOS.sub(' ', mensaje_html)
+    texto = _ENLACE.sub(lambda m: f"{m.group(2).strip()}: {m.group(1)}", texto)
+    texto = _CELDA.sub('  ', texto)
+    texto = _FIN_PARRAFO.sub('\n\n', texto)
+    texto = _FIN_LINEA.sub('\n', texto)
+    texto = html.unescape(strip_tags(texto))
+    lineas = '\n'.join(linea.strip() for linea in texto.split('\n'))
+    return _LINEAS_VACIAS.sub('\n\n', lineas).strip()
+
+
+def renderizar_correo(nombre, contexto):
+    """
+    Renderiza correos/<nombre>.html y devuelve (html, texto plano). Las plantillas se
+    compilan una vez por proceso gracias al cached.Loader configurado en TEMPLATES.
+    """
+    mensaje_html = render_to_string(f"correos/{nombre}.html", contexto)
+    return mensaje_html, texto_plano(mensaje_html)
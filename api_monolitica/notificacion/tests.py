@@ -0,0 +1,173 @@
+from smtplib import SMTPServerDisconnected
+from unittest import mock
+
+from django.core import mail
+from django.core.mail.backends import locmem
+from django.db import transaction
+from django.template import TemplateDoesNotExist, engines
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from insumo.models import Marca
+from utils.email_utils import _encolar, enviar_correo_recuperacion
+from .models import CorreoSaliente
+from .services.entrega import Entregador, LimitadorTasa
+from .services.plantillas import renderizar_correo
+from .services.outbox import MAX_INTENTOS, encolar_correo, vaciar_bandeja
+
+
+class BackendPrueba(locmem.EmailBackend):
+    """Backend en memoria que cuenta las aperturas y falla para los destinatarios 'falla...'."""
+
+    aperturas = 0
+
+    def open(self):
+        BackendPrueba.aperturas += 1
+        return super().open()
+
+    def send_messages(self, mensajes):
+        if any(mensaje.to[0].startswith("falla") for mensaje in mensajes):
+            raise SMTPServerDisconnected("conexión cerrada por el servidor")
+        return super().send_messages(mensajes)
+
+
+@override_settings(EMAIL_BACKEND='notificacion.tests.BackendPrueba', CORREO_SUMIDERO=None, CORREO_MENSAJES_POR_SEGUNDO=0)
+class BandejaSalidaTest(TestCase):
+    """Los correos se encolan con el cambio de negocio y el worker registra cada resultado."""
+
+    def setUp(self):
+        BackendPrueba.aperturas = 0
+
+    def test_encola_en_la_transaccion_del_llamador(self):
+        with transaction.atomic():
+            Marca.objects.create(nombre="Marca")
+            enviar_correo_recuperacion("cliente@correo.com", "Código", "123456")
+        correo = CorreoSaliente.objects.get()
+        self.assertEqual((correo.destinatario, correo.estado), ("cliente@correo.com", "Pendiente"))
+        self.assertIn("123456", correo.mensaje_html)
+
+    def test_rollback_descarta_el_correo(self):
+        with self.assertRaises(ValueError):
+            with transaction.atomic():
+                Marca.objects.create(nombre="Marca")
+                enviar_correo_recuperacion("cliente@correo.com", "Código", "123456")
+                raise ValueError("falla el cambio de negocio")
+        self.assertFalse(CorreoSaliente.objects.exists())
+        self.assertFalse(Marca.objects.exists())
+
+    def test_error_al_encolar_deshace_el_cambio(self):
+        with self.assertLogs('utils.email_utils', level='ERROR'), self.assertRaises(TemplateDoesNotExist):
+            with transaction.atomic():
+                Marca.objects.create(nombre="Marca")
+                _encolar("no_existe", {}, "cliente@correo.com", "Asunto", "de prueba")
+        self.assertFalse(Marca.objects.exists())
+        self.assertFalse(CorreoSaliente.objects.exists())
+
+    def test_worker_envia_reintenta_y_descarta(self):
+        enviado = encolar_correo("ok@correo.com", "Asunto", "Texto", "<p>Texto</p>")
+        reintento = encolar_correo("falla1@correo.com", "Asunto", "Texto", "<p>Texto</p>")
+        descartado = encolar_correo("falla2@correo.com", "Asunto", "Texto", "<p>Texto</p>")
+        CorreoSaliente.objects.filter(pk=descartado.pk).update(intentos=MAX_INTENTOS - 1)
+
+        totales = vaciar_bandeja()
+        self.assertEqual(totales, {"enviados": 1, "reintentos": 1, "descartados": 1})
+        self.assertEqual([mensaje.to for mensaje in mail.outbox], [["ok@correo.com"]])
+
+        enviado.refresh_from_db()
+        reintento.refresh_from_db()
+        descartado.refresh_from_db()
+        self.assertEqual((enviado.estado, enviado.intentos, enviado.mensaje_html), ("Enviado", 1, ""))
+        self.assertIsNotNone(enviado.enviado)
+        self.assertEqual((reintento.estado, reintento.intentos), ("Pendiente", 1))
+        self.assertGreater(reintento.proximo_intento, timezone.now())
+        self.assertIn("conexión cerrada", reintento.ultimo_error)
+        self.assertEqual(reintento.mensaje_texto, "Texto")
+        self.assertEqual((descartado.estado, descartado.mensaje_texto), ("Descartado", ""))
+
+        # El reintento todavía no vence: una segunda vuelta no lo toma
+        self.assertEqual(vaciar_bandeja(), {"enviados": 0, "reintentos": 0, "descartados": 0})
+
+
+@override_settings(EMAIL_BACKEND='notificacion.tests.BackendPrueba', CORREO_SUMIDERO=None, CORREO_MENSAJES_POR_SEGUNDO=0)
+class EntregadorTest(TestCase):
+    """El entregador reutiliza una conexión, la reabre tras un envío roto y respeta la tasa."""
+
+    def setUp(self):
+        BackendPrueba.aperturas = 0
+
+    def test_una_conexion_para_todos_los_lotes(self):
+        for n in range(120):
+            encolar_correo(f"cliente{n}@correo.com", "Asunto", "Texto")
+        totales = vaciar_bandeja(tamano_lote=50)
+        self.assertEqual(totales["enviados"], 120)
+        self.assertEqual(len(mail.outbox), 120)
+        self.assertEqual(BackendPrueba.aperturas, 1)
+
+    def test_reabre_la_conexion_tras_un_envio_roto(self):
+        correos = [
+            encolar_correo("ok1@correo.com", "Asunto", "Texto"),
+            encolar_correo("falla@correo.com", "Asunto", "Texto"),
+            encolar_correo("ok2@correo.com", "Asunto", "Texto"),
+        ]
+        with Entregador() as entregador:
+            with mock.patch.object(entregador.conexion, 'close', wraps=entregador.conexion.close) as cerrar:
+                resultados = entregador.enviar_lote(correos)
+        self.assertIsNone(resultados[0])
+        self.assertIsInstance(resultados[1], SMTPServerDisconnected)
+        self.assertIsNone(resultados[2])
+        self.assertEqual(cerrar.call_count, 1)
+        self.assertEqual(BackendPrueba.aperturas, 2)
+        self.assertEqual([mensaje.to[0] for mensaje in mail.outbox], ["ok1@correo.com", "ok2@correo.com"])
+
+    def test_error_al_reabrir_se_registra(self):
+        correos = [encolar_correo("falla@correo.com", "Asunto", "Texto")]
+        with Entregador() as entregador:
+            with mock.patch.object(entregador.conexion, 'open', side_effect=OSError("sin red")), \
+                    self.assertLogs('notificacion.services.entrega', level='ERROR'):
+                resultados = entregador.enviar_lote(correos)
+        self.assertIsInstance(resultados[0], SMTPServerDisconnected)
+
+    def test_limitador_espacia_los_envios(self):
+        reloj = [100.0]
+        esperas = []
+
+        def dormir(segundos):
+            esperas.append(segundos)
+            reloj[0] += segundos
+
+        with mock.patch('notificacion.services.entrega.time.monotonic', side_effect=lambda: reloj[0]), \
+                mock.patch('notificacion.services.entrega.time.sleep', side_effect=dormir):
+            limitador = LimitadorTasa(4)
+            for _ in range(3):
+                limitador.esperar()
+            reloj[0] += 1
+            limitador.esperar()
+        self.assertEqual(esperas, [0.25, 0.25])
+
+        with mock.patch('notificacion.services.entrega.time.sleep') as sin_limite:
+            for _ in range(5):
+                LimitadorTasa(0).esperar()
+        sin_limite.assert_not_called()
+
+
+class PlantillasCorreoTest(TestCase):
+    """Los correos se renderizan con el motor de Django y su cached.Loader."""
+
+    def test_usa_el_cached_loader(self):
+        loader = engines['django'].engine.template_loaders[0]
+        self.assertEqual(type(loader).__module__, 'django.template.loaders.cached')
+
+    def test_etiquetas_filtros_y_escape(self):
+        contexto = {"nombre_cliente": "Ana <b>", "fecha": "2026-01-01", "hora": "10:00", "total": 0}
+        mensaje_html, mensaje_texto = renderizar_correo("confirmacion", {**contexto, "servicios": []})
+        self.assertIn("Ana &lt;b&gt;", mensaje_html)
+        self.assertNotIn("Detalles de tu cita", mensaje_html)
+        self.assertIn("Hola Ana <b>, tu cita", mensaje_texto)
+
+        servicios = [{"nombre": "Manicure", "subtotal": 15000}, {"nombre": "Pedicure", "subtotal": 20000.5}]
+        mensaje_html, mensaje_texto = renderizar_correo(
+            "confirmacion", {**contexto, "servicios": servicios, "total": 35000.5}
+        )
+        self.assertIn("$15000.00", mensaje_html)
+        self.assertIn("$35000.50", mensaje_html)
+        self.assertIn("Pedicure", mensaje_texto)
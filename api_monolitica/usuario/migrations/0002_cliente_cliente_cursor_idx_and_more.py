@@ -0,0 +1,21 @@
+# Generated by Django 5.2 on 2026-10-17 18:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuario', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cliente',
+            index=models.Index(fields=['apellido', 'nombre', 'usuario'], name='cliente_cursor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='manicurista',
+            index=models.Index(fields=['apellido', 'nombre', 'usuario'], name='manicurista_cursor_idx'),
+        ),
+    ]
@@ -31,6 +31,12 @@ class Cliente(models.Model):
     
     estado = models.CharField(max_length=8, choices=ESTADOS_CHOICES, default="Activo")
 
+    class Meta:
+        indexes = [
+            # Orden del cursor de clientes/
+            models.Index(fields=['apellido', 'nombre', 'usuario'], name='cliente_cursor_idx'),
+        ]
+
     def __str__(self):
         return f"{self.nombre} - {self.apellido} - {self.correo} - ({self.estado})"
 
@@ -35,5 +35,11 @@ class Manicurista(models.Model):
     
     fecha_contratacion = models.DateField(null=False)
 
+    class Meta:
+        indexes = [
+            # Orden del cursor de manicuristas/
+            models.Index(fields=['apellido', 'nombre', 'usuario'], name='manicurista_cursor_idx'),
+        ]
+
     def __str__(self):
         return f"{self.nombre} - {self.apellido} - {self.correo} - ({self.estado})"
\ No newline at end of file
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from django.db import transaction
 from ..models.usuario_model import Usuario
 from ..models.cliente_model import Cliente
 from rol.models import Rol
@@ -131,6 +132,7 @@ class ClienteSerializer(serializers.ModelSerializer):
         random.shuffle(contrasena)
         return ''.join(contrasena)
 
+    @transaction.atomic
     def create(self, validated_data):
         username = validated_data.pop('username')
     
@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from django.db import transaction
 from ..models.usuario_model import Usuario
 from ..models.manicurista_model import Manicurista
 from rol.models import Rol
@@ -160,6 +161,7 @@ class ManicuristaSerializer(serializers.ModelSerializer):
         random.shuffle(contrasena)
         return ''.join(contrasena)
 
+    @transaction.atomic
     def create(self, validated_data):
         username = validated_data.pop('username')
 
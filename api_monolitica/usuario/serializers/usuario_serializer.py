@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from django.db import transaction
 from ..models.usuario_model import Usuario
 from rol.models import Rol
 from django.contrib.auth.password_validation import validate_password
@@ -80,6 +81,7 @@ class UsuarioSerializer(serializers.ModelSerializer):
         random.shuffle(contrasena)
         return ''.join(contrasena)
 
+    @transaction.atomic
     def create(self, validated_data):
 
         password = validated_data.pop('password', None)
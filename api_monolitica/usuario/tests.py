@@ -1,3 +1,66 @@
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from cita.models.estado_cita_model import EstadoCita
+from rol.models import Rol
+from utils.estados import estados_cita
+from .models.cliente_model import Cliente
+from .models.usuario_model import Usuario
+
+
+class EliminarClienteTest(TestCase):
+    """Eliminar un cliente no depende de que existan todos los estados de cita."""
+
+    def setUp(self):
+        # Solo existe 'Pendiente': 'Terminada' y 'Cancelada' faltan en la tabla
+        EstadoCita.objects.create(Estado="Pendiente")
+        estados_cita.invalidar()
+        usuario = Usuario.objects.create(
+            username="cli", correo="cli@correo.com", nombre="Nombre", apellido="Apellido",
+            rol_id=Rol.objects.create(nombre="Cliente"), numero_documento="123",
+        )
+        self.cliente = Cliente.objects.create(
+            usuario=usuario, nombre="cli", apellido="Apellido", tipo_documento="CC",
+            numero_documento="123", correo="cli@correo.com",
+        )
+        self.client = APIClient()
+
+    def test_desactiva_y_elimina_sin_estados_terminales(self):
+        url = f'/api/usuario/clientes/{self.cliente.pk}/'
+        self.assertEqual(self.client.delete(url).status_code, 200)
+        self.cliente.refresh_from_db()
+        self.assertEqual(self.cliente.estado, "Inactivo")
+
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertFalse(Cliente.objects.exists())
+
+
+class PaginacionClientesTest(TestCase):
+    """clientes/ se pagina por cursor en orden (apellido, nombre, pk) solo si se pide."""
+
+    def setUp(self):
+        rol = Rol.objects.create(nombre="Cliente")
+        for n, (nombre, apellido) in enumerate([("Ana", "Ruiz"), ("Luz", "Díaz"), ("Ana", "Díaz"),
+                                                ("Eva", "Ruiz"), ("Ana", "Díaz")]):
+            usuario = Usuario.objects.create(
+                username=f"cli{n}", correo=f"cli{n}@correo.com", nombre=nombre, apellido=apellido,
+                rol_id=rol, numero_documento=f"{n}",
+            )
+            Cliente.objects.create(
+                usuario=usuario, nombre=nombre, apellido=apellido, tipo_documento="CC",
+                numero_documento=f"{n}", correo=f"cli{n}@correo.com",
+            )
+        self.client = APIClient()
+
+    def test_recorre_los_clientes_en_orden(self):
+        esperado = list(Cliente.objects.order_by('apellido', 'nombre', 'pk').values_list('pk', flat=True))
+        ids, url = [], '/api/usuario/clientes/?tamano=2'
+        while url:
+            respuesta = self.client.get(url)
+            self.assertEqual(respuesta.status_code, 200)
+            self.assertLessEqual(len(respuesta.data['results']), 2)
+            ids.extend(cliente['usuario_id'] for cliente in respuesta.data['results'])
+            url = respuesta.data['next']
+        self.assertEqual(ids, esperado)
+
+        self.assertEqual(len(self.client.get('/api/usuario/clientes/').data), 5)
@@ -6,17 +6,22 @@ from django.shortcuts import get_object_or_404
 from ..serializers.cliente_serializer import ClienteSerializer
 from ..serializers.usuario_serializer import UsuarioSerializer
 from cita.models.cita_venta_model import CitaVenta
+from cita.services.resumen import actualizar_citas
 from cita.models.estado_cita_model import EstadoCita
+from utils.estados import estados_cita, ESTADO_CITA_TERMINADA, ESTADO_CITA_CANCELADA
 
 from ..models.usuario_model import Usuario
 from ..models.cliente_model import Cliente
 
+from utils.paginacion import PaginacionCursor
 #from utils.permisos import TienePermisoModulo
 
 class ClienteViewSet(viewsets.ModelViewSet):
     queryset = Cliente.objects.all()
     serializer_class = ClienteSerializer
     #permission_classes = [TienePermisoModulo("Cliente")];
+    pagination_class = PaginacionCursor
+    orden_cursor = ('apellido', 'nombre', 'pk')
     
     # Sobreescribimos el método destroy para cambiar el estado en lugar de eliminar
     def destroy(self, request, *args, **kwargs):
@@ -29,7 +34,7 @@ class ClienteViewSet(viewsets.ModelViewSet):
 
         # Verificar si hay citas en estado diferente de "Terminada" o "Cancelada"
         
-        ids_excluir = EstadoCita.objects.filter(Estado__in=["Terminada", "Cancelada"]).values_list("id", flat=True)
+        ids_excluir = estados_cita.ids_existentes(ESTADO_CITA_TERMINADA, ESTADO_CITA_CANCELADA)
         
         citas_activas = CitaVenta.objects.filter(cliente_id=cliente).exclude(estado_id__in=ids_excluir)
 
@@ -51,7 +56,7 @@ class ClienteViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_200_OK)
         else:
            # Desvincular citas (evitar que las borre por error)
-           CitaVenta.objects.filter(cliente_id=cliente).update(cliente_id=None)
+           actualizar_citas(CitaVenta.objects.filter(cliente_id=cliente), cliente_id=None)
     
            usuario_asociado.delete()
            cliente.delete()
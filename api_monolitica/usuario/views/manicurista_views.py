@@ -6,17 +6,22 @@ from django.shortcuts import get_object_or_404
 from ..serializers.manicurista_serializer import ManicuristaSerializer
 from ..serializers.usuario_serializer import UsuarioSerializer
 from cita.models.cita_venta_model import CitaVenta
+from cita.services.resumen import actualizar_citas
 from cita.models.estado_cita_model import EstadoCita
+from utils.estados import estados_cita, ESTADO_CITA_TERMINADA, ESTADO_CITA_CANCELADA
 
 from ..models.usuario_model import Usuario
 from ..models.manicurista_model import Manicurista
 
+from utils.paginacion import PaginacionCursor
 from utils.permisos import TienePermisoModulo
 
 class ManicuristaViewSet(viewsets.ModelViewSet):
     queryset = Manicurista.objects.all()
     serializer_class = ManicuristaSerializer
     permission_classes = [TienePermisoModulo("Manicurista")];
+    pagination_class = PaginacionCursor
+    orden_cursor = ('apellido', 'nombre', 'pk')
     
     # Sobreescribimos el método destroy para cambiar el estado en lugar de eliminar
     def destroy(self, request, *args, **kwargs):
@@ -28,7 +33,7 @@ class ManicuristaViewSet(viewsets.ModelViewSet):
 
         # Verificar si hay citas en estado diferente de "Terminada" o "Cancelada"
         
-        ids_excluir = EstadoCita.objects.filter(Estado__in=["Terminada", "Cancelada"]).values_list("id", flat=True)
+        ids_excluir = estados_cita.ids_existentes(ESTADO_CITA_TERMINADA, ESTADO_CITA_CANCELADA)
 
         citas_activas = CitaVenta.objects.filter(manicurista_id=manicurista).exclude(estado_id__in=ids_excluir)
 
@@ -50,7 +55,7 @@ class ManicuristaViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_200_OK)
         else:
            # Desvincular citas (evitar que las borre por error)
-           CitaVenta.objects.filter(manicurista_id=manicurista).update(manicurista_id=None)
+           actualizar_citas(CitaVenta.objects.filter(manicurista_id=manicurista), manicurista_id=None)
     
            usuario_asociado.delete()
            manicurista.delete()
@@ -10,12 +10,15 @@ from ..models.cliente_model import Cliente
 from ..models.manicurista_model import Manicurista
 from rol.models import Rol
 
+from utils.paginacion import PaginacionCursor
 from utils.permisos import TienePermisoModulo
 
 class UsuarioViewSet(viewsets.ModelViewSet):
     queryset = Usuario.objects.all()
     serializer_class = UsuarioSerializer
     permission_classes = [TienePermisoModulo("Usuario")];
+    pagination_class = PaginacionCursor
+    orden_cursor = ('username', 'id')
 
     
     def destroy(self, request, *args, **kwargs):
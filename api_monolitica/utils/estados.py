@@ -0,0 +1,120 @@
+import logging
+import threading
+import time
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from cita.models.estado_cita_model import EstadoCita
+from compra.models.estado_compra import EstadoCompra
+
+logger = logging.getLogger(__name__)
+
+ESTADO_CITA_PENDIENTE = 'Pendiente'
+ESTADO_CITA_EN_PROCESO = 'En proceso'
+ESTADO_CITA_TERMINADA = 'Terminada'
+ESTADO_CITA_CANCELADA = 'Cancelada'
+
+ESTADO_COMPRA_PENDIENTE = 'Pendiente'
+ESTADO_COMPRA_EN_PROCESO = 'En proceso'
+ESTADO_COMPRA_COMPLETADA = 'Completada'
+ESTADO_COMPRA_CANCELADA = 'Cancelada'
+
+# Ids que compra/views/compra.py (2 por defecto al crear, 3 completada, 4 cancelada) e insumo/views.py
+# (1 y 2 para compras abiertas) tenían fijos antes del registro. Las bases ya desplegadas tienen los
+# estados con esos ids pero los nombres no están en el repositorio: si un nombre no coincide se sigue
+# usando el mismo id que antes en lugar de fallar, y se deja un aviso en el log.
+IDS_COMPRA_HEREDADOS = {
+    ESTADO_COMPRA_PENDIENTE: 1,
+    ESTADO_COMPRA_EN_PROCESO: 2,
+    ESTADO_COMPRA_COMPLETADA: 3,
+    ESTADO_COMPRA_CANCELADA: 4,
+}
+
+# Las señales solo invalidan el proceso que guardó; los demás recargan tras este tiempo
+TIEMPO_RECARGA = 300
+
+
+class RegistroEstados:
+    """
+    Tabla de estados cargada una vez por proceso y resuelta por nombre sin distinguir
+    mayúsculas. Si un nombre no existe lanza modelo.DoesNotExist, igual que objects.get.
+    """
+
+    def __init__(self, modelo, ids_heredados=None):
+        self.modelo = modelo
+        self.ids_heredados = {clave.lower(): valor for clave, valor in (ids_heredados or {}).items()}
+        self._lock = threading.Lock()
+        self._por_nombre = None
+        self._por_id = None
+        self._cargado = 0
+
+    def _cargar(self):
+        with self._lock:
+            if self._por_nombre is None or time.monotonic() - self._cargado > TIEMPO_RECARGA:
+                estados = list(self.modelo.objects.all())
+                self._por_id = {estado.id: estado for estado in estados}
+                self._por_nombre = {estado.Estado.strip().lower(): estado for estado in estados}
+                self._cargado = time.monotonic()
+            return self._por_nombre, self._por_id
+
+    def invalidar(self):
+        with self._lock:
+            self._por_nombre = None
+            self._por_id = None
+
+    def obtener(self, nombre):
+        """Instancia del estado con ese nombre, lista para asignar a una ForeignKey."""
+        por_nombre, por_id = self._cargar()
+        clave = nombre.strip().lower()
+        if clave in por_nombre:
+            return por_nombre[clave]
+        if self.ids_heredados.get(clave) in por_id:
+            logger.warning(f"{self.modelo.__name__} '{nombre}' no existe por nombre, se usa el id {self.ids_heredados[clave]}")
+            return por_id[self.ids_heredados[clave]]
+        raise self.modelo.DoesNotExist(f"{self.modelo.__name__} '{nombre}' no existe")
+
+    def id(self, nombre):
+        return self.obtener(nombre).id
+
+    def ids(self, *nombres):
+        return [self.id(nombre) for nombre in nombres]
+
+    def ids_existentes(self, *nombres):
+        """Como ids(), pero omite los nombres que no existen, igual que un filter(Estado__in=...)."""
+        ids = []
+        for nombre in nombres:
+            try:
+                ids.append(self.id(nombre))
+            except self.modelo.DoesNotExist:
+                pass
+        return ids
+
+    def por_id(self, estado_id):
+        """Instancia del estado con ese id o DoesNotExist."""
+        _, por_id = self._cargar()
+        try:
+            return por_id[int(estado_id)]
+        except (KeyError, TypeError, ValueError):
+            raise self.modelo.DoesNotExist(f"{self.modelo.__name__} con id {estado_id} no existe")
+
+    def es(self, estado_id, nombre):
+        """True si el id corresponde al estado con ese nombre."""
+        try:
+            return estado_id == self.id(nombre)
+        except self.modelo.DoesNotExist:
+            return False
+
+
+estados_cita = RegistroEstados(EstadoCita)
+estados_compra = RegistroEstados(EstadoCompra, IDS_COMPRA_HEREDADOS)
+
+
+@receiver([post_save, post_delete], sender=EstadoCita)
+def _invalidar_estados_cita(sender, **kwargs):
+    estados_cita.invalidar()
+
+
+@receiver([post_save, post_delete], sender=EstadoCompra)
+def _invalidar_estados_compra(sender, **kwargs):
+    estados_compra.invalidar()
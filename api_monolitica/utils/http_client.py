@@ -0,0 +1,169 @@
+# Este módulo existe igual en api_monolitica/utils/ y microservicio_servicios/utils/: cada servicio
+# se construye en su propia imagen y no comparten paquete. Los cambios se hacen en las dos copias;
+# ClienteHTTPTest en api_monolitica/cita/tests.py falla si dejan de ser idénticas.
+import logging
+import random
+import re
+import threading
+import time
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+METODOS_IDEMPOTENTES = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+ESTADOS_REINTENTABLES = {502, 503, 504}
+# Agrupa las métricas de /usuario/5/ y /usuario/7/ bajo /usuario/{id}/
+PATRON_ID = re.compile(r'/\d+')
+
+
+class CircuitoAbierto(requests.exceptions.ConnectionError):
+    """El servicio remoto acumuló demasiados fallos y se dejan de enviar peticiones temporalmente."""
+
+
+class ClienteHTTP:
+    """
+    Cliente HTTP interno con una Session compartida (pool de conexiones keep-alive),
+    timeout por llamada, reintentos acotados con jitter, circuit breaker y métricas por endpoint.
+    """
+
+    def __init__(self, nombre, base_url, timeout=5, reintentos=2, backoff=0.2,
+                 umbral_fallos=5, espera_circuito=30, tamano_pool=10):
+        self.nombre = nombre
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.reintentos = reintentos
+        self.backoff = backoff
+        self.umbral_fallos = umbral_fallos
+        self.espera_circuito = espera_circuito
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=tamano_pool, pool_maxsize=tamano_pool, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._lock = threading.Lock()
+        self._fallos_consecutivos = 0
+        self._abierto_hasta = 0
+        self._prueba_en_curso = False
+        self._metricas = {}
+
+    def get(self, ruta, **kwargs):
+        return self.request('GET', ruta, **kwargs)
+
+    def post(self, ruta, **kwargs):
+        return self.request('POST', ruta, **kwargs)
+
+    def request(self, metodo, ruta, endpoint=None, timeout=None, reintentar=None, **kwargs):
+        """
+        Envía la petición a base_url + ruta. Los métodos no idempotentes solo se reintentan
+        si se pasa reintentar=True. Las excepciones son las de requests, así que los
+        manejadores existentes de RequestException siguen funcionando.
+        """
+        metodo = metodo.upper()
+        endpoint = endpoint or f"{metodo} {PATRON_ID.sub('/{id}', ruta)}"
+        if reintentar is None:
+            reintentar = metodo in METODOS_IDEMPOTENTES
+        intentos = 1 + (self.reintentos if reintentar else 0)
+        url = f"{self.base_url}/{ruta.lstrip('/')}"
+
+        for intento in range(intentos):
+            prueba = self._verificar_circuito()
+            inicio = time.perf_counter()
+            try:
+                response = self.session.request(metodo, url, timeout=timeout or self.timeout, **kwargs)
+            except requests.exceptions.RequestException as e:
+                self._registrar(endpoint, time.perf_counter() - inicio, error=True, prueba=prueba)
+                if intento == intentos - 1 or not isinstance(e, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+                    raise
+                logger.warning(f"[{self.nombre}] {endpoint} falló ({e}), reintento {intento + 1}")
+            except Exception:
+                # Un error que no es de red no dice nada del servicio: se libera la prueba y se propaga
+                if prueba:
+                    with self._lock:
+                        self._prueba_en_curso = False
+                raise
+            else:
+                error = response.status_code >= 500
+                self._registrar(endpoint, time.perf_counter() - inicio, error=error, prueba=prueba)
+                if not (error and response.status_code in ESTADOS_REINTENTABLES and intento < intentos - 1):
+                    return response
+                logger.warning(f"[{self.nombre}] {endpoint} respondió {response.status_code}, reintento {intento + 1}")
+            # Backoff exponencial con jitter completo para no sincronizar los reintentos
+            time.sleep(random.uniform(0, self.backoff * (2 ** intento)))
+
+    def _verificar_circuito(self):
+        """Lanza CircuitoAbierto si no se puede llamar; devuelve True si la petición es la prueba del semiabierto."""
+        with self._lock:
+            if not self._abierto_hasta:
+                return False
+            if time.monotonic() < self._abierto_hasta or self._prueba_en_curso:
+                raise CircuitoAbierto(f"Circuito abierto para {self.nombre}")
+            # Semiabierto: pasa solo esta petición de prueba; las demás fallan rápido hasta que termine
+            self._prueba_en_curso = True
+            return True
+
+    def _registrar(self, endpoint, segundos, error, prueba=False):
+        ms = segundos * 1000
+        with self._lock:
+            metricas = self._metricas.setdefault(endpoint, {
+                "llamadas": 0, "errores": 0, "latencia_total_ms": 0.0, "latencia_max_ms": 0.0
+            })
+            metricas["llamadas"] += 1
+            metricas["latencia_total_ms"] += ms
+            metricas["latencia_max_ms"] = max(metricas["latencia_max_ms"], ms)
+            if error:
+                metricas["errores"] += 1
+                self._fallos_consecutivos += 1
+                # Si falla la prueba del semiabierto se vuelve a abrir sin esperar otro umbral
+                if self._fallos_consecutivos >= self.umbral_fallos or prueba:
+                    self._abierto_hasta = time.monotonic() + self.espera_circuito
+                    logger.error(f"[{self.nombre}] circuito abierto por {self.espera_circuito}s")
+            else:
+                self._fallos_consecutivos = 0
+                self._abierto_hasta = 0
+            if prueba:
+                self._prueba_en_curso = False
+
+    def metricas(self):
+        with self._lock:
+            return {
+                "circuito_abierto": bool(self._abierto_hasta) and time.monotonic() < self._abierto_hasta,
+                "endpoints": {
+                    endpoint: {
+                        **datos,
+                        "latencia_media_ms": round(datos["latencia_total_ms"] / datos["llamadas"], 2),
+                        "latencia_total_ms": round(datos["latencia_total_ms"], 2),
+                        "latencia_max_ms": round(datos["latencia_max_ms"], 2),
+                    }
+                    for endpoint, datos in self._metricas.items()
+                }
+            }
+
+
+_clientes = {}
+_clientes_lock = threading.Lock()
+
+
+def obtener_cliente(nombre, base_url, **opciones):
+    """
+    Cliente compartido por proceso para un servicio remoto. Los parámetros por defecto
+    salen de settings.HTTP_CLIENTE y se pueden sobrescribir por servicio.
+    """
+    with _clientes_lock:
+        if nombre not in _clientes:
+            configuracion = {
+                clave.lower(): valor for clave, valor in getattr(settings, 'HTTP_CLIENTE', {}).items()
+            }
+            configuracion.update(opciones)
+            _clientes[nombre] = ClienteHTTP(nombre, base_url, **configuracion)
+        return _clientes[nombre]
+
+
+def metricas_clientes():
+    """Contadores de latencia y errores de todos los clientes creados en el proceso."""
+    with _clientes_lock:
+        clientes = list(_clientes.values())
+    return {cliente.nombre: cliente.metricas() for cliente in clientes}
@@ -0,0 +1,171 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+from functools import reduce
+from operator import and_, or_
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+VALORES_SIN_PAGINAR = ('false', '0', 'no')
+VALORES_PAGINAR = ('true', '1', 'si', 'sí')
+
+
+class PaginacionCursor(BasePagination):
+    """
+    Paginación por cursor (keyset) sobre el orden de la vista. El cursor guarda los valores
+    de la última fila entregada y la página siguiente se pide con WHERE (campos) > (valores),
+    así el costo no depende de cuántas páginas haya antes.
+
+    Cada vista la activa con pagination_class y define su orden con `orden_cursor`; el último
+    campo debe ser único (id). Solo se pagina si la petición lo pide (?paginar=true, ?tamano
+    o ?cursor); sin esos parámetros, o con ?paginar=false, se devuelve la lista completa como
+    antes, así los clientes existentes no cambian.
+    """
+    cursor_query_param = 'cursor'
+    tamano_query_param = 'tamano'
+    paginar_query_param = 'paginar'
+    orden = ('pk',)
+
+    def __init__(self):
+        configuracion = getattr(settings, 'PAGINACION', {})
+        self.tamano = configuracion.get('TAMANO', 50)
+        self.tamano_maximo = configuracion.get('TAMANO_MAXIMO', 500)
+
+    def pide_paginacion(self, request):
+        paginar = request.query_params.get(self.paginar_query_param, '').lower()
+        if paginar in VALORES_SIN_PAGINAR:
+            return False
+        return paginar in VALORES_PAGINAR or any(
+            parametro in request.query_params for parametro in (self.cursor_query_param, self.tamano_query_param)
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.pide_paginacion(request):
+            return None
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.campos = self.obtener_orden(view)
+        self.tamano_pagina = self.obtener_tamano(request)
+        posicion, atras = self.leer_cursor(request)
+
+        orden = [campo if not atras else invertir(campo) for campo in self.campos]
+        queryset = queryset.order_by(*orden)
+        if posicion is not None:
+            queryset = queryset.filter(filtro_posterior(orden, posicion))
+
+        filas = list(queryset[:self.tamano_pagina + 1])
+        hay_mas = len(filas) > self.tamano_pagina
+        filas = filas[:self.tamano_pagina]
+        if atras:
+            filas.reverse()
+
+        self.hay_siguiente = hay_mas if not atras else True
+        self.hay_anterior = posicion is not None if not atras else hay_mas
+        self.filas = filas
+        return filas
+
+    def obtener_orden(self, view):
+        orden = tuple(getattr(view, 'orden_cursor', self.orden))
+        if orden[-1].lstrip('-') not in ('pk', 'id'):
+            orden = orden + ('pk',)
+        return orden
+
+    def obtener_tamano(self, request):
+        try:
+            tamano = int(request.query_params[self.tamano_query_param])
+        except (KeyError, ValueError):
+            return self.tamano
+        return min(max(tamano, 1), self.tamano_maximo)
+
+    def leer_cursor(self, request):
+        codificado = request.query_params.get(self.cursor_query_param)
+        if not codificado:
+            return None, False
+        try:
+            datos = json.loads(base64.urlsafe_b64decode(codificado.encode('ascii')).decode('utf-8'))
+            valores, atras = datos['v'], bool(datos.get('a'))
+        except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError):
+            raise NotFound("Cursor inválido")
+        if not isinstance(valores, list) or len(valores) != len(self.campos):
+            raise NotFound("Cursor inválido")
+        return valores, atras
+
+    def escribir_cursor(self, fila, atras):
+        valores = [valor_campo(fila, campo) for campo in self.campos]
+        datos = json.dumps({'v': valores, 'a': 1 if atras else 0}, cls=DjangoJSONEncoder, separators=(',', ':'))
+        codificado = base64.urlsafe_b64encode(datos.encode('utf-8')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, codificado)
+
+    def get_next_link(self):
+        if not self.hay_siguiente or not self.filas:
+            return None
+        return self.escribir_cursor(self.filas[-1], atras=False)
+
+    def get_previous_link(self):
+        if not self.hay_anterior:
+            return None
+        if not self.filas:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.escribir_cursor(self.filas[0], atras=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        parametros = [
+            (self.cursor_query_param, 'string', 'Cursor devuelto en next/previous.'),
+            (self.tamano_query_param, 'integer', f'Elementos por página (máximo {self.tamano_maximo}).'),
+            (self.paginar_query_param, 'boolean', 'true pagina la lista; sin cursor ni tamano se devuelve completa.'),
+        ]
+        return [
+            {'name': nombre, 'required': False, 'in': 'query', 'description': descripcion, 'schema': {'type': tipo}}
+            for nombre, tipo, descripcion in parametros
+        ]
+
+
+def invertir(campo):
+    return campo[1:] if campo.startswith('-') else f"-{campo}"
+
+
+def valor_campo(fila, campo):
+    nombre = campo.lstrip('-')
+    if nombre == 'pk':
+        return fila.pk
+    return getattr(fila, fila._meta.get_field(nombre).attname)
+
+
+def filtro_posterior(orden, valores):
+    """
+    Filas que van después de `valores` en `orden`. Para (a, -b, id) equivale a
+    a > va OR (a = va AND b < vb) OR (a = va AND b = vb AND id > vid).
+    """
+    condiciones = []
+    for i, campo in enumerate(orden):
+        nombre = campo.lstrip('-')
+        comparacion = 'lt' if campo.startswith('-') else 'gt'
+        iguales = [Q(**{orden[j].lstrip('-'): valores[j]}) for j in range(i)]
+        condiciones.append(reduce(and_, iguales + [Q(**{f"{nombre}__{comparacion}": valores[i]})]))
+    return reduce(or_, condiciones)
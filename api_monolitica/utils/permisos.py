@@ -1,3 +1,6 @@
+import hmac
+
+from django.conf import settings
 from rest_framework.permissions import BasePermission
 
 from rol.models import Permiso_Rol
@@ -32,3 +35,12 @@ def TienePermisoModulo(modulo_requerido):
 
             return modulo_requerido in permisos
     return _PermisoModulo
+
+
+class TokenCatalogo(BasePermission):
+    """Avisos del microservicio de servicios: exige la cabecera X-Catalogo-Token igual a settings.CATALOGO_TOKEN."""
+
+    def has_permission(self, request, view):
+        esperado = settings.CATALOGO_TOKEN
+        recibido = request.headers.get('X-Catalogo-Token', '')
+        return bool(esperado) and hmac.compare_digest(recibido.encode(), esperado.encode())
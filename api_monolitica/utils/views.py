@@ -0,0 +1,12 @@
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from .http_client import metricas_clientes
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def metricas_http(request):
+    """Latencia y errores por endpoint de las llamadas a otros servicios."""
+    return Response(metricas_clientes())
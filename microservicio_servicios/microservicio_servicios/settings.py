@@ -164,6 +164,11 @@ LOGGING = {
             'level': 'DEBUG',
             'propagate': True,
         },
+        'utils.http_client': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': True,
+        },
         'utils.permisos': {
             'handlers': ['console'],
             'level': 'DEBUG',
@@ -173,6 +178,19 @@ LOGGING = {
 }
 
 MONOLITH_URL = os.getenv('MONOLITH_URL', 'http://localhost:8000/api')
+AUTH_MS_URL = os.getenv('AUTH_MS_URL', f"{MONOLITH_URL}/rol/")
+# Secreto compartido con el monolítico para cita-venta/catalogo-servicios/sincronizar/
+CATALOGO_TOKEN = os.getenv('CATALOGO_TOKEN')
+
+# Llamadas entre servicios (utils/http_client.py)
+HTTP_CLIENTE = {
+    'TIMEOUT': 5,           # segundos por intento
+    'REINTENTOS': 2,        # reintentos de métodos idempotentes
+    'BACKOFF': 0.2,         # base del backoff exponencial con jitter
+    'UMBRAL_FALLOS': 5,     # fallos seguidos que abren el circuito
+    'ESPERA_CIRCUITO': 30,  # segundos con el circuito abierto
+    'TAMANO_POOL': 10,      # conexiones keep-alive por servicio
+}
 
 
 # Password validation
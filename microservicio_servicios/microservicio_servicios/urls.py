@@ -17,10 +17,12 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView, SpectacularSwaggerView
+from utils.views import metricas_http
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('micro-servicios/', include('servicios.urls')),
+    path('micro-servicios/metricas-http/', metricas_http),
     
     #rutas de api para swagger y redoc
     path('micro-servicios/schema/', SpectacularAPIView.as_view(), name='schema'),
@@ -2,6 +2,10 @@ from rest_framework import serializers
 from .models import Servicio
 import requests
 import os
+from utils.http_client import obtener_cliente
+
+IMGBB_URL = "https://api.imgbb.com/1"
+IMGBB_TIMEOUT = 20
 
 class ServicioSerializer(serializers.ModelSerializer):
     imagen = serializers.ImageField(
@@ -71,12 +75,13 @@ class ServicioSerializer(serializers.ModelSerializer):
         if not IMGBB_API_KEY:
             return "https://i.ibb.co/zWhfbh8/default.jpg"
 
-        url = "https://api.imgbb.com/1/upload"
         files = {"image": imagen}
         payload = {"key": IMGBB_API_KEY}
 
         try:
-            response = requests.post(url, files=files, data=payload)
+            response = obtener_cliente('imgbb', IMGBB_URL).post(
+                'upload', files=files, data=payload, timeout=IMGBB_TIMEOUT
+            )
             response.raise_for_status()
             return response.json().get("data", {}).get("url", "https://i.ibb.co/zWhfbh8/default.jpg")
         except requests.exceptions.RequestException:
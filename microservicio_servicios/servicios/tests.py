@@ -1,3 +1,88 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+import requests
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from .models import Servicio
+from .views import notificar_cambio_catalogo
+
+
+class BulkServiciosTest(TestCase):
+    """servicio/bulk/ devuelve varios servicios y reporta cada id inválido o inexistente."""
+
+    url = '/micro-servicios/servicio/bulk/'
+
+    def setUp(self):
+        self.client = APIClient()
+        self.servicios = [
+            Servicio.objects.create(nombre=f"Servicio {n}", descripcion="Prueba", precio=10000 * n,
+                                    duracion=timedelta(minutes=30 * n))
+            for n in (1, 2)
+        ]
+
+    def _ids(self, respuesta):
+        return sorted(servicio['id'] for servicio in respuesta.data['servicios'])
+
+    def test_get_con_ids(self):
+        ids = ','.join(str(servicio.id) for servicio in self.servicios)
+        respuesta = self.client.get(f"{self.url}?ids={ids},abc,999")
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(self._ids(respuesta), [servicio.id for servicio in self.servicios])
+        self.assertEqual(respuesta.data['errores'], {"abc": "Id inválido", "999": "El servicio no existe"})
+
+    def test_post_con_ids(self):
+        respuesta = self.client.post(self.url, {"ids": [self.servicios[0].id, "x", None, 999]}, format='json')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(self._ids(respuesta), [self.servicios[0].id])
+        self.assertEqual(respuesta.data['errores'], {
+            "x": "Id inválido", "None": "Id inválido", "999": "El servicio no existe",
+        })
+
+    def test_lista_vacia_o_invalida(self):
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+        self.assertEqual(self.client.get(f"{self.url}?ids=,").status_code, 400)
+        self.assertEqual(self.client.post(self.url, {"ids": []}, format='json').status_code, 400)
+        self.assertEqual(self.client.post(self.url, {"ids": "1,2"}, format='json').status_code, 400)
+
+
+@override_settings(CATALOGO_TOKEN="secreto")
+class NotificacionCatalogoTest(TestCase):
+    """Los cambios se avisan al monolítico al confirmar la transacción, con el servicio y el token."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.servicio = Servicio.objects.create(nombre="Acrílicas", descripcion="Prueba", precio=30000)
+        parche = mock.patch('servicios.views.obtener_cliente')
+        self.obtener_cliente = parche.start()
+        self.addCleanup(parche.stop)
+        self.post = self.obtener_cliente.return_value.post
+
+    def test_envia_el_servicio_al_confirmar(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            notificar_cambio_catalogo(self.servicio)
+        self.post.assert_not_called()
+        for callback in callbacks:
+            callback()
+
+        ruta = self.post.call_args.args[0]
+        self.assertEqual(ruta, 'cita-venta/catalogo-servicios/sincronizar/')
+        self.assertEqual(self.post.call_args.kwargs['headers'], {'X-Catalogo-Token': "secreto"})
+        enviado = self.post.call_args.kwargs['json']['servicio']
+        self.assertEqual((enviado['id'], enviado['nombre'], enviado['duracion']), (self.servicio.id, "Acrílicas", "00:30:00"))
+
+    def test_cambio_de_estado_y_eliminacion(self):
+        url = f'/micro-servicios/servicio/{self.servicio.id}/'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.patch(f"{url}cambiar_estado/").status_code, 200)
+        self.assertEqual(self.post.call_args.kwargs['json']['servicio']['estado'], "Inactivo")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertEqual(self.post.call_args.kwargs['json'], {"eliminado": self.servicio.id})
+
+    def test_monolito_caido_no_rompe_la_peticion(self):
+        self.post.side_effect = requests.exceptions.ConnectionError("sin red")
+        with self.assertLogs('servicios.views', level='WARNING'), self.captureOnCommitCallbacks(execute=True):
+            notificar_cambio_catalogo(eliminado=self.servicio.id)
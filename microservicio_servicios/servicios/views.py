@@ -1,4 +1,9 @@
 # microservicio_servicios/servicios/views.py
+import logging
+
+import requests
+from django.conf import settings
+from django.db import transaction
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
@@ -6,24 +11,56 @@ from rest_framework.permissions import AllowAny
 
 from .models import Servicio
 from .serializer import ServicioSerializer
+from utils.http_client import obtener_cliente
+
+logger = logging.getLogger(__name__)
+
+def notificar_cambio_catalogo(servicio=None, eliminado=None):
+    """
+    Envía al monolítico el servicio que cambió (o el id eliminado) para que actualice su réplica
+    sin volver a pedir el catálogo. Se manda al confirmarse la transacción, con X-Catalogo-Token.
+    """
+    cuerpo = {"servicio": ServicioSerializer(servicio).data} if servicio is not None else {"eliminado": eliminado}
+
+    def enviar():
+        try:
+            obtener_cliente('monolito', settings.MONOLITH_URL).post(
+                'cita-venta/catalogo-servicios/sincronizar/',
+                json=cuerpo, headers={'X-Catalogo-Token': settings.CATALOGO_TOKEN or ''}
+            )
+        except requests.exceptions.RequestException as e:
+            logger.warning(f"No se pudo notificar el cambio de catálogo al monolítico: {e}")
+
+    transaction.on_commit(enviar)
 
 class ServicioViewSet(viewsets.ModelViewSet):
     queryset = Servicio.objects.all()
     serializer_class = ServicioSerializer
     permission_classes = [AllowAny]  # Sin autenticación requerida
 
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        notificar_cambio_catalogo(serializer.instance)
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        notificar_cambio_catalogo(serializer.instance)
+
     def destroy(self, request, *args, **kwargs):
         try:
             servicio = self.get_object()
             if servicio.estado == "Activo":
                 servicio.estado = "Inactivo"
                 servicio.save()
+                notificar_cambio_catalogo(servicio)
                 return Response(
                     {'message': "Servicio desactivado correctamente"},
                     status=status.HTTP_200_OK
                 )
             else:
+                servicio_id = servicio.id
                 servicio.delete()
+                notificar_cambio_catalogo(eliminado=servicio_id)
                 return Response(
                     {'message': "Servicio eliminado con éxito"},
                     status=status.HTTP_204_NO_CONTENT
@@ -41,6 +78,7 @@ class ServicioViewSet(viewsets.ModelViewSet):
             nuevo_estado = "Activo" if servicio.estado == "Inactivo" else "Inactivo"
             servicio.estado = nuevo_estado
             servicio.save()
+            notificar_cambio_catalogo(servicio)
             serializer = self.get_serializer(servicio)
             return Response({
                 "message": f"Estado del servicio cambiado a {nuevo_estado}",
@@ -50,4 +88,40 @@ class ServicioViewSet(viewsets.ModelViewSet):
             return Response(
                 {'message': f"Ocurrió un error al cambiar el estado del servicio: {e}"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
\ No newline at end of file
+            )
+
+    @action(detail=False, methods=['get', 'post'], url_path='bulk')
+    def bulk(self, request):
+        """
+        Devuelve varios servicios en una sola respuesta.
+        GET ?ids=1,2,3 o POST {"ids": [1, 2, 3]}. Los ids inválidos o inexistentes
+        se reportan en 'errores' sin hacer fallar el resto de la petición.
+        """
+        if request.method == 'POST':
+            ids = request.data.get('ids', [])
+        else:
+            ids = [valor for valor in request.query_params.get('ids', '').split(',') if valor.strip()]
+
+        if not isinstance(ids, list) or not ids:
+            return Response(
+                {'message': "Se requiere una lista de ids"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        errores = {}
+        ids_validos = set()
+        for valor in ids:
+            try:
+                ids_validos.add(int(valor))
+            except (TypeError, ValueError):
+                errores[str(valor)] = "Id inválido"
+
+        servicios = Servicio.objects.in_bulk(ids_validos)
+        for servicio_id in ids_validos - servicios.keys():
+            errores[str(servicio_id)] = "El servicio no existe"
+
+        serializer = self.get_serializer(list(servicios.values()), many=True)
+        return Response({
+            "servicios": serializer.data,
+            "errores": errores
+        }, status=status.HTTP_200_OK)
@@ -9,12 +9,16 @@ from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.tokens import UntypedToken
 from jwt import decode as jwt_decode
 from django.contrib.auth import get_user_model
+from .http_client import obtener_cliente
 
 logger = logging.getLogger(__name__)
 
 # URL del monolítico
 MONOLITH_URL = getattr(settings, 'MONOLITH_URL', 'http://localhost:8000/api')
 
+def cliente_monolito():
+    return obtener_cliente('monolito', MONOLITH_URL)
+
 class ProxyUser:
     """Clase que simula un usuario para el microservicio"""
     def __init__(self, user_data):
@@ -65,8 +69,7 @@ class MicroserviceJWTAuthentication(JWTAuthentication):
     def _fetch_user_from_monolith(self, user_id):
         """Obtiene datos del usuario desde el monolítico"""
         try:
-            url = f"{MONOLITH_URL}/usuario/{user_id}/"
-            response = requests.get(url, timeout=5)
+            response = cliente_monolito().get(f"usuario/{user_id}/")
             
             if response.status_code == 200:
                 return response.json()
@@ -89,9 +92,7 @@ def verificar_token_con_monolitico(token):
     """Verifica un token JWT directamente con el monolítico"""
     try:
         headers = {'Authorization': f'Bearer {token}'}
-        url = f"{MONOLITH_URL}/auth/verify-token/"
-        
-        response = requests.post(url, headers=headers, timeout=5)
+        response = cliente_monolito().post("auth/verify-token/", headers=headers)
         
         if response.status_code == 200:
             return response.json()
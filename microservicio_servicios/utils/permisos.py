@@ -3,6 +3,7 @@ import logging
 from rest_framework.permissions import BasePermission
 from django.conf import settings
 from django.core.cache import cache
+from .http_client import obtener_cliente
 
 logger = logging.getLogger(__name__)
 
@@ -21,8 +22,10 @@ def obtener_permisos_usuario(usuario_id, rol_id):
         return modulos
     
     try:
-        url = f"{AUTH_MS_URL}permisos-rol/modulos-por-rol/?rol_id={rol_id}/"
-        response = requests.get(url, timeout=5)
+        response = obtener_cliente('roles', AUTH_MS_URL).get(
+            f"permisos-rol/modulos-por-rol/?rol_id={rol_id}/",
+            endpoint="GET permisos-rol/modulos-por-rol/"
+        )
         response.raise_for_status()
         
         data = response.json()